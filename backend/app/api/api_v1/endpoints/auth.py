@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import logging
 
-from app.core.security import create_access_token, get_password_hash
+from app.core.security import create_access_token
 from app.core.dependencies import authenticate_user
 from app.db.session import get_db
 from app.schemas.token import Token, LoginRequest, TokenRefresh
@@ -35,7 +35,9 @@ async def login_for_access_token(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id,
+        expires_delta=access_token_expires,
+        token_version=user.token_version
     )
     
     logger.info(f"User logged in: {user.username}")
@@ -61,7 +63,9 @@ async def login_json(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id,
+        expires_delta=access_token_expires,
+        token_version=user.token_version
     )
     
     logger.info(f"User logged in via JSON: {user.username}")
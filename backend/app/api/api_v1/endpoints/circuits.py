@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
@@ -6,14 +6,18 @@ import logging
 
 from app.core.dependencies import get_current_user, get_current_active_superuser
 from app.db.session import get_db
+from app.services.response_cache import cached_response, invalidate_responses
 from app.db.models import Circuit, User
+from app.services.reference_cache import get_reference_data, reference_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=List[dict])
+@cached_response("circuits")
 async def get_circuits(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     country: Optional[str] = None,
@@ -55,7 +59,9 @@ async def get_circuits(
 
 
 @router.get("/{circuit_id}", response_model=dict)
+@cached_response("circuits")
 async def get_circuit_by_id(
+    request: Request,
     circuit_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -63,10 +69,9 @@ async def get_circuit_by_id(
     """
     Get a circuit by ID.
     """
-    # Get circuit by ID
-    query = select(Circuit).where(Circuit.id == circuit_id)
-    result = await db.execute(query)
-    circuit = result.scalar_one_or_none()
+    # Served from the reference data cache
+    reference = await get_reference_data(db)
+    circuit = reference.circuit(circuit_id)
     
     if not circuit:
         raise HTTPException(
@@ -74,19 +79,7 @@ async def get_circuit_by_id(
             detail=f"Circuit with ID {circuit_id} not found"
         )
     
-    # Return as dict (with ORM mode)
-    return {
-        "id": circuit.id,
-        "name": circuit.name,
-        "location": circuit.location,
-        "country": circuit.country,
-        "circuit_id": circuit.circuit_id,
-        "length_km": circuit.length_km,
-        "turns": circuit.turns,
-        "lap_record": circuit.lap_record,
-        "lap_record_time": circuit.lap_record_time,
-        "coordinates": circuit.coordinates
-    }
+    return dict(circuit)
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -114,6 +107,8 @@ async def create_circuit(
     db.add(new_circuit)
     await db.commit()
     await db.refresh(new_circuit)
+    reference_cache.invalidate()
+    await invalidate_responses("circuits", "races")
     
     # Return as dict (with ORM mode)
     return {
@@ -158,6 +153,8 @@ async def update_circuit(
     
     await db.commit()
     await db.refresh(circuit)
+    reference_cache.invalidate()
+    await invalidate_responses("circuits", "races")
     
     # Return as dict (with ORM mode)
     return {
@@ -197,5 +194,7 @@ async def delete_circuit(
     # Delete circuit
     await db.delete(circuit)
     await db.commit()
+    reference_cache.invalidate()
+    await invalidate_responses("circuits", "races")
     
     return None 
\ No newline at end of file
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 from typing import List, Optional, Dict, Any
 import logging
 
 from app.core.dependencies import get_current_user, get_current_active_superuser
 from app.db.session import get_db
+from app.services.response_cache import cached_response, invalidate_responses
 from app.db.models import Driver, Team, User
+from app.services.reference_cache import get_reference_data, reference_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
+@cached_response("drivers")
 async def get_drivers(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     team_id: Optional[int] = None,
@@ -23,8 +28,8 @@ async def get_drivers(
     """
     Get all drivers with optional filtering by team.
     """
-    # Build query
-    query = select(Driver)
+    # Build query, loading each driver's team in the same round-trip
+    query = select(Driver).options(joinedload(Driver.team))
     
     # Apply filters
     if team_id:
@@ -40,12 +45,7 @@ async def get_drivers(
     # Convert to response format
     driver_list = []
     for driver in drivers:
-        # Get team info if available
-        team = None
-        if driver.team_id:
-            team_query = select(Team).where(Team.id == driver.team_id)
-            team_result = await db.execute(team_query)
-            team = team_result.scalar_one_or_none()
+        team = driver.team
         
         driver_dict = {
             "id": driver.id,
@@ -65,7 +65,9 @@ async def get_drivers(
 
 
 @router.get("/{driver_id}", response_model=Dict[str, Any])
+@cached_response("drivers")
 async def get_driver_by_id(
+    request: Request,
     driver_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -73,10 +75,9 @@ async def get_driver_by_id(
     """
     Get a driver by ID.
     """
-    # Get driver by ID
-    query = select(Driver).where(Driver.id == driver_id)
-    result = await db.execute(query)
-    driver = result.scalar_one_or_none()
+    # Served from the reference data cache
+    reference = await get_reference_data(db)
+    driver = reference.driver(driver_id)
     
     if not driver:
         raise HTTPException(
@@ -85,25 +86,21 @@ async def get_driver_by_id(
         )
     
     # Get team info if available
-    team = None
-    if driver.team_id:
-        team_query = select(Team).where(Team.id == driver.team_id)
-        team_result = await db.execute(team_query)
-        team = team_result.scalar_one_or_none()
+    team = reference.team(driver["team_id"]) if driver["team_id"] else None
     
     # Build response
     driver_dict = {
-        "id": driver.id,
-        "name": driver.name,
-        "driver_id": driver.driver_id,
-        "number": driver.number,
-        "code": driver.code,
-        "team_id": driver.team_id,
+        "id": driver["id"],
+        "name": driver["name"],
+        "driver_id": driver["driver_id"],
+        "number": driver["number"],
+        "code": driver["code"],
+        "team_id": driver["team_id"],
         "team": {
-            "name": team.name if team else None,
-            "team_id": team.team_id if team else None,
-            "full_name": team.full_name if team else None,
-            "nationality": team.nationality if team else None
+            "name": team["name"],
+            "team_id": team["team_id"],
+            "full_name": team["full_name"],
+            "nationality": team["nationality"]
         } if team else None
     }
     
@@ -149,6 +146,8 @@ async def create_driver(
     db.add(new_driver)
     await db.commit()
     await db.refresh(new_driver)
+    reference_cache.invalidate()
+    await invalidate_responses("drivers", "teams")
     
     # Build response
     driver_dict = {
@@ -203,6 +202,8 @@ async def update_driver(
     
     await db.commit()
     await db.refresh(driver)
+    reference_cache.invalidate()
+    await invalidate_responses("drivers", "teams")
     
     # Build response
     driver_dict = {
@@ -240,5 +241,7 @@ async def delete_driver(
     # Delete driver
     await db.delete(driver)
     await db.commit()
+    reference_cache.invalidate()
+    await invalidate_responses("drivers", "teams")
     
     return None 
\ No newline at end of file
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 from typing import List, Optional, Dict, Any
 import logging
 from datetime import datetime
 
 from app.core.dependencies import get_current_user, get_current_active_superuser
 from app.db.session import get_db
+from app.services.response_cache import cached_response, invalidate_responses
 from app.db.models import Race, Circuit, User
+from app.services.reference_cache import get_reference_data
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
+@cached_response("races")
 async def get_races(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     season: Optional[int] = None,
@@ -25,8 +30,8 @@ async def get_races(
     """
     Get all races with optional filtering by season or circuit.
     """
-    # Build query
-    query = select(Race).order_by(Race.date.desc())
+    # Build query, loading each race's circuit in the same round-trip
+    query = select(Race).options(joinedload(Race.circuit)).order_by(Race.date.desc())
     
     # Apply filters
     if season:
@@ -44,10 +49,7 @@ async def get_races(
     # Convert to response format
     race_list = []
     for race in races:
-        # Get circuit info
-        circuit_query = select(Circuit).where(Circuit.id == race.circuit_id)
-        circuit_result = await db.execute(circuit_query)
-        circuit = circuit_result.scalar_one_or_none()
+        circuit = race.circuit
         
         race_dict = {
             "id": race.id,
@@ -69,7 +71,9 @@ async def get_races(
 
 
 @router.get("/{race_id}", response_model=Dict[str, Any])
+@cached_response("races")
 async def get_race_by_id(
+    request: Request,
     race_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -88,10 +92,9 @@ async def get_race_by_id(
             detail=f"Race with ID {race_id} not found"
         )
     
-    # Get circuit info
-    circuit_query = select(Circuit).where(Circuit.id == race.circuit_id)
-    circuit_result = await db.execute(circuit_query)
-    circuit = circuit_result.scalar_one_or_none()
+    # Get circuit info from the reference data cache
+    reference = await get_reference_data(db)
+    circuit = reference.circuit(race.circuit_id)
     
     # Build response
     race_dict = {
@@ -103,11 +106,11 @@ async def get_race_by_id(
         "date": race.date.isoformat(),
         "weather_data": race.weather_data,
         "circuit": {
-            "name": circuit.name if circuit else None,
-            "location": circuit.location if circuit else None,
-            "country": circuit.country if circuit else None,
-            "length_km": circuit.length_km if circuit else None,
-            "turns": circuit.turns if circuit else None
+            "name": circuit["name"],
+            "location": circuit["location"],
+            "country": circuit["country"],
+            "length_km": circuit["length_km"],
+            "turns": circuit["turns"]
         } if circuit else None,
     }
     
@@ -150,6 +153,7 @@ async def create_race(
     db.add(new_race)
     await db.commit()
     await db.refresh(new_race)
+    await invalidate_responses("races")
     
     # Build response
     race_dict = {
@@ -215,6 +219,7 @@ async def update_race(
     
     await db.commit()
     await db.refresh(race)
+    await invalidate_responses("races")
     
     # Build response
     race_dict = {
@@ -253,5 +258,6 @@ async def delete_race(
     # Delete race
     await db.delete(race)
     await db.commit()
+    await invalidate_responses("races")
     
     return None 
\ No newline at end of file
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 import logging
 
 from app.core.dependencies import get_current_user, get_current_active_superuser
 from app.db.session import get_db
+from app.services.response_cache import cached_response, invalidate_responses
 from app.db.models import Team, Driver, User
+from app.services.reference_cache import get_reference_data, reference_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
+@cached_response("teams")
 async def get_teams(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     nationality: Optional[str] = None,
@@ -23,8 +28,8 @@ async def get_teams(
     """
     Get all teams with optional filtering by nationality.
     """
-    # Build query
-    query = select(Team)
+    # Build query, loading all drivers for the page in one extra round-trip
+    query = select(Team).options(selectinload(Team.drivers))
     
     # Apply filters
     if nationality:
@@ -40,10 +45,7 @@ async def get_teams(
     # Convert to response format
     team_list = []
     for team in teams:
-        # Get drivers for this team
-        drivers_query = select(Driver).where(Driver.team_id == team.id)
-        drivers_result = await db.execute(drivers_query)
-        drivers = drivers_result.scalars().all()
+        drivers = team.drivers
         
         team_dict = {
             "id": team.id,
@@ -67,7 +69,9 @@ async def get_teams(
 
 
 @router.get("/{team_id}", response_model=Dict[str, Any])
+@cached_response("teams")
 async def get_team_by_id(
+    request: Request,
     team_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -75,10 +79,9 @@ async def get_team_by_id(
     """
     Get a team by ID.
     """
-    # Get team by ID
-    query = select(Team).where(Team.id == team_id)
-    result = await db.execute(query)
-    team = result.scalar_one_or_none()
+    # Served from the reference data cache
+    reference = await get_reference_data(db)
+    team = reference.team(team_id)
     
     if not team:
         raise HTTPException(
@@ -86,27 +89,22 @@ async def get_team_by_id(
             detail=f"Team with ID {team_id} not found"
         )
     
-    # Get drivers for this team
-    drivers_query = select(Driver).where(Driver.team_id == team.id)
-    drivers_result = await db.execute(drivers_query)
-    drivers = drivers_result.scalars().all()
-    
     # Build response
     team_dict = {
-        "id": team.id,
-        "name": team.name,
-        "team_id": team.team_id,
-        "full_name": team.full_name,
-        "nationality": team.nationality,
+        "id": team["id"],
+        "name": team["name"],
+        "team_id": team["team_id"],
+        "full_name": team["full_name"],
+        "nationality": team["nationality"],
         "drivers": [
             {
-                "id": driver.id,
-                "name": driver.name,
-                "code": driver.code,
-                "number": driver.number,
-                "driver_id": driver.driver_id
+                "id": driver["id"],
+                "name": driver["name"],
+                "code": driver["code"],
+                "number": driver["number"],
+                "driver_id": driver["driver_id"]
             }
-            for driver in drivers
+            for driver in reference.team_drivers(team["id"])
         ]
     }
     
@@ -140,6 +138,8 @@ async def create_team(
     db.add(new_team)
     await db.commit()
     await db.refresh(new_team)
+    reference_cache.invalidate()
+    await invalidate_responses("teams", "drivers")
     
     # Build response
     team_dict = {
@@ -193,6 +193,8 @@ async def update_team(
     
     await db.commit()
     await db.refresh(team)
+    reference_cache.invalidate()
+    await invalidate_responses("teams", "drivers")
     
     # Build response
     team_dict = {
@@ -240,5 +242,7 @@ async def delete_team(
     # Delete team
     await db.delete(team)
     await db.commit()
+    reference_cache.invalidate()
+    await invalidate_responses("teams", "drivers")
     
     return None 
\ No newline at end of file
@@ -1,21 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Dict, Any
+from pydantic import ValidationError
+from typing import AsyncIterator, List, Optional, Dict, Any, Set, Tuple
+from datetime import datetime
+import json
 import logging
 
 from app.core.dependencies import get_current_user, get_current_active_superuser
 from app.db.session import get_db
 from app.db.models import User, TelemetrySession
+from app.core.config import settings
 from app.schemas.telemetry import (
     TelemetryResponse, 
     TelemetrySessionCreate, 
-    TelemetrySessionResponse
+    TelemetrySessionResponse,
+    TelemetryBulkCreate,
+    TelemetryBulkCreateResponse,
+    TelemetryIngestPoint,
+    TelemetryPage,
+    TelemetryReplayStart,
+    TelemetryReplayControl,
+    TelemetryReplayStatus,
+    LapSummaryResponse,
+    LeaderboardEntry,
+    StintSummary,
+    LapSummaryRebuildResponse,
+    LapComparison,
 )
 from app.services.telemetry_service import (
     get_live_telemetry,
     get_telemetry_session,
     get_telemetry_data,
     create_telemetry_data,
+    bulk_create_telemetry_data,
+    refresh_ingested_summaries,
+    stream_telemetry_data,
+    get_telemetry_page,
+    rebuild_lap_summaries,
+)
+from app.services.lap_summaries import (
+    build_leaderboard,
+    build_stints,
+    get_lap_summaries,
+)
+from app.services.lap_comparison import LapSelection, lap_comparisons
+from app.services.reference_cache import get_reference_data
+from app.services.downsampling import (
+    downsample_rows,
+    resolve_max_points,
+)
+from app.services.telemetry_replay import SessionReplay, replay_manager, replay_session_id
+from app.services.telemetry_export import (
+    EXPORT_ENCODERS,
+    EXPORT_MEDIA_TYPES,
+    arrow_available,
 )
 
 router = APIRouter()
@@ -26,6 +65,10 @@ logger = logging.getLogger(__name__)
 async def get_live_telemetry_data(
     session_id: str,
     driver_id: Optional[str] = None,
+    since_seq: Optional[int] = Query(None, ge=0),
+    resolution: Optional[str] = Query(None, pattern="^(low|medium|high|full)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=20000),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax)$"),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -35,16 +78,30 @@ async def get_live_telemetry_data(
     this would connect to a data source like FastF1 API or a UDP telemetry stream.
     
     For more continuous data streaming, consider using the WebSocket endpoint.
+    
+    Pass `resolution` or `max_points` to downsample to at most that many
+    samples with LTTB or min-max buckets for charting.
+    
+    Every sample carries a sequence number; pass the last one you received
+    as `since_seq` to get only newer samples. `gap` is true when some of
+    them already left the live window, so charts should be reset.
     """
     logger.info(f"Getting live telemetry for session {session_id}")
     
-    telemetry_data = await get_live_telemetry(session_id, driver_id)
+    telemetry_data = await get_live_telemetry(session_id, driver_id, since_seq)
     if not telemetry_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No telemetry data available for this session"
         )
     
+    budget = resolve_max_points(resolution, max_points)
+    if budget is not None:
+        telemetry_data = {
+            **telemetry_data,
+            "data": downsample_rows(telemetry_data["data"], budget, downsample),
+        }
+    
     return telemetry_data
 
 # Get user's telemetry sessions
@@ -154,4 +211,600 @@ async def delete_telemetry_session(
     await db.commit()
     
     logger.info(f"Deleted telemetry session {session_id}")
-    return None 
\ No newline at end of file
+    return None 
+
+
+async def _get_owned_session(
+    db: AsyncSession, session_id: int, current_user: User, action: str = "access"
+) -> TelemetrySession:
+    """
+    Load a telemetry session and check that the current user may use it.
+    """
+    session = await get_telemetry_session(db, session_id)
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Telemetry session not found"
+        )
+    
+    # Check that the session belongs to the current user
+    if session.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this session"
+        )
+    
+    return session
+
+
+def _parse_lap_range(lap: Optional[int], lap_range: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Turn the `lap` / `lap_range` ("first-last") query parameters into a range.
+    """
+    if lap is not None:
+        return (lap, lap)
+    if lap_range is None:
+        return None
+    try:
+        first, last = (int(part) for part in lap_range.split("-", 1))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lap_range must look like 'first-last', e.g. '10-15'"
+        )
+    if first < 1 or first > last:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lap_range must run from a first lap >= 1 to a last lap >= first"
+        )
+    return (first, last)
+
+
+async def _is_known_driver(db: AsyncSession, driver_pk: int) -> bool:
+    """
+    Check a point's driver_id against the drivers table.
+
+    Lookups go through the reference cache; on a miss it is reloaded once,
+    in case the driver was just created on another replica.
+    """
+    reference = await get_reference_data(db)
+    if reference.driver(driver_pk) is not None:
+        return True
+    if reference.is_fresh:
+        reference.invalidate()
+        reference = await get_reference_data(db)
+    return reference.driver(driver_pk) is not None
+
+
+async def _export_chunks(
+    db: AsyncSession, session_id: int, driver_id: Optional[str]
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Stream export chunks from a database session of their own.
+
+    The response body is sent after the endpoint returns, when the request's
+    get_db session may already be closed (FastAPI >= 0.106 exits yield
+    dependencies before streaming), so the cursor gets a dedicated session
+    on the same engine.
+    """
+    async with AsyncSession(db.bind, expire_on_commit=False) as export_db:
+        async for chunk in stream_telemetry_data(export_db, session_id, driver_id):
+            yield chunk
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """
+    Yield non-empty lines from an NDJSON request body as it streams in.
+
+    Lines are split on raw bytes and left undecoded, so a multibyte UTF-8
+    character split across chunks is reassembled before json.loads sees it.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+# Bulk ingest telemetry data points
+@router.post(
+    "/sessions/{session_id}/data",
+    response_model=TelemetryBulkCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def ingest_telemetry_data(
+    session_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk ingest telemetry data points into a session.
+    
+    Accepts either a JSON body shaped like `{"data": [...]}` or an
+    `application/x-ndjson` body with one data point per line. Points are
+    written in batches with a single commit per batch. Points naming an
+    unknown driver are rejected with 422 before their batch is written.
+    """
+    await _get_owned_session(db, session_id, current_user, "write to")
+    
+    content_type = request.headers.get("content-type", "")
+    accepted = 0
+    batches = 0
+    known_drivers: Set[int] = set()
+    
+    try:
+        if "ndjson" in content_type:
+            # Flush as lines arrive so large uploads never sit in memory;
+            # lap summaries are refreshed once after the last batch
+            batch: List[Dict[str, Any]] = []
+            touched: Set[Tuple[int, int]] = set()
+            line_number = 0
+            async for line in _iter_ndjson_lines(request):
+                line_number += 1
+                try:
+                    point = TelemetryIngestPoint.parse_obj(json.loads(line))
+                except (ValueError, ValidationError) as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail=(
+                            f"Invalid telemetry point on line {line_number}: {str(e)} "
+                            f"({accepted} points before it were already accepted)"
+                        )
+                    )
+                if point.driver_id not in known_drivers:
+                    if not await _is_known_driver(db, point.driver_id):
+                        raise HTTPException(
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=(
+                                f"Unknown driver_id {point.driver_id} on line {line_number} "
+                                f"({accepted} points before it were already accepted)"
+                            )
+                        )
+                    known_drivers.add(point.driver_id)
+                batch.append(point.dict())
+                if len(batch) >= settings.TELEMETRY_INGEST_BATCH_SIZE:
+                    rows, written = await bulk_create_telemetry_data(
+                        db, session_id, batch, refresh_summaries=False, touched=touched
+                    )
+                    accepted += rows
+                    batches += written
+                    batch = []
+            rows, written = await bulk_create_telemetry_data(
+                db, session_id, batch, refresh_summaries=False, touched=touched
+            )
+            accepted += rows
+            batches += written
+            await refresh_ingested_summaries(db, session_id, touched)
+        else:
+            try:
+                payload = TelemetryBulkCreate.parse_obj(await request.json())
+            except (ValueError, ValidationError) as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Invalid telemetry payload: {str(e)}"
+                )
+            for index, point in enumerate(payload.data):
+                if point.driver_id in known_drivers:
+                    continue
+                if not await _is_known_driver(db, point.driver_id):
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail=f"Unknown driver_id {point.driver_id} at data[{index}]"
+                    )
+                known_drivers.add(point.driver_id)
+            accepted, batches = await bulk_create_telemetry_data(
+                db, session_id, (point.dict() for point in payload.data)
+            )
+    except HTTPException:
+        await db.rollback()
+        raise
+    
+    logger.info(f"Accepted {accepted} telemetry points for session {session_id}")
+    return {"session_id": session_id, "accepted": accepted, "batches": batches}
+
+
+# Query stored telemetry data
+@router.get("/sessions/{session_id}/data", response_model=TelemetryPage)
+async def query_telemetry_data(
+    session_id: int,
+    driver_id: Optional[str] = None,
+    lap: Optional[int] = None,
+    lap_range: Optional[str] = Query(None, description="Inclusive lap range, e.g. '10-15'"),
+    from_ts: Optional[datetime] = None,
+    to_ts: Optional[datetime] = None,
+    sector: Optional[int] = Query(None, ge=1, le=3),
+    columns: Optional[str] = Query(None, description="Comma-separated channels to return"),
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    resolution: Optional[str] = Query(None, pattern="^(low|medium|high|full)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=20000),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Query a session's stored telemetry with filters and keyset pagination.
+    
+    Pages are ordered by timestamp and continue from the opaque `cursor`
+    returned with the previous page, so deep pages cost the same as the
+    first one.
+    
+    Passing `resolution` or `max_points` returns the whole filtered window
+    in one response instead, downsampled with LTTB or min-max buckets to at
+    most that many rows shared across drivers and channels. Windows of more
+    than TELEMETRY_DOWNSAMPLE_MAX_ROWS samples are refused; narrow them with
+    the lap or time filters.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    
+    filters = {
+        "lap_range": _parse_lap_range(lap, lap_range),
+        "from_ts": from_ts,
+        "to_ts": to_ts,
+        "sector": sector,
+        "columns": [name.strip() for name in columns.split(",")] if columns else None,
+    }
+    budget = resolve_max_points(resolution, max_points)
+    
+    try:
+        if budget is not None:
+            if cursor:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="cursor cannot be combined with downsampling"
+                )
+            max_rows = settings.TELEMETRY_DOWNSAMPLE_MAX_ROWS
+            rows = await get_telemetry_data(db, session_id, driver_id, limit=max_rows + 1, **filters)
+            if len(rows) > max_rows:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"More than {max_rows} samples to downsample; narrow the window with lap or time filters"
+                )
+            rows = downsample_rows(rows, budget, downsample)
+            next_cursor = None
+        else:
+            rows, next_cursor = await get_telemetry_page(
+                db, session_id, driver_id, cursor=cursor, limit=limit, **filters
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {"session_id": session_id, "data": rows, "next_cursor": next_cursor}
+
+
+# Stream a telemetry export
+@router.get("/sessions/{session_id}/export")
+async def export_telemetry_data(
+    session_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+    driver_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Export a session's telemetry as NDJSON, CSV or an Arrow IPC stream.
+    
+    Rows are read through a server-side cursor and encoded chunk by chunk,
+    so memory stays flat and bytes start flowing immediately regardless of
+    session size.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    
+    if format == "arrow" and not arrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arrow export requires pyarrow to be installed"
+        )
+    
+    chunks = _export_chunks(db, session_id, driver_id)
+    filename = f"telemetry_{session_id}.{'arrows' if format == 'arrow' else format}"
+    
+    logger.info(f"Exporting telemetry for session {session_id} as {format}")
+    return StreamingResponse(
+        EXPORT_ENCODERS[format](chunks),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Start replaying a stored session into the live feed
+@router.post(
+    "/sessions/{session_id}/replay",
+    response_model=TelemetryReplayStatus,
+    status_code=status.HTTP_201_CREATED,
+)
+async def start_telemetry_replay(
+    session_id: int,
+    replay: TelemetryReplayStart,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Re-stream a stored session through the live telemetry path.
+    
+    Stored samples are published into the live session `replay-{session_id}`
+    (or `u{user_id}-{live_session_id}` for a custom name) as a virtual
+    clock running at `speed` reaches their timestamps, so
+    `/live/{live_session_id}` and the telemetry WebSocket serve them like
+    live data. Starting a replay into a live session that is already
+    replaying restarts it, unless another user started that replay.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    
+    try:
+        running = await replay_manager.start(
+            session_id,
+            replace_any=current_user.is_superuser,
+            speed=replay.speed,
+            driver_id=replay.driver_id,
+            start_at=replay.start_at,
+            live_session_id=replay_session_id(session_id, current_user.id, replay.live_session_id),
+            user_id=current_user.id,
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    return running.status()
+
+
+def _get_owned_replay(live_session_id: str, current_user: User) -> SessionReplay:
+    """
+    Find a replay running on this worker and check that the current user started it.
+    """
+    replay = replay_manager.get(live_session_id)
+    if replay is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Replay not found"
+        )
+    if replay.user_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to control this replay"
+        )
+    return replay
+
+
+# Get a replay's playback state
+@router.get("/replays/{live_session_id}", response_model=TelemetryReplayStatus)
+async def get_telemetry_replay(
+    live_session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the playback position and state of a running replay.
+    """
+    return _get_owned_replay(live_session_id, current_user).status()
+
+
+# Seek, pause or change the speed of a replay
+@router.patch("/replays/{live_session_id}", response_model=TelemetryReplayStatus)
+async def control_telemetry_replay(
+    live_session_id: str,
+    control: TelemetryReplayControl,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Change a running replay's speed, pause or resume it, or seek to a session time.
+    """
+    replay = _get_owned_replay(live_session_id, current_user)
+    
+    try:
+        if control.speed is not None:
+            replay.set_speed(control.speed)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if control.seek_to is not None:
+        replay.seek(control.seek_to)
+    if control.paused is True:
+        replay.pause()
+    elif control.paused is False:
+        replay.resume()
+    
+    return replay.status()
+
+
+# Stop a replay
+@router.delete("/replays/{live_session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_telemetry_replay(
+    live_session_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stop a running replay. Samples already published stay in the live window.
+    """
+    _get_owned_replay(live_session_id, current_user)
+    await replay_manager.stop(live_session_id)
+    
+    logger.info(f"Stopped replay {live_session_id}")
+    return None
+
+
+async def _session_summaries(
+    db: AsyncSession, session_id: int, driver_id: Optional[str]
+) -> Tuple[List[Any], Dict[int, Optional[str]]]:
+    """
+    Load a session's lap summaries, optionally for one driver code, with driver codes by ID.
+    """
+    reference = await get_reference_data(db)
+    driver_pk = None
+    if driver_id is not None:
+        driver = reference.driver_by_code(driver_id)
+        if driver is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Driver not found"
+            )
+        driver_pk = driver["id"]
+    
+    summaries = await get_lap_summaries(db, session_id, driver_pk)
+    codes = {
+        summary.driver_id: (reference.driver(summary.driver_id) or {}).get("code")
+        for summary in summaries
+    }
+    return summaries, codes
+
+
+# Get per-lap aggregates
+@router.get("/sessions/{session_id}/laps", response_model=List[LapSummaryResponse])
+async def get_session_laps(
+    session_id: int,
+    driver_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get lap and sector times and channel aggregates for each driver lap.
+    
+    Served from the lap summaries kept up to date on ingest rather than
+    from raw samples.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    summaries, codes = await _session_summaries(db, session_id, driver_id)
+    
+    return [
+        {
+            **{column.key: getattr(summary, column.key) for column in summary.__table__.columns},
+            "driver_code": codes[summary.driver_id],
+        }
+        for summary in summaries
+    ]
+
+
+# Get the session leaderboard
+@router.get("/sessions/{session_id}/leaderboard", response_model=List[LeaderboardEntry])
+async def get_session_leaderboard(
+    session_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Rank drivers by best lap, with best sectors, theoretical best and top speed.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    summaries, codes = await _session_summaries(db, session_id, None)
+    
+    return [
+        {**entry, "driver_code": codes[entry["driver_id"]]}
+        for entry in build_leaderboard(summaries)
+    ]
+
+
+# Get tyre stints
+@router.get("/sessions/{session_id}/stints", response_model=List[StintSummary])
+async def get_session_stints(
+    session_id: int,
+    driver_id: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Split each driver's laps into tyre stints with pace and degradation.
+    """
+    await _get_owned_session(db, session_id, current_user)
+    summaries, codes = await _session_summaries(db, session_id, driver_id)
+    
+    return [
+        {**stint, "driver_code": codes[stint["driver_id"]]}
+        for stint in build_stints(summaries)
+    ]
+
+
+# Recompute lap summaries
+@router.post("/sessions/{session_id}/laps/rebuild", response_model=LapSummaryRebuildResponse)
+async def rebuild_session_laps(
+    session_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Recompute a session's lap summaries from its stored telemetry.
+    
+    Only needed for data written before summaries existed or with
+    LAP_SUMMARIES_ON_INGEST disabled.
+    """
+    await _get_owned_session(db, session_id, current_user, "modify")
+    written = await rebuild_lap_summaries(db, session_id)
+    
+    return {"session_id": session_id, "summaries": written}
+
+
+# Compare two laps
+@router.get("/compare", response_model=LapComparison)
+async def compare_telemetry_laps(
+    session_a: int,
+    driver_a: str,
+    lap_a: int,
+    driver_b: str,
+    lap_b: int,
+    session_b: Optional[int] = Query(None, description="Defaults to session_a"),
+    resolution: float = Query(5.0, ge=1.0, le=100.0, description="Distance grid spacing in metres"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Compare two driver laps on a common distance grid.
+    
+    Lap A is the reference. The response carries the cumulative delta time
+    of lap B against it (positive where B is slower) and speed, throttle,
+    brake, rpm and gear traces of both laps with their differences.
+    Repeated comparisons are served from an in-process cache.
+    """
+    session_b = session_a if session_b is None else session_b
+    for session_id in {session_a, session_b}:
+        await _get_owned_session(db, session_id, current_user)
+    
+    reference = await get_reference_data(db)
+    selections = []
+    for session_id, driver_code, lap in ((session_a, driver_a, lap_a), (session_b, driver_b, lap_b)):
+        driver = reference.driver_by_code(driver_code)
+        if driver is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Driver {driver_code} not found"
+            )
+        selections.append(LapSelection(session_id, driver["id"], lap))
+    
+    try:
+        result = await lap_comparisons.compare(db, *selections, resolution=resolution)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        **result,
+        "reference": {"session_id": session_a, "driver_code": driver_a, "lap": lap_a},
+        "target": {"session_id": session_b, "driver_code": driver_b, "lap": lap_b},
+    }
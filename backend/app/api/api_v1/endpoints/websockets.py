@@ -1,103 +1,105 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException
-from fastapi.websockets import WebSocketState
-from typing import Dict, List, Set, Optional, Any
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException, status
+from typing import Dict, List, Optional, Any
 import json
 import logging
-import asyncio
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.dependencies import get_current_user
-from app.services.telemetry_service import (
-    get_live_telemetry, 
-    get_cached_telemetry,
-    create_telemetry_data
-)
-from app.schemas.telemetry import TelemetryResponse
+from app.services.telemetry_service import get_live_telemetry
+from app.services.live_telemetry import live_window
+from app.services.connection_manager import manager
+from app.services.downsampling import downsample_rows
+from app.services.telemetry_push import push_hub
+from app.services.telemetry_codec import negotiate_encoding
+from app.services.reference_cache import load_reference_data
 from app.db.models import User
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Store active connections
-class ConnectionManager:
-    def __init__(self):
-        # Maps: session_id -> set of websockets
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-        # For broadcasting to all: special key "all"
-        self.active_connections["all"] = set()
-    
-    async def connect(self, websocket: WebSocket, session_id: str):
-        await websocket.accept()
-        # Add to specific session group
-        if session_id not in self.active_connections:
-            self.active_connections[session_id] = set()
-        self.active_connections[session_id].add(websocket)
-        # Add to "all" group
-        self.active_connections["all"].add(websocket)
-        logger.info(f"WebSocket connected: {session_id}")
-    
-    def disconnect(self, websocket: WebSocket, session_id: str):
-        # Remove from specific session group
-        if session_id in self.active_connections:
-            self.active_connections[session_id].discard(websocket)
-            if not self.active_connections[session_id]:
-                del self.active_connections[session_id]
-        # Remove from "all" group
-        self.active_connections["all"].discard(websocket)
-        logger.info(f"WebSocket disconnected: {session_id}")
-    
-    async def send_data(self, data: Dict[str, Any], websocket: WebSocket):
-        if websocket.client_state != WebSocketState.DISCONNECTED:
-            await websocket.send_json(data)
-    
-    async def broadcast(self, data: Dict[str, Any], session_id: Optional[str] = None):
-        if session_id:
-            # Broadcast to specific session
-            if session_id in self.active_connections:
-                for connection in self.active_connections[session_id]:
-                    await self.send_data(data, connection)
-        else:
-            # Broadcast to all connections
-            for connection in self.active_connections["all"]:
-                await self.send_data(data, connection)
 
-
-# Create connection manager instance
-manager = ConnectionManager()
+async def _known_driver(driver_id: Optional[str]) -> bool:
+    """
+    Check a stream's driver code against the reference data (None = whole session).
+    """
+    if driver_id is None:
+        return True
+    reference = await load_reference_data()
+    return isinstance(driver_id, str) and reference.driver_by_code(driver_id) is not None
 
 
 @router.websocket("/telemetry/{session_id}")
 async def websocket_telemetry(
     websocket: WebSocket, 
     session_id: str, 
-    driver_id: Optional[str] = None
+    driver_id: Optional[str] = None,
+    since_seq: Optional[int] = None,
+    encoding: Optional[str] = None
 ):
     """
     WebSocket endpoint for receiving real-time telemetry data.
+    
+    Telemetry is pushed as `telemetry_update` messages for the driver given
+    in the query string (or the whole session). Every sample carries a
+    `seq`; a reconnecting client passes its last one as `since_seq` and
+    only receives newer samples. Catch-up messages carry `gap: true` when
+    some of those samples already left the live window, and a slow client
+    whose queued updates were dropped gets an empty update with `gap: true`
+    for that stream; either way it should resubscribe with `since_seq`.
+    Without `since_seq` the first `cached_data` message is a snapshot of the
+    live window, downsampled to WS_INITIAL_MAX_POINTS samples across the
+    session's drivers. Clients only send control messages:
+    
+    - `{"type": "subscribe", "driver_id": "HAM", "since_seq": 120}` adds a driver stream
+    - `{"type": "unsubscribe", "driver_id": "HAM"}` removes one
+    - `{"type": "ping"}` is answered with a pong
+    
+    Driver codes must exist in the reference data, and a connection holds at
+    most WS_MAX_SUBSCRIPTIONS streams; other subscribes get an `error` reply.
+    
+    Server messages are JSON text unless a binary encoding is negotiated with
+    `?encoding=` or the `boxbox.msgpack` / `boxbox.packed` subprotocols:
+    "msgpack" sends every message as MessagePack, "packed" sends telemetry
+    samples as typed binary columns behind a JSON schema header (see
+    app.services.telemetry_codec). Control messages are always JSON text.
     """
-    await manager.connect(websocket, session_id)
+    encoding, subprotocol = negotiate_encoding(
+        encoding, websocket.scope.get("subprotocols", [])
+    )
+    if encoding is None or not await _known_driver(driver_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await manager.connect(websocket, session_id, encoding, subprotocol)
     
     try:
-        # Send initial cached telemetry data
-        cached_data = await get_cached_telemetry(session_id, driver_id)
-        if cached_data:
-            await manager.send_data(
-                {
-                    "type": "cached_data",
-                    "data": cached_data,
-                    "timestamp": datetime.utcnow().isoformat()
-                },
-                websocket
-            )
+        # Send the current window, or only what was missed when resuming
+        initial = await get_live_telemetry(session_id, driver_id, since_seq)
+        if since_seq is None:
+            initial["data"] = downsample_rows(initial["data"], settings.WS_INITIAL_MAX_POINTS)
+        await manager.send_data(
+            {
+                "type": "cached_data",
+                "data": initial,
+                "last_seq": initial["last_seq"],
+                "gap": initial["gap"],
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            websocket
+        )
         
-        # Main loop for receiving and sending data
+        await push_hub.subscribe(websocket, session_id, driver_id, initial["last_seq"])
+        
+        # Updates are pushed by the producers; only handle control messages here
         while True:
-            # Wait for messages from client
             data = await websocket.receive_text()
-            received_data = json.loads(data)
+            try:
+                received_data = json.loads(data)
+            except ValueError:
+                received_data = {}
+            message_type = received_data.get("type")
             
-            # Process client message
-            if received_data.get("type") == "ping":
+            if message_type == "ping":
                 # Respond to ping
                 await manager.send_data(
                     {
@@ -106,28 +108,75 @@ async def websocket_telemetry(
                     },
                     websocket
                 )
-            
-            # Check for new telemetry data every 100ms
-            telemetry_data = await get_live_telemetry(session_id, driver_id)
-            if telemetry_data:
-                # Send updated telemetry
+            elif message_type in ("subscribe", "unsubscribe"):
+                stream_driver_id = received_data.get("driver_id")
+                if message_type == "subscribe":
+                    error = None
+                    if not await _known_driver(stream_driver_id):
+                        error = f"Unknown driver: {stream_driver_id}"
+                    elif not push_hub.can_subscribe(websocket, session_id, stream_driver_id):
+                        error = f"At most {push_hub.max_subscriptions} telemetry subscriptions per connection"
+                    if error:
+                        await manager.send_data(
+                            {
+                                "type": "error",
+                                "message": error,
+                                "timestamp": datetime.utcnow().isoformat()
+                            },
+                            websocket
+                        )
+                        continue
+                    since_seq = received_data.get("since_seq")
+                    if since_seq is None:
+                        # Nothing to catch up on; the producer only needs a baseline
+                        last_seq = await live_window.last_seq(session_id)
+                    else:
+                        catch_up = await get_live_telemetry(session_id, stream_driver_id, since_seq)
+                        last_seq = catch_up["last_seq"]
+                        if catch_up["data"] or catch_up["gap"]:
+                            await manager.send_data(
+                                {
+                                    "type": "telemetry_update",
+                                    "session_id": session_id,
+                                    "driver_id": stream_driver_id,
+                                    "data": catch_up["data"],
+                                    "last_seq": last_seq,
+                                    "gap": catch_up["gap"],
+                                    "timestamp": datetime.utcnow().isoformat()
+                                },
+                                websocket
+                            )
+                    await push_hub.subscribe(websocket, session_id, stream_driver_id, last_seq)
+                else:
+                    await push_hub.unsubscribe(websocket, session_id, stream_driver_id)
                 await manager.send_data(
                     {
-                        "type": "telemetry_update",
-                        "data": telemetry_data,
+                        "type": f"{message_type}d",
+                        "driver_id": stream_driver_id,
+                        "subscriptions": [
+                            key[1] for key in push_hub.subscriptions(websocket)
+                        ],
+                        "timestamp": datetime.utcnow().isoformat()
+                    },
+                    websocket
+                )
+            else:
+                await manager.send_data(
+                    {
+                        "type": "error",
+                        "message": "Unsupported message type",
                         "timestamp": datetime.utcnow().isoformat()
                     },
                     websocket
                 )
-            
-            # Small delay to prevent tight loop
-            await asyncio.sleep(0.1)
     
     except WebSocketDisconnect:
-        manager.disconnect(websocket, session_id)
+        await push_hub.unsubscribe_all(websocket)
+        await manager.disconnect(websocket, session_id)
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
-        manager.disconnect(websocket, session_id)
+        await push_hub.unsubscribe_all(websocket)
+        await manager.disconnect(websocket, session_id)
 
 
 @router.websocket("/broadcast/{session_id}")
@@ -180,10 +229,10 @@ async def websocket_broadcast(
             )
     
     except WebSocketDisconnect:
-        manager.disconnect(websocket, session_id)
+        await manager.disconnect(websocket, session_id)
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
-        manager.disconnect(websocket, session_id)
+        await manager.disconnect(websocket, session_id)
 
 
 # REST endpoint to broadcast a message to all WebSocket clients
@@ -208,7 +257,7 @@ async def broadcast_message(
     # Add timestamp
     message["timestamp"] = datetime.utcnow().isoformat()
     
-    # Broadcast to all clients in the session
-    await manager.broadcast(message, session_id)
+    # Broadcast to all clients in the session, on every replica
+    recipients = await manager.broadcast(message, session_id)
     
-    return {"status": "Message broadcast initiated", "recipients": len(manager.active_connections.get(session_id, set()))} 
\ No newline at end of file
+    return {"status": "Message broadcast initiated", "recipients": recipients} 
\ No newline at end of file
@@ -0,0 +1,205 @@
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import time
+import zlib
+
+from app.core.config import settings
+from app.core.serialization import dumps, loads, packb, unpackb
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# Every encoded payload starts with MAGIC, the format version and the ids of
+# its serializer and compressor. Anything else is a legacy, header-less entry.
+MAGIC = b"\xbc"
+FORMAT_VERSION = 1
+
+SERIALIZERS = {"raw": 0, "orjson": 1, "msgpack": 2}
+COMPRESSORS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_SERIALIZER_NAMES = {v: k for k, v in SERIALIZERS.items()}
+_COMPRESSOR_NAMES = {v: k for k, v in COMPRESSORS.items()}
+
+
+def _available(compression: str) -> bool:
+    if compression == "zstd":
+        return zstandard is not None
+    if compression == "lz4":
+        return lz4_frame is not None
+    return compression in COMPRESSORS
+
+
+def _compress(compression: str, data: bytes, level: Optional[int]) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    if compression == "lz4":
+        return lz4_frame.compress(data, compression_level=level or 0)
+    if compression == "zlib":
+        return zlib.compress(data, 6 if level is None else level)
+    return data
+
+
+def _decompress(compression: str, data: bytes) -> bytes:
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd payload but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compression == "lz4":
+        if lz4_frame is None:
+            raise ValueError("lz4 payload but lz4 is not installed")
+        return lz4_frame.decompress(data)
+    if compression == "zlib":
+        return zlib.decompress(data)
+    return data
+
+
+class CodecStats:
+    """
+    Running totals for compression ratio and codec time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.encoded = 0
+        self.decoded = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def record_encode(self, raw_bytes: int, stored_bytes: int, seconds: float) -> None:
+        with self._lock:
+            self.encoded += 1
+            self.raw_bytes += raw_bytes
+            self.stored_bytes += stored_bytes
+            self.encode_seconds += seconds
+
+    def record_decode(self, seconds: float) -> None:
+        with self._lock:
+            self.decoded += 1
+            self.decode_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "encoded": self.encoded,
+                "decoded": self.decoded,
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": self.stored_bytes,
+                "compression_ratio": (
+                    round(self.raw_bytes / self.stored_bytes, 3) if self.stored_bytes else None
+                ),
+                "avg_encode_ms": (
+                    round(self.encode_seconds * 1000 / self.encoded, 4) if self.encoded else None
+                ),
+                "avg_decode_ms": (
+                    round(self.decode_seconds * 1000 / self.decoded, 4) if self.decoded else None
+                ),
+            }
+
+
+class CacheCodec:
+    """
+    Versioned encoding for cache payloads stored in Redis.
+
+    Objects are serialized with orjson or MessagePack (or passed through as
+    raw bytes) and, above `min_size`, compressed with zstd, lz4 or zlib. The
+    header records which serializer and compressor were used, so entries
+    written under an older configuration stay readable after a change.
+    A configured compressor that is not installed falls back to zlib.
+    """
+
+    def __init__(
+        self,
+        serializer: str = settings.CACHE_CODEC_SERIALIZER,
+        compression: str = settings.CACHE_CODEC_COMPRESSION,
+        level: Optional[int] = settings.CACHE_CODEC_LEVEL,
+        min_size: int = settings.CACHE_CODEC_MIN_SIZE
+    ) -> None:
+        if serializer not in ("orjson", "msgpack"):
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        if not _available(compression):
+            logger.warning(f"{compression} is not installed, compressing cache payloads with zlib")
+            compression = "zlib"
+        self.serializer = serializer
+        self.compression = compression
+        self.level = level
+        self.min_size = min_size
+        self.stats = CodecStats()
+
+    def _frame(self, serializer: str, payload: bytes) -> bytes:
+        started = time.perf_counter()
+        compression = self.compression if len(payload) >= self.min_size else "none"
+        body = _compress(compression, payload, self.level)
+        if len(body) >= len(payload):
+            # Incompressible, store as is
+            compression, body = "none", payload
+        data = MAGIC + bytes(
+            (FORMAT_VERSION, SERIALIZERS[serializer], COMPRESSORS[compression])
+        ) + body
+        self.stats.record_encode(len(payload), len(data), time.perf_counter() - started)
+        return data
+
+    def encode(self, obj: Any) -> bytes:
+        """
+        Serialize and compress an object.
+        """
+        payload = packb(obj) if self.serializer == "msgpack" else dumps(obj)
+        return self._frame(self.serializer, payload)
+
+    def encode_raw(self, payload: bytes) -> bytes:
+        """
+        Compress already serialized bytes, e.g. a JSON response body.
+        """
+        return self._frame("raw", payload)
+
+    def decode(self, data: bytes, legacy: Callable[[bytes], Any] = loads) -> Any:
+        """
+        Decode a payload written by any codec configuration.
+
+        Args:
+            data: Stored bytes
+            legacy: Decoder for header-less entries written before the codec
+
+        Returns:
+            The object, or bytes for payloads stored with encode_raw
+
+        Raises:
+            ValueError: If the payload format or codec is not supported
+        """
+        if not data.startswith(MAGIC):
+            return legacy(data)
+        started = time.perf_counter()
+        version, serializer_id, compressor_id = data[1:4]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache payload version {version}")
+        if compressor_id not in _COMPRESSOR_NAMES or serializer_id not in _SERIALIZER_NAMES:
+            raise ValueError("Unknown cache payload codec")
+        payload = _decompress(_COMPRESSOR_NAMES[compressor_id], data[4:])
+        serializer = _SERIALIZER_NAMES[serializer_id]
+        if serializer == "msgpack":
+            result = unpackb(payload)
+        elif serializer == "orjson":
+            result = loads(payload)
+        else:
+            result = payload
+        self.stats.record_decode(time.perf_counter() - started)
+        return result
+
+
+# Create cache codec instance
+cache_codec = CacheCodec()
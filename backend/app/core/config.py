@@ -21,6 +21,7 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 2  # threads for bcrypt, caps concurrent hashing
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
     
     # Database
@@ -28,6 +29,8 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50  # shared pool size per worker
+    REDIS_SOCKET_TIMEOUT: float = 5.0  # seconds, connect and command timeout
     
     # APIs
     OPENAI_API_KEY: Optional[str] = None
@@ -38,6 +41,54 @@ class Settings(BaseSettings):
     
     # Cache settings
     CACHE_EXPIRATION: int = 3600  # 1 hour in seconds
+    REFERENCE_CACHE_TTL: int = 300  # seconds before drivers/teams/circuits reload
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512  # in-process LRU tier size
+    RESPONSE_CACHE_GENERATION_TTL: float = 1.0  # seconds a replica reuses a namespace generation without Redis
+    RESPONSE_CACHE_REDIS_RETRY: float = 5.0  # seconds cached responses skip Redis after a Redis error
+    USER_CACHE_TTL: int = 60  # authenticated user principals, Redis tier
+    USER_CACHE_LOCAL_TTL: int = 5  # in-process tier, bounds staleness when an invalidation message is missed
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    CACHE_CODEC_SERIALIZER: str = "orjson"  # orjson or msgpack, for payloads cached in Redis
+    CACHE_CODEC_COMPRESSION: str = "zstd"  # zstd, lz4, zlib or none
+    CACHE_CODEC_LEVEL: Optional[int] = None  # compression level, None = codec default
+    CACHE_CODEC_MIN_SIZE: int = 512  # bytes; smaller payloads are stored uncompressed
+    
+    # WebSocket settings
+    BROADCAST_HEARTBEAT_INTERVAL: int = 10  # seconds, worker liveness for recipient counts
+    WS_SEND_QUEUE_SIZE: int = 100  # pending messages per connection
+    WS_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest or coalesce
+    WS_MAX_OVERFLOWS: int = 200  # overflows before a slow client is disconnected, 0 = never
+    TELEMETRY_PUSH_RATE_HZ: float = 10.0  # live telemetry reads/pushes per stream per second
+    WS_BATCH_WINDOW_MS: int = 0  # hold live updates this long to send fewer frames, 0 = every read
+    WS_BATCH_MAX_SAMPLES: int = 0  # flush a held batch early at this many samples, 0 = no limit
+    WS_PER_MESSAGE_DEFLATE: bool = True  # negotiate permessage-deflate (uvicorn via app.main)
+    WS_MAX_SUBSCRIPTIONS: int = 24  # telemetry streams one connection may subscribe to
+    WS_INITIAL_MAX_POINTS: int = 2000  # samples in a socket's first cached_data, downsampled above this
+    LIVE_TELEMETRY_WINDOW: int = 5000  # live samples kept per session/driver stream
+    TELEMETRY_PERSIST_LIVE: bool = False  # copy live streams into telemetry_data
+    TELEMETRY_PERSIST_BATCH_SIZE: int = 500  # stream entries read per persister batch
+    TELEMETRY_PERSIST_CONSUMER: Optional[str] = None  # stable persister consumer name, defaults to the hostname
+    TELEMETRY_PERSIST_CLAIM_IDLE_MS: int = 60000  # take over entries pending this long on another consumer
+    TELEMETRY_SIMULATOR_ENABLED: bool = True  # feed live sessions from the simulator (demo/load tests)
+    TELEMETRY_SIMULATOR_PREFIX: str = "demo-"  # only live session IDs with this prefix are simulated
+    TELEMETRY_SIMULATOR_RATE_HZ: float = 10.0  # simulated samples per car per second
+    TELEMETRY_SIMULATOR_SEED: int = 0  # mixed with the session ID to seed each simulation
+    TELEMETRY_SIMULATOR_MAX_SESSIONS: int = 20  # simulated sessions kept per worker, least recently read evicted
+    TELEMETRY_SIMULATOR_IDLE_SECONDS: float = 300.0  # drop simulated sessions nobody has read for this long
+    TELEMETRY_SIMULATOR_LEASE_SECONDS: float = 30.0  # writer lease, so one worker simulates each session
+    TELEMETRY_REPLAY_MAX_SPEED: float = 50.0  # fastest allowed replay playback multiplier
+    TELEMETRY_REPLAY_PAGE_SIZE: int = 2000  # stored rows read ahead per replay page
+    
+    # Telemetry storage
+    TELEMETRY_INGEST_BATCH_SIZE: int = 1000  # rows per multi-row INSERT
+    TELEMETRY_STORAGE_BACKEND: str = "rows"  # rows or columnar
+    TELEMETRY_BLOCK_MAX_CHUNKS: int = 32  # blocks an open lap may gather before they are compacted
+    TELEMETRY_EXPORT_CHUNK_SIZE: int = 5000  # rows per streamed export chunk
+    TELEMETRY_DOWNSAMPLE_MAX_ROWS: int = 250000  # stored rows read for one downsampled response
+    LAP_SUMMARIES_ON_INGEST: bool = True  # refresh lap summaries of laps that receive samples
+    LAP_COMPARISON_CACHE_SIZE: int = 256  # lap comparisons kept in the in-process LRU
+    FASTF1_CACHE_DIR: str = "fastf1_cache"  # pre-populated FastF1 cache, read offline by the importer
+    FASTF1_IMPORT_WORKERS: int = 4  # processes converting drivers in parallel during imports
     
     @field_validator("DATABASE_URL")
     def validate_database_url(cls, v: Optional[str]) -> str:
@@ -50,7 +101,31 @@ class Settings(BaseSettings):
         if not v or len(v) < 32:
             raise ValueError("SECRET_KEY must be at least 32 characters")
         return v
-    
+
+    @field_validator("TELEMETRY_STORAGE_BACKEND")
+    def validate_telemetry_storage_backend(cls, v: str) -> str:
+        if v not in ("rows", "columnar"):
+            raise ValueError("TELEMETRY_STORAGE_BACKEND must be 'rows' or 'columnar'")
+        return v
+
+    @field_validator("CACHE_CODEC_SERIALIZER")
+    def validate_cache_codec_serializer(cls, v: str) -> str:
+        if v not in ("orjson", "msgpack"):
+            raise ValueError("CACHE_CODEC_SERIALIZER must be 'orjson' or 'msgpack'")
+        return v
+
+    @field_validator("CACHE_CODEC_COMPRESSION")
+    def validate_cache_codec_compression(cls, v: str) -> str:
+        if v not in ("zstd", "lz4", "zlib", "none"):
+            raise ValueError("CACHE_CODEC_COMPRESSION must be 'zstd', 'lz4', 'zlib' or 'none'")
+        return v
+
+    @field_validator("WS_OVERFLOW_POLICY")
+    def validate_ws_overflow_policy(cls, v: str) -> str:
+        if v not in ("drop_oldest", "coalesce"):
+            raise ValueError("WS_OVERFLOW_POLICY must be 'drop_oldest' or 'coalesce'")
+        return v
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -7,10 +7,11 @@ from typing import Optional, Union, Dict, Any
 import logging
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.db.session import get_db
 from app.db.models import User
 from app.schemas.token import TokenPayload
+from app.services.user_cache import user_cache, user_snapshot, snapshot_to_user
 
 # OAuth2 setup for FastAPI
 oauth2_scheme = OAuth2PasswordBearer(
@@ -26,6 +27,9 @@ async def get_current_user(
 ) -> User:
     """
     Validate token and return current user.
+    
+    The principal is served from the user cache when its token version
+    matches the token's `ver` claim, so most requests skip the database.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,24 +45,37 @@ async def get_current_user(
             algorithms=[settings.ALGORITHM]
         )
         
-        # Extract user ID from token
-        user_id: Optional[int] = payload.get("sub")
-        if user_id is None:
+        # Extract user ID and token version from token
+        sub = payload.get("sub")
+        if sub is None:
             logger.warning("Invalid token payload: missing sub field")
             raise credentials_exception
+        user_id = int(sub)
+        token_version = int(payload.get("ver", 0))
     
-    except JWTError as e:
+    except (JWTError, ValueError) as e:
         logger.warning(f"JWT validation error: {str(e)}")
         raise credentials_exception
     
-    # Get user from database
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalars().first()
-    
-    if user is None:
-        logger.warning(f"User not found: {user_id}")
-        raise credentials_exception
+    # Try the user cache first
+    snapshot = await user_cache.get(user_id, token_version)
+    if snapshot is not None:
+        user = snapshot_to_user(snapshot)
+    else:
+        # Get user from database
+        stmt = select(User).where(User.id == user_id)
+        result = await db.execute(stmt)
+        user = result.scalars().first()
+        
+        if user is None:
+            logger.warning(f"User not found: {user_id}")
+            raise credentials_exception
+        
+        if user.token_version != token_version:
+            logger.warning(f"Revoked token for user: {user_id}")
+            raise credentials_exception
+        
+        await user_cache.set(user_snapshot(user))
     
     if not user.is_active:
         logger.warning(f"Inactive user: {user_id}")
@@ -104,7 +121,7 @@ async def authenticate_user(
         user = result.scalars().first()
     
     # Verify user and password
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None
     
     return user 
\ No newline at end of file
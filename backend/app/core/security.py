@@ -1,7 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
+import asyncio
 import secrets
 import string
 
@@ -10,9 +12,37 @@ from app.core.config import settings
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow (~100-300 ms) and releases the GIL, so it runs
+# on a small dedicated pool instead of the event loop. The pool size caps how
+# many hashes run at once; a login burst queues here rather than starving
+# other requests and WebSocket streams.
+_password_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """
+    Shut down the password hashing pool, waiting for queued work.
+    """
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True)
+        _password_executor = None
+
 # Token generation
 def create_access_token(
-    subject: Union[str, int], expires_delta: Optional[timedelta] = None
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    token_version: int = 0
 ) -> str:
     """
     Create a JWT access token.
@@ -20,6 +50,8 @@ def create_access_token(
     Args:
         subject: User ID or other identifier to include in the token
         expires_delta: Optional expiration time, defaults to settings value
+        token_version: User's current token version, tokens with an older
+            version are rejected
         
     Returns:
         JWT token as string
@@ -31,7 +63,7 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "ver": token_version}
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -65,6 +97,37 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash on the password hashing pool.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches hash, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the password hashing pool.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_executor(), get_password_hash, password)
+
+
 def generate_random_password(length: int = 12) -> str:
     """
     Generate a secure random password.
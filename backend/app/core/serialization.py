@@ -0,0 +1,66 @@
+from typing import Any, Union
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+import msgpack
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """
+    Encode types the JSON encoders do not handle natively.
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "tolist"):
+        # numpy scalars and arrays
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode an object as compact UTF-8 JSON, using orjson when available.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def dumps_str(obj: Any) -> str:
+    """
+    Encode an object as compact JSON text, e.g. for a WebSocket text frame.
+    """
+    if orjson is not None:
+        return dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=_default)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode JSON text or bytes.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def packb(obj: Any) -> bytes:
+    """
+    Encode an object as MessagePack, e.g. for a binary WebSocket frame.
+    """
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    """
+    Decode MessagePack bytes.
+    """
+    return msgpack.unpackb(data, raw=False)
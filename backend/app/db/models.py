@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, JSON, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -30,6 +30,8 @@ class User(Base, TimestampMixin):
     hashed_password = Column(String(100), nullable=False)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+    # Bumped on password change or deactivation to revoke issued tokens
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     settings = relationship("UserSettings", back_populates="user", uselist=False)
@@ -154,6 +156,10 @@ class TelemetrySession(Base, TimestampMixin):
     """User telemetry session information."""
     
     __tablename__ = "telemetry_sessions"
+    __table_args__ = (
+        # One session per user and imported source, found again on re-import
+        UniqueConstraint("user_id", "source", name="uq_telemetry_session_source"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -162,18 +168,27 @@ class TelemetrySession(Base, TimestampMixin):
     session_type = Column(String(20))  # Race, Qualifying, FP1, FP2, FP3
     session_date = Column(DateTime(timezone=True), nullable=False)
     notes = Column(Text)
+    source = Column(String(100))  # Import key, e.g. a FastF1 session; NULL for user sessions
     
     # Relationships
     user = relationship("User", back_populates="telemetry_sessions")
     race = relationship("Race", back_populates="telemetry_sessions")
     circuit = relationship("Circuit", back_populates="telemetry_sessions")
     telemetry_data = relationship("TelemetryData", back_populates="session")
+    lap_blocks = relationship("TelemetryLapBlock", back_populates="session")
 
 
 class TelemetryData(Base):
     """Raw telemetry data points."""
     
     __tablename__ = "telemetry_data"
+    __table_args__ = (
+        # Serve per-driver time windows and keyset pages with index range scans
+        Index("ix_telemetry_data_session_driver_ts", "session_id", "driver_id", "timestamp"),
+        Index("ix_telemetry_data_session_lap", "session_id", "lap"),
+        # Seek whole-session replays by time
+        Index("ix_telemetry_data_session_ts", "session_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("telemetry_sessions.id"), nullable=False)
@@ -204,6 +219,82 @@ class TelemetryData(Base):
     driver = relationship("Driver", back_populates="telemetry_data")
 
 
+class TelemetryLapBlock(Base):
+    """
+    Compressed columnar telemetry for one driver lap in a session.
+    
+    Each ingest batch appends its own block for a lap; the blocks of a lap
+    are compacted into one once the driver starts the next lap.
+    """
+    
+    __tablename__ = "telemetry_lap_blocks"
+    __table_args__ = (
+        Index("ix_telemetry_lap_block_lap", "session_id", "driver_id", "lap"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("telemetry_sessions.id"), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=False)
+    lap = Column(Integer, nullable=False)  # 0 for samples without a lap number
+    sample_count = Column(Integer, nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # np.savez_compressed archive
+    
+    # Relationships
+    session = relationship("TelemetrySession", back_populates="lap_blocks")
+    driver = relationship("Driver")
+
+
+class LapSummary(Base):
+    """Per-lap aggregates of a driver's telemetry in a session."""
+    
+    __tablename__ = "lap_summaries"
+    __table_args__ = (
+        UniqueConstraint("session_id", "driver_id", "lap", name="uq_lap_summary"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("telemetry_sessions.id"), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=False)
+    lap = Column(Integer, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    
+    # Timing in seconds; null until the next lap (or sector) has started
+    lap_time = Column(Float)
+    sector1_time = Column(Float)
+    sector2_time = Column(Float)
+    sector3_time = Column(Float)
+    
+    # Channel aggregates
+    speed_min = Column(Float)
+    speed_max = Column(Float)
+    speed_mean = Column(Float)
+    throttle_min = Column(Float)
+    throttle_max = Column(Float)
+    throttle_mean = Column(Float)
+    brake_min = Column(Float)
+    brake_max = Column(Float)
+    brake_mean = Column(Float)
+    rpm_min = Column(Float)
+    rpm_max = Column(Float)
+    rpm_mean = Column(Float)
+    gear_max = Column(Integer)
+    full_throttle_pct = Column(Float)  # share of samples at >= 99% throttle
+    brake_pct = Column(Float)  # share of samples with the brake applied
+    drs_pct = Column(Float)  # share of samples with DRS open
+    
+    # Tyres at the end of the lap
+    tire_compound = Column(String(20))
+    tire_life = Column(Float)
+    
+    # Relationships
+    session = relationship("TelemetrySession")
+    driver = relationship("Driver")
+
+
 class RaceStrategy(Base, TimestampMixin):
     """User-saved race strategies."""
     
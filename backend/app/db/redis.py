@@ -0,0 +1,75 @@
+from typing import List, Optional, Sequence
+import logging
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared connection pool and client, created on startup or first use
+redis_pool: Optional[redis.ConnectionPool] = None
+redis_client: Optional[redis.Redis] = None
+
+
+async def init_redis() -> redis.Redis:
+    """
+    Create the shared Redis connection pool and client.
+
+    Responses are not decoded, so payloads stay bytes end to end; callers
+    decode the few values they need as text.
+    """
+    global redis_pool, redis_client
+    if redis_client is None:
+        try:
+            redis_pool = redis.ConnectionPool.from_url(
+                settings.REDIS_URL,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                health_check_interval=30,
+            )
+            redis_client = redis.Redis(connection_pool=redis_pool)
+            logger.info("Connected to Redis")
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {str(e)}")
+            raise
+    return redis_client
+
+
+async def close_redis() -> None:
+    """
+    Close the shared client and disconnect every pooled connection.
+    """
+    global redis_pool, redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        await redis_pool.disconnect()
+        redis_client = redis_pool = None
+        logger.info("Closed Redis connection pool")
+
+
+async def get_redis_client() -> redis.Redis:
+    """
+    Get the shared Redis client.
+    """
+    if redis_client is None:
+        return await init_redis()
+    return redis_client
+
+
+async def get_many(keys: Sequence[str], client: Optional[redis.Redis] = None) -> List[Optional[bytes]]:
+    """
+    Get several keys in one round-trip.
+
+    Args:
+        keys: Keys to read
+        client: Redis client, defaults to the shared one
+
+    Returns:
+        Values in key order, None for missing keys
+    """
+    if not keys:
+        return []
+    client = client or await get_redis_client()
+    return await client.mget(list(keys))
@@ -7,8 +7,17 @@ from typing import List
 from app.core.config import settings
 from app.api.api_v1.api import api_router
 from app.core.logger import setup_logging
-from app.db.session import create_tables
+from app.db.session import AsyncSessionLocal, create_tables
+from app.db.redis import close_redis, init_redis
+from app.core.cache_codec import cache_codec
 from app.core.dependencies import get_current_user
+from app.core.security import shutdown_password_executor
+from app.services.connection_manager import manager as websocket_manager
+from app.services.telemetry_push import push_hub
+from app.services.telemetry_persistence import live_persister
+from app.services.telemetry_replay import replay_manager
+from app.services.reference_cache import reference_cache
+from app.services.user_cache import user_cache
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -41,6 +50,76 @@ async def startup_db_client():
     logger.info("Database tables created")
 
 
+# Open the shared Redis connection pool on startup
+@app.on_event("startup")
+async def startup_redis():
+    await init_redis()
+
+
+# Warm the reference data cache on startup
+@app.on_event("startup")
+async def startup_reference_cache():
+    try:
+        async with AsyncSessionLocal() as db:
+            await reference_cache.load(db)
+    except Exception as e:
+        # Not fatal: the cache loads lazily on first lookup instead
+        logger.error(f"Failed to warm reference data cache: {str(e)}")
+
+
+# Start cross-replica WebSocket fan-out
+@app.on_event("startup")
+async def startup_broadcast_bus():
+    await websocket_manager.bus.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_broadcast_bus():
+    await push_hub.stop()
+    await websocket_manager.bus.stop()
+
+
+# Share user cache invalidations across replicas
+@app.on_event("startup")
+async def startup_user_cache():
+    await user_cache.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_user_cache():
+    await user_cache.stop()
+
+
+# Persist live telemetry streams when enabled
+@app.on_event("startup")
+async def startup_live_persister():
+    if settings.TELEMETRY_PERSIST_LIVE:
+        await live_persister.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_live_persister():
+    await live_persister.stop()
+
+
+# Stop running telemetry replays on shutdown
+@app.on_event("shutdown")
+async def shutdown_replays():
+    await replay_manager.stop_all()
+
+
+# Stop the password hashing pool on shutdown
+@app.on_event("shutdown")
+async def shutdown_password_hashing():
+    shutdown_password_executor()
+
+
+# Close the Redis pool once everything using it has stopped
+@app.on_event("shutdown")
+async def shutdown_redis():
+    await close_redis()
+
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -62,6 +141,18 @@ async def health_check():
     return JSONResponse(status_code=200, content={"status": "healthy"})
 
 
+# Cache codec metrics for this worker
+@app.get("/metrics/cache", tags=["Health"])
+async def cache_metrics():
+    return JSONResponse(
+        content={
+            "serializer": cache_codec.serializer,
+            "compression": cache_codec.compression,
+            **cache_codec.stats.snapshot(),
+        }
+    )
+
+
 # Protected test endpoint
 @app.get("/protected", tags=["Test"])
 async def protected_route(current_user=Depends(get_current_user)):
@@ -81,4 +172,5 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG_MODE,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
     ) 
\ No newline at end of file
@@ -21,13 +21,51 @@ class TelemetryDataPoint(BaseModel):
     lap: Optional[int] = None
 
 
+class TelemetryIngestPoint(TelemetryDataPoint):
+    """Schema for a telemetry data point submitted for bulk ingestion."""
+    driver_id: int = Field(..., description="Database ID of the driver")
+
+
+class LiveTelemetryPoint(TelemetryDataPoint):
+    """Schema for a live telemetry sample with its sequence number."""
+    seq: Optional[int] = Field(None, description="Monotonic per-session sequence number")
+    driver_id: Optional[str] = None
+
+
+class TelemetryBulkCreate(BaseModel):
+    """Schema for a batch of telemetry data points for one session."""
+    data: List[TelemetryIngestPoint]
+
+
+class TelemetryBulkCreateResponse(BaseModel):
+    """Schema for bulk telemetry ingestion response."""
+    session_id: int
+    accepted: int
+    batches: int
+
+
+class TelemetryPage(BaseModel):
+    """Schema for one keyset-paginated page of stored telemetry."""
+    session_id: int
+    data: List[Dict[str, Any]]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+
+
 class TelemetryResponse(BaseModel):
     """Schema for telemetry data response."""
     session_id: str
     driver_id: Optional[str] = None
-    data: List[TelemetryDataPoint]
+    data: List[LiveTelemetryPoint]
     lap_count: Optional[int] = None
     current_lap: Optional[int] = None
+    last_seq: Optional[int] = Field(
+        None, description="Latest sequence number in the session; pass as `since_seq` to resume"
+    )
+    gap: bool = Field(
+        False, description="Samples after `since_seq` were already trimmed from the live window; reset client state"
+    )
     last_update: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
@@ -50,11 +88,15 @@ class TelemetryResponse(BaseModel):
                         "tire_compound": "medium",
                         "tire_life": 75.5,
                         "sector": 2,
-                        "lap": 24
+                        "lap": 24,
+                        "seq": 1842,
+                        "driver_id": "HAM"
                     }
                 ],
                 "lap_count": 50,
                 "current_lap": 24,
+                "last_seq": 1842,
+                "gap": False,
                 "last_update": "2023-07-09T14:32:10.123456"
             }
         }
@@ -78,7 +120,140 @@ class TelemetrySessionResponse(BaseModel):
     race_id: Optional[int] = None
     session_date: datetime
     notes: Optional[str] = None
+    source: Optional[str] = None
     created_at: datetime
     
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+
+class TelemetryReplayStart(BaseModel):
+    """Schema for starting a replay of a stored telemetry session."""
+    speed: float = Field(1.0, description="Playback speed multiplier, 1 to TELEMETRY_REPLAY_MAX_SPEED")
+    driver_id: Optional[str] = Field(None, description="Only replay this driver (code, e.g. HAM)")
+    start_at: Optional[datetime] = Field(None, description="Session time to start from")
+    live_session_id: Optional[str] = Field(
+        None,
+        pattern="^[A-Za-z0-9_-]{1,64}$",
+        description="Live session name to publish into, scoped to the user as u{user_id}-{name}; "
+        "defaults to replay-{session_id}"
+    )
+
+
+class TelemetryReplayControl(BaseModel):
+    """Schema for changing a running replay."""
+    speed: Optional[float] = None
+    seek_to: Optional[datetime] = Field(None, description="Session time to continue from")
+    paused: Optional[bool] = None
+
+
+class TelemetryReplayStatus(BaseModel):
+    """Schema for a replay's playback state."""
+    session_id: int
+    live_session_id: str
+    driver_id: Optional[str] = None
+    speed: float
+    paused: bool
+    finished: bool
+    position: datetime = Field(..., description="Current session time on the virtual clock")
+    emitted: int = Field(..., description="Samples published into the live session so far")
+
+
+class LapSummaryResponse(BaseModel):
+    """Schema for the aggregates of one driver lap."""
+    driver_id: int
+    driver_code: Optional[str] = None
+    lap: int
+    sample_count: int
+    start_time: datetime
+    end_time: datetime
+    lap_time: Optional[float] = Field(None, description="Seconds; null until the next lap starts")
+    sector1_time: Optional[float] = None
+    sector2_time: Optional[float] = None
+    sector3_time: Optional[float] = None
+    speed_min: Optional[float] = None
+    speed_max: Optional[float] = None
+    speed_mean: Optional[float] = None
+    throttle_min: Optional[float] = None
+    throttle_max: Optional[float] = None
+    throttle_mean: Optional[float] = None
+    brake_min: Optional[float] = None
+    brake_max: Optional[float] = None
+    brake_mean: Optional[float] = None
+    rpm_min: Optional[float] = None
+    rpm_max: Optional[float] = None
+    rpm_mean: Optional[float] = None
+    gear_max: Optional[int] = None
+    full_throttle_pct: Optional[float] = None
+    brake_pct: Optional[float] = None
+    drs_pct: Optional[float] = None
+    tire_compound: Optional[str] = None
+    tire_life: Optional[float] = None
+
+
+class LeaderboardEntry(BaseModel):
+    """Schema for a driver's position on a session leaderboard."""
+    position: int
+    driver_id: int
+    driver_code: Optional[str] = None
+    laps: int
+    best_lap: Optional[int] = None
+    best_lap_time: Optional[float] = None
+    gap: Optional[float] = Field(None, description="Seconds behind the fastest lap")
+    best_sector1_time: Optional[float] = None
+    best_sector2_time: Optional[float] = None
+    best_sector3_time: Optional[float] = None
+    theoretical_best: Optional[float] = Field(None, description="Sum of the best sectors")
+    top_speed: Optional[float] = None
+
+
+class StintSummary(BaseModel):
+    """Schema for one tyre stint of a driver."""
+    driver_id: int
+    driver_code: Optional[str] = None
+    stint: int
+    tire_compound: Optional[str] = None
+    first_lap: int
+    last_lap: int
+    laps: int
+    start_tire_life: Optional[float] = None
+    end_tire_life: Optional[float] = None
+    best_lap_time: Optional[float] = None
+    mean_lap_time: Optional[float] = None
+    degradation: Optional[float] = Field(None, description="Lap time change in seconds per lap")
+
+
+class LapSummaryRebuildResponse(BaseModel):
+    """Schema for a lap summary rebuild result."""
+    session_id: int
+    summaries: int
+
+
+class LapComparisonSide(BaseModel):
+    """Schema for one lap of a comparison."""
+    session_id: int
+    driver_code: str
+    lap: int
+
+
+class LapComparisonChannel(BaseModel):
+    """Schema for one channel resampled onto the comparison distance grid."""
+    reference: List[Optional[float]]
+    target: List[Optional[float]]
+    difference: List[Optional[float]] = Field(..., description="Target minus reference")
+
+
+class LapComparison(BaseModel):
+    """Schema for a driver-vs-driver lap comparison."""
+    reference: LapComparisonSide
+    target: LapComparisonSide
+    lap_length: float = Field(..., description="Reference lap length in metres")
+    reference_time: float
+    target_time: float
+    distance: List[float] = Field(..., description="Distance grid in metres")
+    delta: List[Optional[float]] = Field(
+        ..., description="Cumulative time of the target lap minus the reference lap, in seconds"
+    )
+    position_x: List[Optional[float]]
+    position_y: List[Optional[float]]
+    channels: Dict[str, LapComparisonChannel]
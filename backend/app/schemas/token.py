@@ -12,6 +12,7 @@ class TokenPayload(BaseModel):
     """Token payload schema."""
     sub: Optional[int] = None
     exp: Optional[int] = None
+    ver: int = 0
 
 
 class LoginRequest(BaseModel):
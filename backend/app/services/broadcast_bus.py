@@ -0,0 +1,215 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.serialization import dumps, loads
+from app.db.redis import get_many, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+WORKER_PREFIX = "ws:worker:"
+
+# Delivers a message to this worker's sockets for a session, returns sockets reached
+Deliver = Callable[[Dict[str, Any], str], Awaitable[int]]
+
+
+class BroadcastBus:
+    """
+    Redis pub/sub fan-out for WebSocket broadcasts across replicas.
+
+    Each worker subscribes to a session channel once, while it has local
+    connections for that session, and forwards published messages to its
+    own sockets. Workers also record their local connection counts in a
+    Redis hash so publish() can report recipients across every replica;
+    counts from workers whose heartbeat has expired are ignored.
+
+    Without Redis the bus falls back to local delivery only. Buses for
+    other purposes pass their own `namespace` so their channels never mix
+    with WebSocket sessions.
+    """
+
+    def __init__(
+        self,
+        deliver: Deliver,
+        redis_client: Optional[redis.Redis] = None,
+        worker_id: Optional[str] = None,
+        namespace: str = "ws"
+    ) -> None:
+        self.deliver = deliver
+        self.channel_prefix = f"{namespace}:broadcast:"
+        self.recipients_prefix = f"{namespace}:recipients:"
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._redis = redis_client
+        self._pubsub = None
+        self._local_counts: Dict[str, int] = {}
+        self._has_subscriptions: Optional[asyncio.Event] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    def _worker_key(self) -> str:
+        return f"{WORKER_PREFIX}{self.worker_id}"
+
+    async def start(self) -> None:
+        """
+        Connect to Redis and start the listener and heartbeat tasks.
+        """
+        if self.running:
+            return
+        try:
+            if self._redis is None:
+                self._redis = await get_redis_client()
+            await self._redis.set(
+                self._worker_key(), 1, ex=settings.BROADCAST_HEARTBEAT_INTERVAL * 3
+            )
+        except Exception as e:
+            logger.error(f"Redis unavailable, WebSocket broadcasts stay local: {str(e)}")
+            return
+
+        self._pubsub = self._redis.pubsub()
+        self._has_subscriptions = asyncio.Event()
+        for session_id in list(self._local_counts):
+            await self._subscribe(session_id)
+        self._listener = asyncio.create_task(self._listen())
+        self._heartbeat = asyncio.create_task(self._beat())
+        logger.info(f"Broadcast bus started for worker {self.worker_id}")
+
+    async def stop(self) -> None:
+        """
+        Stop the bus and withdraw this worker's connection counts.
+        """
+        if not self.running:
+            return
+        for task in (self._listener, self._heartbeat):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._listener = self._heartbeat = None
+
+        try:
+            for session_id in self._local_counts:
+                await self._redis.hdel(f"{self.recipients_prefix}{session_id}", self.worker_id)
+            await self._redis.delete(self._worker_key())
+            await self._pubsub.reset()
+        except Exception as e:
+            logger.error(f"Error stopping broadcast bus: {str(e)}")
+        self._pubsub = None
+        logger.info(f"Broadcast bus stopped for worker {self.worker_id}")
+
+    async def _subscribe(self, session_id: str) -> None:
+        await self._pubsub.subscribe(f"{self.channel_prefix}{session_id}")
+        await self._redis.hset(
+            f"{self.recipients_prefix}{session_id}", self.worker_id, self._local_counts[session_id]
+        )
+        self._has_subscriptions.set()
+
+    async def set_local_count(self, session_id: str, count: int) -> None:
+        """
+        Record how many sockets this worker holds for a session.
+
+        Subscribes to the session channel when the first socket joins and
+        unsubscribes when the last one leaves.
+        """
+        previous = self._local_counts.get(session_id, 0)
+        if count:
+            self._local_counts[session_id] = count
+        else:
+            self._local_counts.pop(session_id, None)
+
+        if not self.running:
+            return
+        key = f"{self.recipients_prefix}{session_id}"
+        try:
+            if count and not previous:
+                await self._subscribe(session_id)
+            elif count:
+                await self._redis.hset(key, self.worker_id, count)
+            elif previous:
+                await self._redis.hdel(key, self.worker_id)
+                await self._pubsub.unsubscribe(f"{self.channel_prefix}{session_id}")
+        except Exception as e:
+            logger.error(f"Broadcast bus error updating session {session_id}: {str(e)}")
+
+    async def publish(self, session_id: str, message: Dict[str, Any]) -> int:
+        """
+        Broadcast a message to every socket in a session on every replica.
+
+        Args:
+            session_id: Session to broadcast to ("all" for every socket)
+            message: JSON-serializable message
+
+        Returns:
+            Number of sockets the message is addressed to across replicas
+        """
+        if not self.running:
+            return await self.deliver(message, session_id)
+        try:
+            await self._redis.publish(f"{self.channel_prefix}{session_id}", dumps(message))
+        except Exception as e:
+            logger.error(f"Redis publish failed, broadcasting locally: {str(e)}")
+            return await self.deliver(message, session_id)
+        return await self.recipient_count(session_id)
+
+    async def recipient_count(self, session_id: str) -> int:
+        """
+        Count sockets subscribed to a session across live workers.
+        """
+        try:
+            counts = await self._redis.hgetall(f"{self.recipients_prefix}{session_id}")
+            if not counts:
+                return 0
+            workers = [
+                worker.decode("utf-8") if isinstance(worker, bytes) else worker for worker in counts
+            ]
+            counts = dict(zip(workers, counts.values()))
+            alive = await get_many([f"{WORKER_PREFIX}{worker}" for worker in workers], client=self._redis)
+        except Exception as e:
+            logger.error(f"Redis error counting recipients: {str(e)}")
+            return self._local_counts.get(session_id, 0)
+        return sum(int(counts[worker]) for worker, beat in zip(workers, alive) if beat is not None)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self._has_subscriptions.wait()
+                if not self._pubsub.subscribed:
+                    self._has_subscriptions.clear()
+                    continue
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message is None:
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                await self.deliver(loads(message["data"]), channel[len(self.channel_prefix):])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast bus listener error: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.BROADCAST_HEARTBEAT_INTERVAL)
+            try:
+                await self._redis.set(
+                    self._worker_key(), 1, ex=settings.BROADCAST_HEARTBEAT_INTERVAL * 3
+                )
+                # Re-assert counts so they survive a Redis restart
+                for session_id, count in self._local_counts.items():
+                    await self._redis.hset(f"{self.recipients_prefix}{session_id}", self.worker_id, count)
+            except Exception as e:
+                logger.error(f"Broadcast bus heartbeat failed: {str(e)}")
@@ -0,0 +1,286 @@
+from typing import Any, Deque, Dict, Iterable, NamedTuple, Optional, Set, Tuple, Union
+from collections import deque
+from datetime import datetime
+import asyncio
+import logging
+
+from fastapi import WebSocket
+from fastapi.websockets import WebSocketState
+
+from app.core.config import settings
+from app.core.serialization import dumps_str, packb
+from app.services.broadcast_bus import BroadcastBus
+from app.services.telemetry_codec import PACKED_TYPES, encode_packed
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to clients that cannot keep up ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class Frame(NamedTuple):
+    """
+    A message encoded once and shared by every socket it is sent to.
+
+    `stream` is the (session_id, driver_id) of a telemetry_update, whose
+    samples are lost if the frame is dropped.
+    """
+    type: Optional[str]
+    data: Union[str, bytes]
+    stream: Optional[Tuple[Any, Optional[str]]] = None
+
+
+def encode_frame(message: Dict[str, Any], encoding: str = "json") -> Frame:
+    """
+    Encode a message for a socket's negotiated encoding.
+
+    "msgpack" sends every message as a binary MessagePack frame. "packed"
+    sends telemetry samples as binary columns and everything else
+    as JSON text.
+    """
+    message_type = message.get("type")
+    stream = None
+    if message_type == "telemetry_update":
+        stream = (message.get("session_id"), message.get("driver_id"))
+    if encoding == "msgpack":
+        return Frame(message_type, packb(message), stream)
+    if encoding == "packed" and message_type in PACKED_TYPES:
+        return Frame(message_type, encode_packed(message), stream)
+    return Frame(message_type, dumps_str(message), stream)
+
+
+class ClientConnection:
+    """
+    A WebSocket with a bounded send queue drained by its own writer task.
+
+    Enqueuing never blocks, so a slow client only delays itself. When the
+    queue is full the overflow policy applies: "drop_oldest" discards the
+    oldest pending message, "coalesce" replaces the newest pending message
+    of the same type and stream (e.g. an older telemetry_update for the same
+    driver) with the new one. A client that overflows max_overflows times
+    without draining its queue is disconnected.
+
+    Telemetry updates only carry new samples, so dropping one loses them.
+    The client is then sent an empty telemetry_update with `gap: true` for
+    that stream, before the stream's next frame or once the queue drains,
+    and resyncs with `since_seq`.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        encoding: str = "json",
+        maxsize: int = settings.WS_SEND_QUEUE_SIZE,
+        policy: str = settings.WS_OVERFLOW_POLICY,
+        max_overflows: int = settings.WS_MAX_OVERFLOWS
+    ) -> None:
+        self.websocket = websocket
+        self.encoding = encoding
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_overflows = max_overflows
+        self.queue: Deque[Frame] = deque()
+        self.overflows = 0
+        self.dropped = 0
+        self.gaps: Set[Tuple[Any, Optional[str]]] = set()
+        self.closed = False
+        self._close_requested = False
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._write())
+
+    def enqueue(self, frame: Frame) -> bool:
+        """
+        Queue an encoded frame for sending.
+
+        Returns:
+            False if the connection no longer accepts messages
+        """
+        if self.closed:
+            return False
+
+        if len(self.queue) >= self.maxsize:
+            self.overflows += 1
+            self.dropped += 1
+            self._make_room(frame)
+            if self.max_overflows and self.overflows >= self.max_overflows:
+                logger.warning(f"Disconnecting slow WebSocket client after {self.overflows} overflows")
+                self.closed = True
+                self._close_requested = True
+                self._ready.set()
+                return False
+
+        self.queue.append(frame)
+        self._ready.set()
+        return True
+
+    def _make_room(self, frame: Frame) -> None:
+        dropped = None
+        if self.policy == "coalesce":
+            for index in range(len(self.queue) - 1, -1, -1):
+                pending = self.queue[index]
+                if pending.type == frame.type and pending.stream == frame.stream:
+                    dropped = pending
+                    del self.queue[index]
+                    break
+        if dropped is None:
+            dropped = self.queue.popleft()
+        if dropped.stream is not None:
+            self.gaps.add(dropped.stream)
+
+    def _gap_frame(self, stream: Tuple[Any, Optional[str]]) -> Frame:
+        session_id, driver_id = stream
+        self.gaps.discard(stream)
+        return encode_frame(
+            {
+                "type": "telemetry_update",
+                "session_id": session_id,
+                "driver_id": driver_id,
+                "data": [],
+                "gap": True,
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            self.encoding
+        )
+
+    async def _send(self, frame: Frame) -> None:
+        if isinstance(frame.data, bytes):
+            await self.websocket.send_bytes(frame.data)
+        else:
+            await self.websocket.send_text(frame.data)
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                if self._close_requested:
+                    self.queue.clear()
+                    await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+                    return
+                if not self.queue:
+                    if self.gaps:
+                        # Streams that had samples dropped and sent nothing since
+                        await self._send(self._gap_frame(next(iter(self.gaps))))
+                        continue
+                    # Caught up, so past overflows no longer count
+                    self.overflows = 0
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                frame = self.queue.popleft()
+                if self.websocket.client_state == WebSocketState.DISCONNECTED:
+                    self.closed = True
+                    return
+                if frame.stream in self.gaps:
+                    await self._send(self._gap_frame(frame.stream))
+                await self._send(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"WebSocket writer stopped: {str(e)}")
+            self.closed = True
+
+    async def aclose(self) -> None:
+        """
+        Stop the writer task, discarding pending messages.
+        """
+        self.closed = True
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+
+
+class ConnectionManager:
+    def __init__(self):
+        # Maps: session_id -> set of websockets
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # For broadcasting to all: special key "all"
+        self.active_connections["all"] = set()
+        # Per-socket send queues and writer tasks
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # Fans broadcasts out to the other replicas through Redis
+        self.bus = BroadcastBus(self.local_broadcast)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        encoding: str = "json",
+        subprotocol: Optional[str] = None
+    ):
+        await websocket.accept(subprotocol=subprotocol)
+        self.clients[websocket] = ClientConnection(websocket, encoding)
+        # Add to specific session group
+        if session_id not in self.active_connections:
+            self.active_connections[session_id] = set()
+        self.active_connections[session_id].add(websocket)
+        # Add to "all" group
+        self.active_connections["all"].add(websocket)
+        await self._update_bus(session_id)
+        logger.info(f"WebSocket connected: {session_id}")
+
+    async def disconnect(self, websocket: WebSocket, session_id: str):
+        # Remove from specific session group
+        if session_id in self.active_connections:
+            self.active_connections[session_id].discard(websocket)
+            if not self.active_connections[session_id] and session_id != "all":
+                del self.active_connections[session_id]
+        # Remove from "all" group
+        self.active_connections["all"].discard(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            await client.aclose()
+        await self._update_bus(session_id)
+        logger.info(f"WebSocket disconnected: {session_id}")
+
+    async def _update_bus(self, session_id: str):
+        await self.bus.set_local_count(session_id, len(self.active_connections.get(session_id, ())))
+        if session_id != "all":
+            await self.bus.set_local_count("all", len(self.active_connections["all"]))
+
+    async def send_data(self, data: Dict[str, Any], websocket: WebSocket):
+        """
+        Queue a message for one socket, in order with broadcasts to it.
+        """
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(encode_frame(data, client.encoding))
+        elif websocket.client_state != WebSocketState.DISCONNECTED:
+            await websocket.send_text(dumps_str(data))
+
+    async def send_many(self, data: Dict[str, Any], websockets: Iterable[WebSocket]) -> int:
+        """
+        Queue a message for several sockets, returning how many accepted it.
+
+        The message is encoded once per encoding in use and the same frame is
+        queued for every socket. Never waits on a socket, so latency does not
+        depend on slow clients.
+        """
+        frames: Dict[str, Frame] = {}
+        accepted = 0
+        for websocket in websockets:
+            client = self.clients.get(websocket)
+            if client is None:
+                continue
+            frame = frames.get(client.encoding)
+            if frame is None:
+                frame = frames[client.encoding] = encode_frame(data, client.encoding)
+            if client.enqueue(frame):
+                accepted += 1
+        return accepted
+
+    async def local_broadcast(self, data: Dict[str, Any], session_id: str = "all") -> int:
+        """
+        Queue a message for this worker's sockets in a session, returning how many accepted it.
+        """
+        return await self.send_many(data, self.active_connections.get(session_id, ()))
+
+    async def broadcast(self, data: Dict[str, Any], session_id: Optional[str] = None) -> int:
+        """
+        Broadcast to a session (or every socket) on all replicas, returning the recipient count.
+        """
+        return await self.bus.publish(session_id or "all", data)
+
+
+# Create connection manager instance
+manager = ConnectionManager()
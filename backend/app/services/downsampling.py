@@ -0,0 +1,244 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Channels that drive point selection when downsampling chart traces
+DEFAULT_CHANNELS = ("speed", "throttle", "brake", "rpm", "gear")
+
+# Named resolutions accepted by the `resolution=` query parameter
+RESOLUTION_POINTS: Dict[str, Optional[int]] = {
+    "low": 200,
+    "medium": 500,
+    "high": 1000,
+    "full": None,
+}
+
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def resolve_max_points(
+    resolution: Optional[str] = None, max_points: Optional[int] = None
+) -> Optional[int]:
+    """
+    Work out the response's point budget from `max_points` or a named resolution.
+
+    Raises:
+        ValueError: If the resolution name is unknown
+    """
+    if max_points is not None:
+        return max_points
+    if resolution is None:
+        return None
+    if resolution not in RESOLUTION_POINTS:
+        raise ValueError(
+            f"Unknown resolution '{resolution}', expected one of: "
+            f"{', '.join(RESOLUTION_POINTS)}"
+        )
+    return RESOLUTION_POINTS[resolution]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select point indices with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket, which keeps local
+    extremes such as braking spikes.
+
+    Args:
+        x: Monotonic x values (e.g. seconds)
+        y: Values to preserve the shape of
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices into x/y
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Integer bucket edges over the interior points [1, n - 1); every bucket
+    # holds at least one point because threshold < n
+    edges = 1 + (np.arange(threshold - 1) * (n - 2)) // (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select point indices by keeping the minimum and maximum of each bucket.
+
+    Fully vectorized: points are assigned to (threshold - 2) // 2
+    equal-width x buckets and sorted by (bucket, value), so the first and
+    last entry of each bucket run are its extremes. With the first and last
+    points this keeps at most `threshold` points.
+
+    Args:
+        x: Monotonic x values (e.g. seconds)
+        y: Values to preserve the envelope of
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices into x/y
+    """
+    n = len(x)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+
+    n_buckets = max((threshold - 2) // 2, 1)
+    span = x[-1] - x[0]
+    if span <= 0:
+        buckets = (np.arange(n) * n_buckets) // n
+    else:
+        buckets = np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    boundaries = np.flatnonzero(np.diff(sorted_buckets)) + 1
+    firsts = np.concatenate(([0], boundaries))
+    lasts = np.concatenate((boundaries - 1, [n - 1]))
+
+    return np.unique(np.concatenate((order[firsts], order[lasts], [0, n - 1])))
+
+
+_SELECTORS = {
+    "lttb": lttb_indices,
+    "minmax": minmax_indices,
+}
+
+
+def _epoch_seconds(value: Any) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def _trace_indices(
+    rows: List[Dict[str, Any]], max_points: int, method: str, channels: Tuple[str, ...]
+) -> np.ndarray:
+    """
+    Select at most max_points row indices for a single driver trace.
+
+    The budget, less the first and last rows, is split evenly across the
+    channels. If the union of the channel selections still comes out over
+    budget (tiny budgets, many channels) it is thinned evenly.
+    """
+    x = np.fromiter(
+        (_epoch_seconds(row["timestamp"]) for row in rows), dtype=np.float64, count=len(rows)
+    )
+    select = _SELECTORS[method]
+    keep = [np.array([0, len(rows) - 1])]
+    per_channel = max((max_points - 2) // max(len(channels), 1), 3)
+
+    for channel in channels:
+        y = np.fromiter(
+            (np.nan if row.get(channel) is None else row[channel] for row in rows),
+            dtype=np.float64,
+            count=len(rows),
+        )
+        finite = np.flatnonzero(np.isfinite(y))
+        if len(finite) == 0:
+            continue
+        keep.append(finite[select(x[finite], y[finite], per_channel)])
+
+    selected = np.unique(np.concatenate(keep))
+    if len(selected) > max_points:
+        selected = selected[np.unique(np.linspace(0, len(selected) - 1, max_points).round().astype(np.int64))]
+    return selected
+
+
+def split_budget(lengths: List[int], max_points: int) -> List[int]:
+    """
+    Share a point budget between traces of the given lengths.
+
+    Short traces keep all their points and leave the rest of their share to
+    the longer ones. Every trace gets at least its first and last points,
+    so more than two points per trace are needed for the total to stay
+    within max_points.
+    """
+    budgets = [0] * len(lengths)
+    remaining = max_points
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    for position, i in enumerate(order):
+        share = remaining // (len(lengths) - position)
+        budgets[i] = min(lengths[i], max(share, 2))
+        remaining -= budgets[i]
+    return budgets
+
+
+def downsample_rows(
+    rows: List[Dict[str, Any]],
+    max_points: int,
+    method: str = "lttb",
+    channels: Iterable[str] = DEFAULT_CHANNELS,
+) -> List[Dict[str, Any]]:
+    """
+    Downsample time-ordered telemetry rows for charting.
+
+    max_points bounds the rows returned. It is shared between the drivers'
+    traces (see split_budget), and each trace is reduced independently:
+    points are selected per channel from an even split of the trace's
+    budget and the union of the selections is returned, so every kept row
+    still carries all of its channels.
+
+    Args:
+        rows: Telemetry row mappings ordered by timestamp
+        max_points: Maximum number of rows to return
+        method: "lttb" or "minmax"
+        channels: Channels used to pick points
+
+    Returns:
+        Subset of rows in their original order
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in _SELECTORS:
+        raise ValueError(
+            f"Unknown downsampling method '{method}', expected one of: "
+            f"{', '.join(DOWNSAMPLING_METHODS)}"
+        )
+
+    traces: Dict[Any, List[int]] = {}
+    for index, row in enumerate(rows):
+        traces.setdefault(row.get("driver_id"), []).append(index)
+
+    if len(rows) <= max_points:
+        return rows
+
+    channels = tuple(channels)
+    kept: List[int] = []
+    budgets = split_budget([len(indices) for indices in traces.values()], max_points)
+    for indices, budget in zip(traces.values(), budgets):
+        if len(indices) <= budget:
+            kept.extend(indices)
+            continue
+        trace = [rows[i] for i in indices]
+        selected = _trace_indices(trace, budget, method, channels)
+        kept.extend(np.asarray(indices)[selected].tolist())
+
+    kept.sort()
+    logger.debug(f"Downsampled {len(rows)} telemetry rows to {len(kept)} with {method}")
+    return [rows[i] for i in kept]
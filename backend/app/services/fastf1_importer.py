@@ -0,0 +1,389 @@
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import logging
+import multiprocessing
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models import Driver, TelemetrySession
+from app.db.session import AsyncSessionLocal
+from app.services.reference_cache import get_reference_data, reference_cache
+from app.services.telemetry_columnar import arrays_to_rows
+from app.services.telemetry_service import bulk_create_telemetry_data, get_stored_laps
+
+logger = logging.getLogger(__name__)
+
+# FastF1 reports DRS as a status code; these mean the flap is open
+DRS_OPEN_CODES = (10, 12, 14)
+
+# FastF1 positions are in 1/10 m
+POSITION_SCALE = 0.1
+
+
+def _missing(value: Any) -> bool:
+    # NaN and NaT are the only values not equal to themselves
+    return value is None or value != value
+
+
+def lap_arrays(
+    telemetry: Mapping[str, Any],
+    compound: Optional[str] = None,
+    tyre_life: Optional[float] = None,
+    sector_times: Tuple[Optional[np.timedelta64], Optional[np.timedelta64]] = (None, None)
+) -> Dict[str, np.ndarray]:
+    """
+    Convert one lap of merged FastF1 car and position data to lap block channels.
+
+    Args:
+        telemetry: `Lap.get_telemetry()` frame, or any mapping of its columns
+            (Date, SessionTime, Speed, Throttle, Brake, nGear, RPM, DRS, X, Y, Z)
+        compound: Tyre compound of the lap
+        tyre_life: Tyre age in laps at the lap
+        sector_times: Session times at which sectors 1 and 2 ended
+
+    Returns:
+        Channel arrays in the telemetry_columnar block layout
+    """
+    timestamps = np.asarray(telemetry["Date"]).astype("datetime64[us]").astype(np.int64)
+    count = len(timestamps)
+
+    arrays: Dict[str, np.ndarray] = {"timestamp": timestamps}
+    arrays["speed"] = np.asarray(telemetry["Speed"], dtype=np.float64)
+    arrays["throttle"] = np.asarray(telemetry["Throttle"], dtype=np.float64)
+    arrays["brake"] = np.asarray(telemetry["Brake"], dtype=np.float64) * 100.0
+    arrays["rpm"] = np.asarray(telemetry["RPM"], dtype=np.float64)
+    arrays["gear"] = np.asarray(telemetry["nGear"], dtype=np.float64)
+    drs = np.asarray(telemetry["DRS"], dtype=np.float64)
+    arrays["drs"] = np.where(np.isnan(drs), np.nan, np.isin(drs, DRS_OPEN_CODES))
+    for axis in ("x", "y", "z"):
+        arrays[f"position_{axis}"] = np.asarray(telemetry[axis.upper()], dtype=np.float64) * POSITION_SCALE
+    arrays["tire_life"] = np.full(count, np.nan if tyre_life is None else float(tyre_life))
+    arrays["tire_compound"] = np.full(count, (compound or "").lower())
+
+    # Sector boundaries come from the lap timing; unknown ones are left out
+    session_time = np.asarray(telemetry["SessionTime"]).astype("timedelta64[us]")
+    boundaries = [
+        np.timedelta64(bound).astype("timedelta64[us]")
+        for bound in sector_times
+        if not _missing(bound)
+    ]
+    if len(boundaries) == 2:
+        arrays["sector"] = 1.0 + np.searchsorted(np.array(boundaries), session_time, side="right")
+    else:
+        arrays["sector"] = np.full(count, np.nan)
+
+    return arrays
+
+
+# FastF1 sessions loaded by this worker process, reused across driver tasks
+_loaded_sessions: Dict[Tuple[Any, ...], Any] = {}
+
+
+def _load_session(cache_dir: str, year: int, round_number: int, identifier: str, telemetry: bool) -> Any:
+    key = (cache_dir, year, round_number, identifier, telemetry)
+    if key not in _loaded_sessions:
+        import fastf1
+
+        fastf1.set_log_level("WARNING")
+        fastf1.Cache.enable_cache(cache_dir)
+        # Never reach for the network; everything must already be cached
+        fastf1.Cache.offline_mode(True)
+        session = fastf1.get_session(year, round_number, identifier)
+        session.load(laps=True, telemetry=telemetry, weather=False, messages=False)
+        _loaded_sessions.clear()
+        _loaded_sessions[key] = session
+    return _loaded_sessions[key]
+
+
+def describe_session(cache_dir: str, year: int, round_number: int, identifier: str) -> Dict[str, Any]:
+    """
+    Read a cached session's drivers and lap numbers, without telemetry.
+
+    Runs in a worker process so the importer itself never imports FastF1.
+    """
+    session = _load_session(cache_dir, year, round_number, identifier, telemetry=False)
+    drivers = []
+    for number in session.drivers:
+        info = session.get_driver(number)
+        laps = session.laps.pick_driver(number)["LapNumber"].dropna()
+        drivers.append({
+            "number": int(number),
+            "code": info["Abbreviation"],
+            "name": info["FullName"],
+            "driver_id": info.get("DriverId") or info["Abbreviation"].lower(),
+            "laps": sorted(int(lap) for lap in laps),
+        })
+    return {
+        "name": session.name,
+        "date": session.date.to_pydatetime(),
+        "drivers": drivers,
+    }
+
+
+def load_driver_laps(
+    cache_dir: str,
+    year: int,
+    round_number: int,
+    identifier: str,
+    driver_number: int,
+    laps: List[int]
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    Convert the requested laps of one driver, in a worker process.
+
+    Returns:
+        Channel arrays keyed by lap number; laps without telemetry are left out
+    """
+    session = _load_session(cache_dir, year, round_number, identifier, telemetry=True)
+    wanted = set(laps)
+    result = {}
+    for _, lap in session.laps.pick_driver(str(driver_number)).iterlaps():
+        number = int(lap["LapNumber"])
+        if number not in wanted:
+            continue
+        try:
+            telemetry = lap.get_telemetry()
+        except Exception as e:
+            logger.warning(f"No telemetry for driver {driver_number} lap {number}: {str(e)}")
+            continue
+        if telemetry.empty:
+            continue
+        result[number] = lap_arrays(
+            telemetry,
+            compound=None if _missing(lap["Compound"]) else lap["Compound"],
+            tyre_life=None if _missing(lap["TyreLife"]) else lap["TyreLife"],
+            sector_times=(lap["Sector1SessionTime"], lap["Sector2SessionTime"]),
+        )
+    return result
+
+
+def session_source(year: int, round_number: int, identifier: str) -> str:
+    """
+    Key stored as a telemetry session's `source` to find earlier imports of the same session.
+    """
+    return f"FastF1 {year} round {round_number} {identifier}"
+
+
+class FastF1Importer:
+    """
+    Imports FastF1 sessions from a local cache into telemetry sessions.
+
+    The cache is read in offline mode, so an import never touches the
+    network and needs a cache populated beforehand (e.g. by running FastF1
+    once with the same cache directory). Drivers are converted in parallel
+    worker processes; each worker loads the session once and reuses it for
+    every driver it is given. Merged car and position data is written one
+    lap per commit.
+
+    Imports are idempotent and incremental: a session is imported into the
+    same telemetry session every time, and laps already stored for a
+    driver are neither converted nor written again. Drivers missing from
+    the drivers table are created from the session's entry list.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = settings.FASTF1_CACHE_DIR,
+        session_factory: sessionmaker = AsyncSessionLocal,
+        max_workers: int = settings.FASTF1_IMPORT_WORKERS
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+
+    async def _get_or_create_session(
+        self, db: AsyncSession, user_id: int, source: str, info: Dict[str, Any]
+    ) -> TelemetrySession:
+        """
+        Find the user's session imported from `source`, creating it if needed.
+
+        Sessions are matched on the unique (user_id, source) key, so an
+        import racing another one for the same session reuses its row.
+        """
+        stmt = select(TelemetrySession).where(
+            TelemetrySession.user_id == user_id, TelemetrySession.source == source
+        )
+        session = (await db.execute(stmt)).scalars().first()
+        if session is not None:
+            return session
+
+        session = TelemetrySession(
+            user_id=user_id,
+            session_type=info["name"],
+            session_date=info["date"],
+            source=source,
+        )
+        db.add(session)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return (await db.execute(stmt)).scalars().one()
+        await db.refresh(session)
+        logger.info(f"Created telemetry session {session.id} for {source}")
+        return session
+
+    async def _resolve_drivers(self, db: AsyncSession, drivers: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Map driver codes to database IDs, creating drivers that are not stored yet.
+        """
+        reference = await get_reference_data(db)
+        missing = [driver for driver in drivers if reference.driver_by_code(driver["code"]) is None]
+        for driver in missing:
+            db.add(Driver(
+                name=driver["name"],
+                driver_id=driver["driver_id"],
+                number=driver["number"],
+                code=driver["code"],
+            ))
+        if missing:
+            await db.commit()
+            reference_cache.invalidate()
+            reference = await get_reference_data(db)
+            logger.info(f"Created {len(missing)} drivers from the FastF1 entry list")
+        return {driver["code"]: reference.driver_by_code(driver["code"])["id"] for driver in drivers}
+
+    async def store_laps(
+        self,
+        db: AsyncSession,
+        session_id: int,
+        driver_id: int,
+        laps: Dict[int, Dict[str, np.ndarray]],
+        stored: Optional[Set[int]] = None
+    ) -> Tuple[int, int]:
+        """
+        Write converted laps for one driver, one commit per lap.
+
+        Args:
+            db: Database session
+            session_id: Telemetry session ID
+            driver_id: Driver database ID
+            laps: Channel arrays keyed by lap number
+            stored: Laps already stored for the driver, skipped
+
+        Returns:
+            Tuple of (laps written, rows written)
+        """
+        stored = stored or set()
+        written = 0
+        rows = 0
+        for lap in sorted(laps):
+            if lap in stored:
+                continue
+            points = arrays_to_rows(laps[lap], session_id, driver_id, lap)
+            # One batch per lap, so an interrupted import never leaves half a lap
+            accepted, _ = await bulk_create_telemetry_data(
+                db, session_id, points, batch_size=max(len(points), 1)
+            )
+            written += 1
+            rows += accepted
+        return written, rows
+
+    async def import_session(
+        self,
+        year: int,
+        round_number: int,
+        identifier: str,
+        user_id: int,
+        driver_codes: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Import a cached FastF1 session, skipping laps that are already stored.
+
+        Args:
+            year: Season
+            round_number: Round within the season
+            identifier: FastF1 session identifier, e.g. "R", "Q" or "FP1"
+            user_id: Owner of the telemetry session
+            driver_codes: Only import these drivers, None for all
+
+        Returns:
+            Import summary with the telemetry session ID and counts
+        """
+        loop = asyncio.get_running_loop()
+        source = session_source(year, round_number, identifier)
+        args = (self.cache_dir, year, round_number, identifier)
+        # Spawned workers do not inherit the event loop or database connections
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            info = await loop.run_in_executor(pool, describe_session, *args)
+            drivers = [
+                driver for driver in info["drivers"]
+                if driver_codes is None or driver["code"] in driver_codes
+            ]
+
+            async with self.session_factory() as db:
+                session = await self._get_or_create_session(db, user_id, source, info)
+                driver_ids = await self._resolve_drivers(db, drivers)
+                stored = await get_stored_laps(db, session.id)
+
+            async def convert(driver: Dict[str, Any], todo: List[int]):
+                laps = await loop.run_in_executor(
+                    pool, load_driver_laps, *args, driver["number"], todo
+                )
+                return driver, laps
+
+            jobs = []
+            skipped = 0
+            for driver in drivers:
+                done = stored.get(driver_ids[driver["code"]], set())
+                todo = [lap for lap in driver["laps"] if lap not in done]
+                skipped += len(driver["laps"]) - len(todo)
+                if todo:
+                    jobs.append(convert(driver, todo))
+
+            laps_written = 0
+            rows_written = 0
+            # Write each driver as soon as its worker finishes
+            for job in asyncio.as_completed(jobs):
+                driver, laps = await job
+                driver_id = driver_ids[driver["code"]]
+                async with self.session_factory() as db:
+                    written, rows = await self.store_laps(
+                        db, session.id, driver_id, laps, stored.get(driver_id)
+                    )
+                laps_written += written
+                rows_written += rows
+                logger.info(f"Imported {written} laps ({rows} samples) for {driver['code']}")
+
+        summary = {
+            "session_id": session.id,
+            "source": source,
+            "drivers": len(drivers),
+            "laps_written": laps_written,
+            "laps_skipped": skipped,
+            "rows_written": rows_written,
+        }
+        logger.info(f"FastF1 import finished: {summary}")
+        return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a cached FastF1 session into BoxBoxBox")
+    parser.add_argument("year", type=int)
+    parser.add_argument("round", type=int)
+    parser.add_argument("session", help="FastF1 session identifier, e.g. R, Q, FP1")
+    parser.add_argument("--user-id", type=int, required=True, help="Owner of the telemetry session")
+    parser.add_argument("--driver", action="append", dest="drivers", help="Driver code, repeatable")
+    parser.add_argument("--cache-dir", default=settings.FASTF1_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=settings.FASTF1_IMPORT_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    importer = FastF1Importer(cache_dir=args.cache_dir, max_workers=args.workers)
+    summary = asyncio.run(
+        importer.import_session(args.year, args.round, args.session, args.user_id, args.drivers)
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
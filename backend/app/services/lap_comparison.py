@@ -0,0 +1,231 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.models import LapSummary, TelemetryData, TelemetryLapBlock
+from app.services.lap_summaries import read_lap_rows
+from app.services.response_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Channels resampled onto the distance grid and compared
+COMPARED_CHANNELS = ("speed", "throttle", "brake", "rpm", "gear")
+
+# Interpolating gear makes no sense; it takes the previous sample's value
+STEP_CHANNELS = ("gear",)
+
+
+class LapSelection(NamedTuple):
+    session_id: int
+    driver_id: int
+    lap: int
+
+
+def lap_distance(elapsed: np.ndarray, speed: np.ndarray) -> np.ndarray:
+    """
+    Distance travelled in metres, integrating speed (km/h) over elapsed seconds.
+    """
+    metres_per_second = np.nan_to_num(speed) / 3.6
+    steps = np.diff(elapsed) * (metres_per_second[1:] + metres_per_second[:-1]) / 2
+    return np.concatenate(([0.0], np.cumsum(steps)))
+
+
+def _lap_arrays(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    start = rows[0]["timestamp"]
+    arrays = {"time": np.array([(row["timestamp"] - start).total_seconds() for row in rows])}
+    for channel in COMPARED_CHANNELS + ("position_x", "position_y"):
+        arrays[channel] = np.array(
+            [np.nan if row.get(channel) is None else row[channel] for row in rows], dtype=np.float64
+        )
+    arrays["distance"] = lap_distance(arrays["time"], arrays["speed"])
+    return arrays
+
+
+def _resample(grid: np.ndarray, distance: np.ndarray, values: np.ndarray, step: bool = False) -> np.ndarray:
+    if step:
+        index = np.clip(np.searchsorted(distance, grid, side="right") - 1, 0, len(values) - 1)
+        return values[index]
+    return np.interp(grid, distance, values)
+
+
+def _as_list(values: np.ndarray, digits: int = 3) -> List[Optional[float]]:
+    rounded = np.round(values, digits)
+    if not np.isnan(rounded).any():
+        return rounded.tolist()
+    return [None if value != value else value for value in rounded.tolist()]
+
+
+def compare_laps(
+    reference: List[Dict[str, Any]],
+    target: List[Dict[str, Any]],
+    resolution: float = 5.0
+) -> Dict[str, Any]:
+    """
+    Compare two laps on a common distance grid.
+
+    Distance is integrated from speed for each lap, and the target lap's
+    distance is scaled to the reference lap's length so corners line up
+    despite small integration differences. Both laps are then resampled
+    every `resolution` metres.
+
+    Args:
+        reference: Samples of the reference lap in time order
+        target: Samples of the compared lap in time order
+        resolution: Grid spacing in metres
+
+    Returns:
+        Distance grid, cumulative delta time (target minus reference, so
+        positive where the target is slower) and per-channel reference,
+        target and difference traces
+    """
+    a = _lap_arrays(reference)
+    b = _lap_arrays(target)
+    length = float(a["distance"][-1])
+    if length <= 0 or b["distance"][-1] <= 0:
+        raise ValueError("Laps need speed data to be compared")
+
+    # Repeated distances (standing still) would make the interpolation ambiguous
+    a_distance = np.maximum.accumulate(a["distance"])
+    b_distance = np.maximum.accumulate(b["distance"]) * (length / b["distance"][-1])
+    grid = np.append(np.arange(0.0, length, resolution), length)
+
+    delta = _resample(grid, b_distance, b["time"]) - _resample(grid, a_distance, a["time"])
+    channels = {}
+    for channel in COMPARED_CHANNELS:
+        step = channel in STEP_CHANNELS
+        a_values = _resample(grid, a_distance, a[channel], step)
+        b_values = _resample(grid, b_distance, b[channel], step)
+        channels[channel] = {
+            "reference": _as_list(a_values),
+            "target": _as_list(b_values),
+            "difference": _as_list(b_values - a_values),
+        }
+
+    return {
+        "lap_length": round(length, 1),
+        "reference_time": round(float(a["time"][-1]), 3),
+        "target_time": round(float(b["time"][-1]), 3),
+        "distance": _as_list(grid, 1),
+        "delta": _as_list(delta),
+        "position_x": _as_list(_resample(grid, a_distance, a["position_x"])),
+        "position_y": _as_list(_resample(grid, a_distance, a["position_y"])),
+        "channels": channels,
+    }
+
+
+class LapComparisonService:
+    """
+    Cached driver-vs-driver lap comparisons.
+
+    Results are cached in-process by both selections and the resolution,
+    together with each lap's version (sample count and end time), so a
+    comparison involving a lap that is still receiving samples is
+    recomputed rather than served stale. Versions come from the lap
+    summaries, or from a count/max(timestamp) query over the stored
+    samples when summaries are not kept on ingest or a lap has none.
+    """
+
+    def __init__(
+        self, maxsize: int = settings.LAP_COMPARISON_CACHE_SIZE, ttl: float = settings.CACHE_EXPIRATION
+    ) -> None:
+        self.cache = LRUCache(maxsize, ttl)
+
+    async def _stored_version(
+        self, db: AsyncSession, selection: LapSelection
+    ) -> Optional[Tuple[int, str]]:
+        """
+        Get (sample_count, end_time) of a lap from its stored samples, None if it has none.
+        """
+        if settings.TELEMETRY_STORAGE_BACKEND == "columnar":
+            stmt = select(
+                func.sum(TelemetryLapBlock.sample_count), func.max(TelemetryLapBlock.end_time)
+            ).where(
+                TelemetryLapBlock.session_id == selection.session_id,
+                TelemetryLapBlock.driver_id == selection.driver_id,
+                TelemetryLapBlock.lap == selection.lap,
+            )
+        else:
+            stmt = select(func.count(), func.max(TelemetryData.timestamp)).where(
+                TelemetryData.session_id == selection.session_id,
+                TelemetryData.driver_id == selection.driver_id,
+                TelemetryData.lap == selection.lap,
+            )
+        count, end_time = (await db.execute(stmt)).one()
+        return (count, end_time.isoformat()) if count else None
+
+    async def _versions(
+        self, db: AsyncSession, selections: Tuple[LapSelection, LapSelection]
+    ) -> List[Optional[Tuple[int, str]]]:
+        """
+        Get (sample_count, end_time) of each lap, None if it has no samples.
+        """
+        if not settings.LAP_SUMMARIES_ON_INGEST:
+            return [await self._stored_version(db, selection) for selection in selections]
+
+        stmt = select(
+            LapSummary.session_id,
+            LapSummary.driver_id,
+            LapSummary.lap,
+            LapSummary.sample_count,
+            LapSummary.end_time,
+        ).where(
+            LapSummary.session_id.in_({s.session_id for s in selections}),
+            LapSummary.driver_id.in_({s.driver_id for s in selections}),
+            LapSummary.lap.in_({s.lap for s in selections}),
+        )
+        found = {
+            LapSelection(session_id, driver_id, lap): (count, end_time.isoformat())
+            for session_id, driver_id, lap, count, end_time in (await db.execute(stmt)).all()
+        }
+        return [
+            found[selection] if selection in found else await self._stored_version(db, selection)
+            for selection in selections
+        ]
+
+    async def compare(
+        self,
+        db: AsyncSession,
+        reference: LapSelection,
+        target: LapSelection,
+        resolution: float = 5.0
+    ) -> Dict[str, Any]:
+        """
+        Compare two stored laps, serving repeated comparisons from cache.
+
+        Raises:
+            LookupError: If either lap has no stored samples
+            ValueError: If the laps cannot be compared
+        """
+        versions = await self._versions(db, (reference, target))
+        key = repr((reference, target, resolution, versions))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        laps = []
+        for selection in (reference, target):
+            rows = await read_lap_rows(
+                db, selection.session_id, selection.driver_id, selection.lap, selection.lap
+            )
+            if len(rows) < 2:
+                raise LookupError(
+                    f"No telemetry for driver {selection.driver_id} lap {selection.lap} "
+                    f"in session {selection.session_id}"
+                )
+            laps.append(rows)
+
+        result = compare_laps(laps[0], laps[1], resolution)
+        self.cache.set(key, result)
+        return result
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+# Create lap comparison service instance
+lap_comparisons = LapComparisonService()
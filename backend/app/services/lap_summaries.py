@@ -0,0 +1,319 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime
+import logging
+
+import numpy as np
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.models import LapSummary, TelemetryData
+from app.services.telemetry_columnar import read_lap_blocks
+
+logger = logging.getLogger(__name__)
+
+# Channels summarized as min/max/mean
+SUMMARY_CHANNELS = ("speed", "throttle", "brake", "rpm")
+
+# INSERT ... ON CONFLICT constructs of the supported databases
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Columns read from raw telemetry to summarize or compare laps
+_SOURCE_COLUMNS = (
+    TelemetryData.timestamp,
+    TelemetryData.lap,
+    TelemetryData.sector,
+    TelemetryData.speed,
+    TelemetryData.throttle,
+    TelemetryData.brake,
+    TelemetryData.rpm,
+    TelemetryData.gear,
+    TelemetryData.drs,
+    TelemetryData.tire_compound,
+    TelemetryData.tire_life,
+    TelemetryData.position_x,
+    TelemetryData.position_y,
+)
+
+
+def _channel(rows: List[Dict[str, Any]], name: str) -> np.ndarray:
+    return np.array([np.nan if row.get(name) is None else row[name] for row in rows], dtype=np.float64)
+
+
+def _round(value: float, digits: int = 3) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _share(mask: np.ndarray, values: np.ndarray) -> Optional[float]:
+    """
+    Share of the known values for which `mask` holds.
+    """
+    known = ~np.isnan(values)
+    return _round(mask[known].mean()) if known.any() else None
+
+
+def _seconds(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start).total_seconds(), 3)
+
+
+def summarize_lap(rows: List[Dict[str, Any]], next_start: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Aggregate one lap of a driver's samples.
+
+    Lap and sector times run from the first sample of a lap (or sector) to
+    the first sample of the next one, so the lap time and third sector stay
+    unknown until the next lap has started.
+
+    Args:
+        rows: The lap's samples in time order
+        next_start: Timestamp of the first sample of the following lap
+
+    Returns:
+        LapSummary column values
+    """
+    start = rows[0]["timestamp"]
+    sectors = _channel(rows, "sector")
+    sector_starts = {}
+    for sector in (2, 3):
+        index = np.flatnonzero(sectors == sector)
+        sector_starts[sector] = rows[index[0]]["timestamp"] if len(index) else None
+
+    summary: Dict[str, Any] = {
+        "sample_count": len(rows),
+        "start_time": start,
+        "end_time": rows[-1]["timestamp"],
+        "lap_time": _seconds(start, next_start),
+        "sector1_time": _seconds(start, sector_starts[2]),
+        "sector2_time": _seconds(sector_starts[2], sector_starts[3]),
+        "sector3_time": _seconds(sector_starts[3], next_start),
+    }
+    for name in SUMMARY_CHANNELS:
+        values = _channel(rows, name)
+        known = values[~np.isnan(values)]
+        summary[f"{name}_min"] = _round(known.min()) if len(known) else None
+        summary[f"{name}_max"] = _round(known.max()) if len(known) else None
+        summary[f"{name}_mean"] = _round(known.mean()) if len(known) else None
+
+    throttle = _channel(rows, "throttle")
+    brake = _channel(rows, "brake")
+    drs = _channel(rows, "drs")
+    gears = _channel(rows, "gear")
+    summary["full_throttle_pct"] = _share(throttle >= 99.0, throttle)
+    summary["brake_pct"] = _share(brake > 0.0, brake)
+    summary["drs_pct"] = _share(drs > 0.0, drs)
+    summary["gear_max"] = None if np.isnan(gears).all() else int(np.nanmax(gears))
+
+    tyres = [row for row in rows if row.get("tire_compound") or row.get("tire_life") is not None]
+    summary["tire_compound"] = tyres[-1].get("tire_compound") if tyres else None
+    summary["tire_life"] = tyres[-1].get("tire_life") if tyres else None
+    return summary
+
+
+async def read_lap_rows(
+    db: AsyncSession, session_id: int, driver_id: int, first: int, last: int
+) -> List[Dict[str, Any]]:
+    """
+    Read a driver's raw samples for an inclusive lap range, in time order.
+    """
+    if settings.TELEMETRY_STORAGE_BACKEND == "columnar":
+        return await read_lap_blocks(db, session_id, driver_id, lap_range=(first, last))
+    stmt = (
+        select(*_SOURCE_COLUMNS)
+        .where(
+            TelemetryData.session_id == session_id,
+            TelemetryData.driver_id == driver_id,
+            TelemetryData.lap.between(first, last),
+        )
+        .order_by(TelemetryData.timestamp, TelemetryData.id)
+    )
+    return [dict(row) for row in (await db.execute(stmt)).mappings()]
+
+
+async def refresh_lap_summaries(
+    db: AsyncSession, session_id: int, laps: Iterable[Tuple[int, int]]
+) -> int:
+    """
+    Recompute the summaries of laps that received new samples.
+
+    Each call re-aggregates the touched laps from their raw samples rather
+    than keeping running aggregates. The lap before each touched lap is
+    recomputed too, since its lap and third-sector times end where the
+    touched lap starts. Raw samples are read once per driver for the
+    affected lap range.
+
+    Summaries are written with INSERT ... ON CONFLICT DO UPDATE on
+    (session, driver, lap), so concurrent ingests of the same lap both
+    succeed and the last one to commit wins. Changes are executed in the
+    session's transaction but not committed.
+
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        laps: (driver database ID, lap) pairs that received samples
+
+    Returns:
+        Number of summaries written
+    """
+    by_driver: Dict[int, Set[int]] = {}
+    for driver_id, lap in laps:
+        if lap:
+            by_driver.setdefault(driver_id, set()).update({lap, lap - 1} if lap > 1 else {lap})
+
+    insert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+    written = 0
+    for driver_id, wanted in by_driver.items():
+        rows = await read_lap_rows(db, session_id, driver_id, min(wanted), max(wanted) + 1)
+        grouped: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault(row["lap"], []).append(row)
+
+        values = []
+        for lap in sorted(wanted):
+            if lap not in grouped:
+                continue
+            following = grouped.get(lap + 1)
+            values.append({
+                "session_id": session_id,
+                "driver_id": driver_id,
+                "lap": lap,
+                **summarize_lap(grouped[lap], following[0]["timestamp"] if following else None),
+            })
+        if not values:
+            continue
+
+        stmt = insert(LapSummary).values(values)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["session_id", "driver_id", "lap"],
+            set_={key: stmt.excluded[key] for key in values[0] if key not in ("session_id", "driver_id", "lap")},
+        ))
+        written += len(values)
+
+    logger.debug(f"Refreshed {written} lap summaries for session {session_id}")
+    return written
+
+
+async def get_lap_summaries(
+    db: AsyncSession, session_id: int, driver_id: Optional[int] = None
+) -> List[LapSummary]:
+    """
+    Get a session's lap summaries ordered by driver and lap.
+    """
+    stmt = select(LapSummary).where(LapSummary.session_id == session_id)
+    if driver_id is not None:
+        stmt = stmt.where(LapSummary.driver_id == driver_id)
+    stmt = stmt.order_by(LapSummary.driver_id, LapSummary.lap)
+    return list((await db.execute(stmt)).scalars())
+
+
+def build_leaderboard(summaries: List[LapSummary]) -> List[Dict[str, Any]]:
+    """
+    Rank drivers by their best complete lap.
+
+    Each entry carries the driver's best lap, best sectors and the
+    theoretical best lap they add up to, top speed and lap counts. Drivers
+    without a complete lap are ranked last.
+    """
+    entries: Dict[int, Dict[str, Any]] = {}
+    for summary in summaries:
+        entry = entries.setdefault(summary.driver_id, {
+            "driver_id": summary.driver_id,
+            "laps": 0,
+            "best_lap_time": None,
+            "best_lap": None,
+            "best_sector1_time": None,
+            "best_sector2_time": None,
+            "best_sector3_time": None,
+            "top_speed": None,
+        })
+        entry["laps"] += 1
+        if summary.lap_time is not None and (
+            entry["best_lap_time"] is None or summary.lap_time < entry["best_lap_time"]
+        ):
+            entry["best_lap_time"] = summary.lap_time
+            entry["best_lap"] = summary.lap
+        for sector in (1, 2, 3):
+            key = f"best_sector{sector}_time"
+            value = getattr(summary, f"sector{sector}_time")
+            if value is not None and (entry[key] is None or value < entry[key]):
+                entry[key] = value
+        if summary.speed_max is not None and (
+            entry["top_speed"] is None or summary.speed_max > entry["top_speed"]
+        ):
+            entry["top_speed"] = summary.speed_max
+
+    ranked = sorted(
+        entries.values(),
+        key=lambda entry: (entry["best_lap_time"] is None, entry["best_lap_time"] or 0.0),
+    )
+    leader = ranked[0]["best_lap_time"] if ranked else None
+    for position, entry in enumerate(ranked, start=1):
+        sectors = [entry[f"best_sector{sector}_time"] for sector in (1, 2, 3)]
+        entry["position"] = position
+        entry["theoretical_best"] = round(sum(sectors), 3) if None not in sectors else None
+        entry["gap"] = (
+            round(entry["best_lap_time"] - leader, 3)
+            if entry["best_lap_time"] is not None and leader is not None
+            else None
+        )
+    return ranked
+
+
+def build_stints(summaries: List[LapSummary]) -> List[Dict[str, Any]]:
+    """
+    Split each driver's laps into stints and summarize their pace.
+
+    A new stint starts when the compound changes or tyre life drops (a pit
+    stop for the same compound). Degradation is the least-squares slope of
+    lap time over the stint's complete laps, in seconds per lap.
+
+    Args:
+        summaries: Lap summaries ordered by driver and lap
+    """
+    stints: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    previous: Optional[LapSummary] = None
+    for summary in summaries:
+        new_stint = (
+            previous is None
+            or summary.driver_id != previous.driver_id
+            or summary.tire_compound != previous.tire_compound
+            or (
+                summary.tire_life is not None
+                and previous.tire_life is not None
+                and summary.tire_life < previous.tire_life
+            )
+        )
+        if new_stint:
+            stint_number = 1 if previous is None or summary.driver_id != previous.driver_id else current["stint"] + 1
+            current = {
+                "driver_id": summary.driver_id,
+                "stint": stint_number,
+                "tire_compound": summary.tire_compound,
+                "first_lap": summary.lap,
+                "last_lap": summary.lap,
+                "start_tire_life": summary.tire_life,
+                "end_tire_life": summary.tire_life,
+                "_laps": [],
+            }
+            stints.append(current)
+        current["last_lap"] = summary.lap
+        current["end_tire_life"] = summary.tire_life
+        if summary.lap_time is not None:
+            current["_laps"].append((summary.lap, summary.lap_time))
+        previous = summary
+
+    for stint in stints:
+        timed = stint.pop("_laps")
+        times = [lap_time for _, lap_time in timed]
+        stint["laps"] = stint["last_lap"] - stint["first_lap"] + 1
+        stint["best_lap_time"] = min(times) if times else None
+        stint["mean_lap_time"] = round(float(np.mean(times)), 3) if times else None
+        stint["degradation"] = (
+            round(float(np.polyfit([lap for lap, _ in timed], times, 1)[0]), 4)
+            if len(timed) >= 2
+            else None
+        )
+    return stints
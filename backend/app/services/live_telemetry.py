@@ -0,0 +1,244 @@
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+import logging
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.serialization import dumps_str, loads
+from app.db.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Set of every live stream key, used by persistence workers to find streams
+STREAM_INDEX_KEY = "telemetry:streams"
+
+# Stream key component for samples that are not tied to a driver
+NO_DRIVER = "-"
+
+
+def as_text(value: Any) -> str:
+    """
+    Decode a key or member returned by the (non-decoding) Redis client.
+    """
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def stream_key(session_id: str, driver_id: Optional[str]) -> str:
+    return f"telemetry:stream:{session_id}:{driver_id or NO_DRIVER}"
+
+
+def parse_stream_key(key: Any) -> Tuple[str, Optional[str]]:
+    """
+    Split a stream key back into (session_id, driver_id).
+    """
+    session_id, driver_id = as_text(key)[len("telemetry:stream:"):].rsplit(":", 1)
+    return session_id, None if driver_id == NO_DRIVER else driver_id
+
+
+def _drivers_key(session_id: str) -> str:
+    return f"telemetry:stream:{session_id}:drivers"
+
+
+def _seq_key(session_id: str) -> str:
+    return f"telemetry:stream:{session_id}:seq"
+
+
+def entry_seq(entry_id: Any) -> int:
+    """
+    Get the sequence number from a `{seq}-0` stream entry ID.
+    """
+    return int(as_text(entry_id).split("-", 1)[0])
+
+
+def decode_entries(entries: List[Tuple[Any, Dict[Any, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Decode XRANGE/XREAD entries into samples with their `seq`.
+    """
+    return [
+        {**loads(fields.get(b"d") or fields.get("d")), "seq": entry_seq(entry_id)}
+        for entry_id, fields in entries
+    ]
+
+
+class LiveTelemetryWindow:
+    """
+    Capped window of recent live samples, one Redis Stream per session and driver.
+
+    Every appended sample gets the next value of a per-session counter and
+    is added with the stream entry ID `{seq}-0`, so sequence numbers
+    increase monotonically across all drivers of a session and readers can
+    XRANGE from an exclusive `since_seq`. Streams are capped with
+    approximate MAXLEN trimming at LIVE_TELEMETRY_WINDOW entries. Samples
+    are appended, never rewritten, so many pods can read the window cheaply
+    and persistence workers can consume it through a consumer group.
+
+    Stream IDs must increase, so each (session, driver) stream expects a
+    single writer at a time; a sample that loses an ordering race with
+    another writer is dropped and logged.
+
+    Without Redis an in-process window is used instead.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.LIVE_TELEMETRY_WINDOW,
+        redis_client: Optional[redis.Redis] = None
+    ) -> None:
+        self.size = size
+        self._redis = redis_client
+        self._local: Dict[str, Tuple[int, Deque[Dict[str, Any]]]] = {}
+
+    async def _client(self) -> redis.Redis:
+        if self._redis is not None:
+            return self._redis
+        return await get_redis_client()
+
+    async def append(
+        self, session_id: str, points: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Number and store new samples.
+
+        Args:
+            session_id: Session the samples belong to
+            points: Samples in time order, each with its `driver_id`
+
+        Returns:
+            The samples with their `seq` set
+        """
+        if not points:
+            return []
+        try:
+            redis_client = await self._client()
+            last_seq = await redis_client.incrby(_seq_key(session_id), len(points))
+            numbered = [
+                {**point, "seq": last_seq - len(points) + i + 1} for i, point in enumerate(points)
+            ]
+            drivers = {point.get("driver_id") for point in points}
+            keys = {stream_key(session_id, driver_id) for driver_id in drivers}
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for point in numbered:
+                    pipe.xadd(
+                        stream_key(session_id, point.get("driver_id")),
+                        {"d": dumps_str({k: v for k, v in point.items() if k != "seq"})},
+                        id=f"{point['seq']}-0",
+                        maxlen=self.size,
+                        approximate=True,
+                    )
+                pipe.sadd(_drivers_key(session_id), *(d or NO_DRIVER for d in drivers))
+                pipe.sadd(STREAM_INDEX_KEY, *keys)
+                for key in keys | {_drivers_key(session_id), _seq_key(session_id)}:
+                    pipe.expire(key, settings.CACHE_EXPIRATION)
+                results = await pipe.execute(raise_on_error=False)
+            failed = [result for result in results[:len(numbered)] if isinstance(result, Exception)]
+            if failed:
+                logger.warning(
+                    f"Dropped {len(failed)} live samples for session {session_id}: {failed[0]}"
+                )
+            return numbered
+        except Exception as e:
+            logger.debug(f"Redis unavailable for live telemetry, using local window: {str(e)}")
+
+        last_seq, window = self._local.get(session_id, (0, deque(maxlen=self.size)))
+        numbered = [{**point, "seq": last_seq + i + 1} for i, point in enumerate(points)]
+        window.extend(numbered)
+        self._local[session_id] = (last_seq + len(points), window)
+        return numbered
+
+    async def read(
+        self,
+        session_id: str,
+        driver_id: Optional[str] = None,
+        since_seq: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
+        """
+        Read samples newer than `since_seq`.
+
+        Sequence numbers are shared by all drivers of a session, so a
+        stream's next sample after `since_seq` rarely has `since_seq + 1`.
+        Instead, a stream has lost samples the reader never saw when it has
+        been trimmed (holds a full window) and its oldest retained entry is
+        past `since_seq + 1`; that is reported as a gap so the client can
+        reset its state. Only a reader whose `since_seq` lies between a
+        stream's last trimmed and oldest retained sample can get a spurious
+        gap, which costs it a harmless resync.
+
+        Args:
+            session_id: Session to read
+            driver_id: Only return samples for this driver, None for all
+            since_seq: Exclusive lower bound, None for the whole window
+
+        Returns:
+            Tuple of (samples in sequence order, session's last sequence or
+            None if the session has no live data, whether samples after
+            `since_seq` were already trimmed)
+        """
+        lower = "-" if since_seq is None else f"({since_seq}-0"
+        try:
+            redis_client = await self._client()
+            if driver_id is None:
+                drivers = await redis_client.smembers(_drivers_key(session_id))
+                keys = [
+                    f"telemetry:stream:{session_id}:{as_text(driver)}" for driver in sorted(drivers)
+                ]
+            else:
+                keys = [stream_key(session_id, driver_id)]
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(_seq_key(session_id))
+                for key in keys:
+                    pipe.xrange(key, min=lower, max="+")
+                    pipe.xlen(key)
+                last_seq, *results = await pipe.execute()
+            ranges, lengths = results[0::2], results[1::2]
+            points = [point for entries in ranges for point in decode_entries(entries)]
+            if len(ranges) > 1:
+                points.sort(key=lambda point: point["seq"])
+            # A range holding the whole stream starts at its oldest retained entry
+            gap = since_seq is not None and any(
+                entries
+                and length >= self.size
+                and len(entries) == length
+                and entry_seq(entries[0][0]) > since_seq + 1
+                for entries, length in zip(ranges, lengths)
+            )
+            return points, int(last_seq) if last_seq is not None else None, gap
+        except Exception as e:
+            logger.debug(f"Redis unavailable for live telemetry, using local window: {str(e)}")
+
+        if session_id not in self._local:
+            return [], None, False
+        last_seq, window = self._local[session_id]
+        points = [
+            point for point in window
+            if (since_seq is None or point["seq"] > since_seq)
+            and (driver_id is None or point.get("driver_id") == driver_id)
+        ]
+        gap = since_seq is not None and bool(window) and window[0]["seq"] > since_seq + 1
+        return points, last_seq, gap
+
+    async def last_seq(self, session_id: str) -> Optional[int]:
+        """
+        Get a session's last sequence number without reading any samples.
+
+        Returns:
+            The last sequence number, or None if the session has no live data
+        """
+        try:
+            redis_client = await self._client()
+            last_seq = await redis_client.get(_seq_key(session_id))
+            return int(last_seq) if last_seq is not None else None
+        except Exception as e:
+            logger.debug(f"Redis unavailable for live telemetry, using local window: {str(e)}")
+
+        return self._local[session_id][0] if session_id in self._local else None
+
+    def clear_local(self) -> None:
+        """
+        Drop the in-process windows.
+        """
+        self._local.clear()
+
+
+# Create live telemetry window instance
+live_window = LiveTelemetryWindow()
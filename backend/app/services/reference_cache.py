@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.models import Circuit, Driver, Team
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _as_dict(obj: Any) -> Dict[str, Any]:
+    """
+    Snapshot an ORM object's column values into a plain dict.
+    """
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+
+class ReferenceDataCache:
+    """
+    Process-local snapshot of drivers, teams and circuits.
+
+    Reference data changes a handful of times per season, so it is loaded
+    once and served from memory. Admin create/update/delete endpoints call
+    invalidate(), and snapshots older than REFERENCE_CACHE_TTL are reloaded
+    so other replicas converge too.
+    """
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+        self.drivers_by_id: Dict[int, Dict[str, Any]] = {}
+        self.drivers_by_code: Dict[str, Dict[str, Any]] = {}
+        self.drivers_by_driver_id: Dict[str, Dict[str, Any]] = {}
+        self.drivers_by_team: Dict[int, List[Dict[str, Any]]] = {}
+        self.teams_by_id: Dict[int, Dict[str, Any]] = {}
+        self.teams_by_team_id: Dict[str, Dict[str, Any]] = {}
+        self.circuits_by_id: Dict[int, Dict[str, Any]] = {}
+        self.circuits_by_circuit_id: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.REFERENCE_CACHE_TTL
+        )
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        Load all drivers, teams and circuits and rebuild the indexes.
+        """
+        drivers = [_as_dict(driver) for driver in (await db.execute(select(Driver))).scalars()]
+        teams = [_as_dict(team) for team in (await db.execute(select(Team))).scalars()]
+        circuits = [_as_dict(circuit) for circuit in (await db.execute(select(Circuit))).scalars()]
+
+        drivers_by_team: Dict[int, List[Dict[str, Any]]] = {}
+        for driver in drivers:
+            if driver["team_id"] is not None:
+                drivers_by_team.setdefault(driver["team_id"], []).append(driver)
+
+        # Swap in complete indexes so readers never see a partial load
+        self.drivers_by_id = {driver["id"]: driver for driver in drivers}
+        self.drivers_by_code = {driver["code"]: driver for driver in drivers}
+        self.drivers_by_driver_id = {driver["driver_id"]: driver for driver in drivers}
+        self.drivers_by_team = drivers_by_team
+        self.teams_by_id = {team["id"]: team for team in teams}
+        self.teams_by_team_id = {team["team_id"]: team for team in teams}
+        self.circuits_by_id = {circuit["id"]: circuit for circuit in circuits}
+        self.circuits_by_circuit_id = {circuit["circuit_id"]: circuit for circuit in circuits}
+        self._loaded_at = time.monotonic()
+
+        logger.info(
+            f"Reference data cache loaded: {len(drivers)} drivers, "
+            f"{len(teams)} teams, {len(circuits)} circuits"
+        )
+
+    async def ensure_loaded(self, db: AsyncSession) -> "ReferenceDataCache":
+        """
+        Load the cache if it is empty, invalidated or older than its TTL.
+        """
+        if not self.is_fresh:
+            async with self._lock:
+                if not self.is_fresh:
+                    await self.load(db)
+        return self
+
+    def invalidate(self) -> None:
+        """
+        Mark the cache stale so the next lookup reloads it.
+        """
+        self._loaded_at = None
+        logger.info("Reference data cache invalidated")
+
+    def driver(self, driver_pk: int) -> Optional[Dict[str, Any]]:
+        return self.drivers_by_id.get(driver_pk)
+
+    def driver_by_code(self, code: str) -> Optional[Dict[str, Any]]:
+        return self.drivers_by_code.get(code)
+
+    def driver_by_driver_id(self, driver_id: str) -> Optional[Dict[str, Any]]:
+        return self.drivers_by_driver_id.get(driver_id)
+
+    def team_drivers(self, team_pk: int) -> List[Dict[str, Any]]:
+        return self.drivers_by_team.get(team_pk, [])
+
+    def team(self, team_pk: int) -> Optional[Dict[str, Any]]:
+        return self.teams_by_id.get(team_pk)
+
+    def team_by_team_id(self, team_id: str) -> Optional[Dict[str, Any]]:
+        return self.teams_by_team_id.get(team_id)
+
+    def circuit(self, circuit_pk: int) -> Optional[Dict[str, Any]]:
+        return self.circuits_by_id.get(circuit_pk)
+
+    def circuit_by_circuit_id(self, circuit_id: str) -> Optional[Dict[str, Any]]:
+        return self.circuits_by_circuit_id.get(circuit_id)
+
+
+# Create reference cache instance
+reference_cache = ReferenceDataCache()
+
+
+async def get_reference_data(db: AsyncSession) -> ReferenceDataCache:
+    """
+    Return the reference data cache, loading it first if needed.
+    """
+    return await reference_cache.ensure_loaded(db)
+
+
+async def load_reference_data() -> ReferenceDataCache:
+    """
+    Return the reference data cache for callers without a database session.
+
+    A session is only opened when the cache has to be (re)loaded, so
+    long-lived handlers such as WebSockets never hold a connection.
+    """
+    if not reference_cache.is_fresh:
+        async with AsyncSessionLocal() as db:
+            await reference_cache.ensure_loaded(db)
+    return reference_cache
@@ -0,0 +1,279 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from collections import OrderedDict
+import functools
+import hashlib
+import json
+import logging
+import time
+
+import redis.asyncio as redis
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.cache_codec import cache_codec
+from app.core.config import settings
+from app.db.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Cached entry: (etag, UTF-8 JSON body)
+CacheEntry = Tuple[str, bytes]
+
+
+class LRUCache:
+    """
+    Small in-process LRU cache with a per-entry TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_local_cache = LRUCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.CACHE_EXPIRATION)
+_local_generations: Dict[str, int] = {}
+# Namespace generations as last read: (monotonic read time, generation)
+_generation_cache: Dict[str, Tuple[float, int]] = {}
+# Redis is skipped until this monotonic time after an error
+_redis_retry_at = 0.0
+# Namespaces whose Redis generation bump failed; their Redis entries are
+# stale for this replica, so only the in-process tier is used until a bump succeeds
+_pending_bumps: Set[str] = set()
+
+
+def _generation_key(namespace: str) -> str:
+    return f"response-cache:gen:{namespace}"
+
+
+async def _redis_client() -> Optional[redis.Redis]:
+    """
+    Get the shared Redis client, or None while Redis is skipped after an error.
+    """
+    if time.monotonic() < _redis_retry_at:
+        return None
+    return await get_redis_client()
+
+
+def _redis_failed(action: str, error: Exception) -> None:
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + settings.RESPONSE_CACHE_REDIS_RETRY
+    logger.debug(f"Redis error when {action} response cache: {str(error)}")
+
+
+async def _get_generation(namespace: str) -> int:
+    """
+    Get the namespace generation, shared through Redis when available.
+
+    Bumping the generation on invalidation changes every cache key in the
+    namespace, so stale entries on other replicas are simply never read.
+    A generation read from Redis is reused for RESPONSE_CACHE_GENERATION_TTL
+    seconds, so in-process hits need no round-trip and other replicas see
+    an invalidation within that time. A bump that failed is retried here,
+    at most once per RESPONSE_CACHE_GENERATION_TTL.
+    """
+    now = time.monotonic()
+    cached = _generation_cache.get(namespace)
+    if cached is not None and now - cached[0] < settings.RESPONSE_CACHE_GENERATION_TTL:
+        return cached[1]
+
+    generation = _local_generations.get(namespace, 0)
+    if namespace in _pending_bumps:
+        if now >= _redis_retry_at:
+            generation = await _bump_generation(namespace) or generation
+        _generation_cache[namespace] = (now, generation)
+        return generation
+
+    try:
+        redis_client = await _redis_client()
+        if redis_client is not None:
+            generation = int(await redis_client.get(_generation_key(namespace)) or 0)
+    except Exception as e:
+        _redis_failed("reading the generation of the", e)
+    _generation_cache[namespace] = (now, generation)
+    return generation
+
+
+async def _bump_generation(namespace: str) -> Optional[int]:
+    """
+    Increment the namespace generation in Redis.
+
+    Always tried, even while reads skip Redis, so other replicas see the
+    invalidation. On failure the namespace's Redis tier is dropped for this
+    replica until a later bump succeeds.
+
+    Returns:
+        The new generation, or None if Redis could not be reached
+    """
+    try:
+        redis_client = await get_redis_client()
+        generation = await redis_client.incr(_generation_key(namespace))
+    except Exception as e:
+        _pending_bumps.add(namespace)
+        logger.error(
+            f"Redis error when invalidating response cache for {namespace}, "
+            f"other replicas may serve stale responses until Redis recovers: {str(e)}"
+        )
+        return None
+    _pending_bumps.discard(namespace)
+    return generation
+
+
+async def _redis_get(key: str) -> Optional[CacheEntry]:
+    try:
+        redis_client = await _redis_client()
+        cached = await redis_client.get(key) if redis_client is not None else None
+        if not cached:
+            return None
+        # Entries written before the codec are stored as plain "etag\nbody"
+        cached = cache_codec.decode(cached, legacy=bytes)
+    except Exception as e:
+        _redis_failed("reading", e)
+        return None
+    etag, _, body = cached.partition(b"\n")
+    return etag.decode("ascii"), body
+
+
+async def _redis_set(key: str, entry: CacheEntry) -> None:
+    try:
+        redis_client = await _redis_client()
+        if redis_client is not None:
+            await redis_client.set(
+                key,
+                cache_codec.encode_raw(entry[0].encode("ascii") + b"\n" + entry[1]),
+                ex=settings.CACHE_EXPIRATION,
+            )
+    except Exception as e:
+        _redis_failed("writing", e)
+
+
+def _cache_key(namespace: str, generation: int, request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"response-cache:{namespace}:{generation}:{request.url.path}?{query}"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, per RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+async def cached_json_response(
+    request: Request, namespace: str, build: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Serve a JSON response from the cache, building and storing it on a miss.
+
+    Entries are looked up in the in-process LRU first, then in Redis; with
+    the namespace generation cached too, an in-process hit makes no Redis
+    call. After a Redis error Redis is skipped for RESPONSE_CACHE_REDIS_RETRY
+    seconds, and after a failed invalidation until the generation bump
+    succeeds. Every response carries a strong ETag, and a matching
+    If-None-Match gets a body-less 304.
+
+    Args:
+        request: Incoming request, used for the cache key and validators
+        namespace: Invalidation namespace (e.g. "drivers")
+        build: Coroutine factory producing the response content on a miss
+
+    Returns:
+        200 JSON response or 304 Not Modified
+    """
+    generation = await _get_generation(namespace)
+    key = _cache_key(namespace, generation, request)
+    use_redis = namespace not in _pending_bumps
+
+    entry = _local_cache.get(key)
+    if entry is None:
+        entry = await _redis_get(key) if use_redis else None
+        if entry is None:
+            body = json.dumps(jsonable_encoder(await build()), separators=(",", ":")).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            entry = (etag, body)
+            if use_redis:
+                await _redis_set(key, entry)
+        _local_cache.set(key, entry)
+
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached_response(namespace: str) -> Callable:
+    """
+    Decorate a GET endpoint so its JSON output is cached under a namespace.
+
+    The endpoint must declare a `request: Request` parameter. Dependencies,
+    including authentication, still run on every request.
+    """
+    def decorator(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Response]]:
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Response:
+            return await cached_json_response(
+                kwargs["request"], namespace, lambda: endpoint(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+def clear_local_responses() -> None:
+    """
+    Drop every in-process cached response and namespace generation.
+    """
+    global _redis_retry_at
+    _local_cache.clear()
+    _local_generations.clear()
+    _generation_cache.clear()
+    _pending_bumps.clear()
+    _redis_retry_at = 0.0
+
+
+async def invalidate_responses(*namespaces: str) -> None:
+    """
+    Invalidate every cached response in the given namespaces.
+    """
+    for namespace in namespaces:
+        generation = _local_generations.get(namespace, 0) + 1
+        _local_generations[namespace] = generation
+        _local_cache.delete_prefix(f"response-cache:{namespace}:")
+        generation = await _bump_generation(namespace) or generation
+        _generation_cache[namespace] = (time.monotonic(), generation)
+    logger.info(f"Invalidated cached responses for: {', '.join(namespaces)}")
@@ -0,0 +1,187 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import struct
+
+import numpy as np
+
+from app.core.serialization import dumps, loads
+from app.services.telemetry_columnar import FLOAT_CHANNELS, INT_CHANNELS
+
+# Wire encodings a telemetry WebSocket can negotiate
+ENCODINGS = ("json", "msgpack", "packed")
+
+# Sec-WebSocket-Protocol names for each encoding
+SUBPROTOCOLS = {f"boxbox.{encoding}": encoding for encoding in ENCODINGS}
+
+# Messages whose samples are sent as a packed array; others go as JSON text
+PACKED_TYPES = ("telemetry_update", "cached_data")
+
+# Column layout of a packed sample batch. `seq` and `t` are offsets from the
+# header's `seq0` and `t0` (`t` in microseconds); `driver` and
+# `tire_compound` index the header's `drivers` and `tire_compounds` lists.
+PACKED_FIELDS = ("seq", "t", "driver") + FLOAT_CHANNELS + INT_CHANNELS + ("lap", "tire_compound")
+INTEGER_FIELDS = ("seq", "driver") + INT_CHANNELS + ("lap", "tire_compound")
+
+# Column dtypes, chosen so packing is lossless: time offsets are int64,
+# measured channels float64, and the small integer fields float32 (exact
+# below 2**24). Missing values are NaN.
+FIELD_DTYPES = {"t": "<i8", **{channel: "<f8" for channel in FLOAT_CHANNELS}}
+SMALL_INT_DTYPE = "<f4"
+
+_CHANNELS = PACKED_FIELDS[3:-1]
+_HEADER_LENGTH = struct.Struct("<I")
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _samples_container(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Find the mapping holding the sample list: the message itself for updates,
+    the nested telemetry payload for cached_data.
+    """
+    data = message.get("data")
+    if isinstance(data, list):
+        return message
+    if isinstance(data, dict) and isinstance(data.get("data"), list):
+        return data
+    return None
+
+
+def pack_samples(points: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Pack telemetry samples into little-endian columns.
+
+    Columns follow each other in PACKED_FIELDS order, each `count` values
+    of the dtype listed in the header's `dtypes`.
+
+    Args:
+        points: Samples with `seq`, `timestamp` and channel values
+
+    Returns:
+        Tuple of (schema header, column bytes)
+    """
+    dtypes = [FIELD_DTYPES.get(field, SMALL_INT_DTYPE) for field in PACKED_FIELDS]
+    schema: Dict[str, Any] = {"fields": list(PACKED_FIELDS), "dtypes": dtypes, "count": len(points)}
+    if not points:
+        return schema, b""
+
+    timestamps = [_parse_timestamp(point["timestamp"]) for point in points]
+    t0 = min(timestamps)
+    seq0 = min(point.get("seq") or 0 for point in points)
+    drivers = sorted({point["driver_id"] for point in points if point.get("driver_id") is not None})
+    compounds = sorted({point["tire_compound"] for point in points if point.get("tire_compound")})
+    driver_index = {driver: i for i, driver in enumerate(drivers)}
+    compound_index = {compound: i for i, compound in enumerate(compounds)}
+
+    nan = float("nan")
+    columns: Dict[str, List[Any]] = {
+        "seq": [nan if point.get("seq") is None else point["seq"] - seq0 for point in points],
+        "t": [(timestamp - t0) // _MICROSECOND for timestamp in timestamps],
+        "driver": [driver_index.get(point.get("driver_id"), nan) for point in points],
+        "tire_compound": [compound_index.get(point.get("tire_compound"), nan) for point in points],
+    }
+    for channel in _CHANNELS:
+        columns[channel] = [nan if (value := point.get(channel)) is None else value for point in points]
+
+    schema.update({
+        "seq0": seq0,
+        "t0": t0.isoformat(),
+        "drivers": drivers,
+        "tire_compounds": compounds,
+    })
+    return schema, b"".join(
+        np.asarray(columns[field], dtype=dtype).tobytes() for field, dtype in zip(PACKED_FIELDS, dtypes)
+    )
+
+
+def unpack_samples(schema: Dict[str, Any], data: bytes) -> List[Dict[str, Any]]:
+    """
+    Rebuild sample dicts from a packed schema header and columns.
+    """
+    count = schema["count"]
+    if not count:
+        return []
+    fields = schema["fields"]
+    columns = []
+    offset = 0
+    for dtype in schema["dtypes"]:
+        column = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        columns.append(column.tolist())
+        offset += column.nbytes
+    t0 = datetime.fromisoformat(schema["t0"])
+    points = []
+    for row in zip(*columns):
+        point: Dict[str, Any] = {}
+        for field, value in zip(fields, row):
+            if value != value:  # NaN
+                point[field] = None
+            elif field in INTEGER_FIELDS:
+                point[field] = int(value)
+            else:
+                point[field] = value
+        point["seq"] = None if point["seq"] is None else schema["seq0"] + point["seq"]
+        point["timestamp"] = (t0 + point.pop("t") * _MICROSECOND).isoformat()
+        driver = point.pop("driver")
+        point["driver_id"] = None if driver is None else schema["drivers"][driver]
+        compound = point["tire_compound"]
+        point["tire_compound"] = None if compound is None else schema["tire_compounds"][compound]
+        points.append(point)
+    return points
+
+
+def encode_packed(message: Dict[str, Any]) -> bytes:
+    """
+    Encode a telemetry message as a packed binary frame.
+
+    The frame is a uint32 header length, a JSON header carrying the message
+    without its samples plus a `samples` schema, then the sample columns.
+    """
+    container = _samples_container(message)
+    if container is None:
+        raise ValueError("Message has no telemetry samples to pack")
+    schema, matrix = pack_samples(container["data"])
+    if container is message:
+        header = {**message, "data": None, "samples": schema}
+    else:
+        header = {**message, "data": {**container, "data": None}, "samples": schema}
+    header_bytes = dumps(header)
+    return _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes + matrix
+
+
+def decode_packed(data: bytes) -> Dict[str, Any]:
+    """
+    Decode a packed binary frame back into a message with sample dicts.
+    """
+    (length,) = _HEADER_LENGTH.unpack_from(data)
+    start = _HEADER_LENGTH.size
+    message = loads(data[start:start + length])
+    points = unpack_samples(message.pop("samples"), data[start + length:])
+    if isinstance(message["data"], dict):
+        message["data"]["data"] = points
+    else:
+        message["data"] = points
+    return message
+
+
+def negotiate_encoding(
+    encoding: Optional[str], subprotocols: List[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Pick a socket's encoding from its query parameter or offered subprotocols.
+
+    Args:
+        encoding: The `encoding` query parameter, if given
+        subprotocols: Subprotocols offered in Sec-WebSocket-Protocol
+
+    Returns:
+        Tuple of (encoding or None if unsupported, subprotocol to accept)
+    """
+    for subprotocol in subprotocols:
+        if subprotocol in SUBPROTOCOLS and (encoding is None or SUBPROTOCOLS[subprotocol] == encoding):
+            return SUBPROTOCOLS[subprotocol], subprotocol
+    if encoding is None:
+        return "json", None
+    return (encoding if encoding in ENCODINGS else None), None
@@ -0,0 +1,426 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, timezone, timedelta
+import heapq
+import io
+import logging
+
+import numpy as np
+from sqlalchemy import func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.models import TelemetryLapBlock
+
+logger = logging.getLogger(__name__)
+
+# Channel layout of a lap block. Missing values are stored as NaN for the
+# numeric channels and as an empty string for the text channels.
+FLOAT_CHANNELS = (
+    "speed",
+    "throttle",
+    "brake",
+    "rpm",
+    "position_x",
+    "position_y",
+    "position_z",
+    "tire_life",
+)
+INT_CHANNELS = ("gear", "drs", "sector")
+TEXT_CHANNELS = ("tire_compound",)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_epoch_us(value: datetime) -> int:
+    """
+    Convert a datetime to integer microseconds since the epoch (naive = UTC).
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_epoch_us(value: int) -> datetime:
+    """
+    Convert integer microseconds since the epoch to an aware UTC datetime.
+    """
+    return EPOCH + timedelta(microseconds=value)
+
+
+def rows_to_arrays(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Convert telemetry row mappings into per-channel NumPy arrays.
+    """
+    arrays: Dict[str, np.ndarray] = {
+        "timestamp": np.array(
+            [_to_epoch_us(row["timestamp"]) for row in rows], dtype=np.int64
+        )
+    }
+    for channel in FLOAT_CHANNELS + INT_CHANNELS:
+        arrays[channel] = np.array(
+            [np.nan if row.get(channel) is None else row[channel] for row in rows],
+            dtype=np.float64,
+        )
+    for channel in TEXT_CHANNELS:
+        arrays[channel] = np.array([row.get(channel) or "" for row in rows], dtype=str)
+    return arrays
+
+
+def merge_arrays(*blocks: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Concatenate channel arrays and sort them by timestamp.
+    """
+    merged = {
+        channel: np.concatenate([block[channel] for block in blocks])
+        for channel in blocks[0]
+    }
+    order = np.argsort(merged["timestamp"], kind="stable")
+    return {channel: values[order] for channel, values in merged.items()}
+
+
+def encode_block(arrays: Dict[str, np.ndarray]) -> bytes:
+    """
+    Serialize channel arrays into a compressed `.npz` payload.
+    """
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_block(payload: bytes) -> Dict[str, np.ndarray]:
+    """
+    Deserialize a compressed `.npz` payload into channel arrays.
+    """
+    with np.load(io.BytesIO(payload), allow_pickle=False) as archive:
+        return {channel: archive[channel] for channel in archive.files}
+
+
+def arrays_to_rows(
+    arrays: Dict[str, np.ndarray], session_id: int, driver_id: int, lap: int
+) -> List[Dict[str, Any]]:
+    """
+    Expand channel arrays back into telemetry row mappings.
+    """
+    columns: Dict[str, List[Any]] = {
+        "timestamp": [_from_epoch_us(value) for value in arrays["timestamp"].tolist()]
+    }
+    for channel in FLOAT_CHANNELS + INT_CHANNELS:
+        values = arrays[channel]
+        missing = np.isnan(values)
+        if channel in INT_CHANNELS:
+            values = np.where(missing, 0, values).astype(np.int64)
+        columns[channel] = [
+            None if is_missing else value
+            for value, is_missing in zip(values.tolist(), missing.tolist())
+        ]
+    for channel in TEXT_CHANNELS:
+        columns[channel] = [value or None for value in arrays[channel].tolist()]
+
+    count = len(columns["timestamp"])
+    rows = [
+        {channel: values[i] for channel, values in columns.items()}
+        for i in range(count)
+    ]
+    for row in rows:
+        row["session_id"] = session_id
+        row["driver_id"] = driver_id
+        row["lap"] = lap or None
+    return rows
+
+
+def _set_payload(block: TelemetryLapBlock, arrays: Dict[str, np.ndarray]) -> None:
+    block.sample_count = len(arrays["timestamp"])
+    block.start_time = _from_epoch_us(int(arrays["timestamp"][0]))
+    block.end_time = _from_epoch_us(int(arrays["timestamp"][-1]))
+    block.payload = encode_block(arrays)
+
+
+async def compact_lap_blocks(db: AsyncSession, session_id: int, driver_id: int, lap: int) -> int:
+    """
+    Merge the blocks of one driver lap into its oldest block.
+
+    The blocks are locked (SELECT ... FOR UPDATE) so concurrent compactions
+    of the lap run one after the other, and merged in insertion order so
+    samples with equal timestamps keep their order. Blocks appended while
+    the lap is being compacted are left for the next compaction.
+
+    Returns:
+        Number of blocks merged away
+    """
+    stmt = (
+        select(TelemetryLapBlock)
+        .where(
+            TelemetryLapBlock.session_id == session_id,
+            TelemetryLapBlock.driver_id == driver_id,
+            TelemetryLapBlock.lap == lap,
+        )
+        .order_by(TelemetryLapBlock.id)
+        .with_for_update()
+    )
+    blocks = list((await db.execute(stmt)).scalars())
+    if len(blocks) < 2:
+        return 0
+
+    _set_payload(blocks[0], merge_arrays(*[decode_block(block.payload) for block in blocks]))
+    for block in blocks[1:]:
+        await db.delete(block)
+    await db.flush()
+    logger.debug(f"Compacted {len(blocks)} blocks of driver {driver_id} lap {lap} in session {session_id}")
+    return len(blocks) - 1
+
+
+async def write_lap_blocks(
+    db: AsyncSession, session_id: int, rows: List[Dict[str, Any]]
+) -> int:
+    """
+    Append telemetry rows to the session's lap blocks.
+
+    Rows are grouped by (driver, lap) and each group is stored as a new
+    block, so writers never read or rewrite stored blocks and concurrent
+    writes to one lap cannot lose samples. A lap's blocks are compacted
+    into one when the driver's next lap receives samples, or once an open
+    lap gathers more than TELEMETRY_BLOCK_MAX_CHUNKS blocks, so a sample is
+    re-encoded once per lap (or per that many batches) instead of on every
+    batch. The caller is responsible for committing.
+
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        rows: Telemetry row mappings as built for TelemetryData
+
+    Returns:
+        Number of lap blocks written
+    """
+    groups: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault((row["driver_id"], row.get("lap") or 0), []).append(row)
+    if not groups:
+        return 0
+
+    for (driver_id, lap), group in groups.items():
+        block = TelemetryLapBlock(session_id=session_id, driver_id=driver_id, lap=lap)
+        _set_payload(block, merge_arrays(rows_to_arrays(group)))
+        db.add(block)
+    await db.flush()
+
+    # The written laps, and the laps before them that may just have closed
+    candidates = set(groups) | {(driver_id, lap - 1) for driver_id, lap in groups if lap > 1}
+    stmt = (
+        select(TelemetryLapBlock.driver_id, TelemetryLapBlock.lap, func.count())
+        .where(
+            TelemetryLapBlock.session_id == session_id,
+            tuple_(TelemetryLapBlock.driver_id, TelemetryLapBlock.lap).in_(list(candidates)),
+        )
+        .group_by(TelemetryLapBlock.driver_id, TelemetryLapBlock.lap)
+    )
+    for driver_id, lap, count in (await db.execute(stmt)).all():
+        closed = lap > 0 and (driver_id, lap + 1) in groups
+        if count > 1 and (closed or count > settings.TELEMETRY_BLOCK_MAX_CHUNKS):
+            await compact_lap_blocks(db, session_id, driver_id, lap)
+    return len(groups)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """
+    Treat naive datetimes as UTC so they compare with decoded timestamps.
+    """
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _lap_blocks_query(
+    session_id: int,
+    driver_id: Optional[int] = None,
+    lap_range: Optional[Tuple[int, int]] = None,
+    from_ts: Optional[datetime] = None,
+    to_ts: Optional[datetime] = None,
+):
+    """
+    Build the query selecting a session's lap block payloads by start time.
+
+    Lap and time filters prune whole blocks using their stored metadata.
+    """
+    stmt = select(
+        TelemetryLapBlock.id,
+        TelemetryLapBlock.driver_id,
+        TelemetryLapBlock.lap,
+        TelemetryLapBlock.start_time,
+        TelemetryLapBlock.payload,
+    ).where(TelemetryLapBlock.session_id == session_id)
+    if driver_id is not None:
+        stmt = stmt.where(TelemetryLapBlock.driver_id == driver_id)
+    if lap_range is not None:
+        stmt = stmt.where(TelemetryLapBlock.lap.between(*lap_range))
+    if from_ts is not None:
+        stmt = stmt.where(TelemetryLapBlock.end_time >= from_ts)
+    if to_ts is not None:
+        stmt = stmt.where(TelemetryLapBlock.start_time <= to_ts)
+    return stmt.order_by(TelemetryLapBlock.start_time, TelemetryLapBlock.driver_id)
+
+
+def _filter_arrays(
+    arrays: Dict[str, np.ndarray],
+    driver_id: int,
+    lap: int,
+    from_ts: Optional[datetime] = None,
+    to_ts: Optional[datetime] = None,
+    sector: Optional[int] = None,
+    after: Optional[Tuple[datetime, int, int, int]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Apply sample-level time, sector and keyset filters to a decoded block.
+
+    The keyset filter keeps every sample of the cursor's own (timestamp,
+    driver, lap) group; read_lap_blocks drops those up to the cursor's
+    ordinal once ordinals are known.
+    """
+    timestamps = arrays["timestamp"]
+    mask = np.ones(len(timestamps), dtype=bool)
+    if from_ts is not None:
+        mask &= timestamps >= _to_epoch_us(from_ts)
+    if to_ts is not None:
+        mask &= timestamps <= _to_epoch_us(to_ts)
+    if sector is not None:
+        mask &= arrays["sector"] == sector
+    if after is not None:
+        after_us = _to_epoch_us(after[0])
+        if (driver_id, lap) >= tuple(after[1:3]):
+            mask &= timestamps >= after_us
+        else:
+            mask &= timestamps > after_us
+    if mask.all():
+        return arrays
+    return {channel: values[mask] for channel, values in arrays.items()}
+
+
+async def read_lap_blocks(
+    db: AsyncSession,
+    session_id: int,
+    driver_id: Optional[int] = None,
+    lap_range: Optional[Tuple[int, int]] = None,
+    from_ts: Optional[datetime] = None,
+    to_ts: Optional[datetime] = None,
+    sector: Optional[int] = None,
+    after: Optional[Tuple[datetime, int, int, int]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Read a session's lap blocks back as telemetry row mappings in time order.
+
+    Rows carry an `ordinal`: the sample's rank among the samples of its
+    driver lap sharing its timestamp, in block insertion order. Compaction
+    merges blocks in that order with a stable sort, so the key
+    (timestamp, driver_id, lap, ordinal) identifies a sample for good and
+    is what keyset cursors resume from.
+
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        driver_id: Optional driver database ID to filter on
+        lap_range: Optional inclusive (first, last) lap numbers
+        from_ts: Optional inclusive start of the time window
+        to_ts: Optional inclusive end of the time window
+        sector: Optional sector number
+        after: Optional keyset cursor of (timestamp, driver_id, lap, ordinal)
+            to read past
+        limit: Optional maximum number of rows to return
+
+    Returns:
+        Telemetry row mappings ordered by (timestamp, driver_id, lap, ordinal)
+    """
+    cursor_group = None
+    if after is not None:
+        from_ts = max(from_ts, after[0]) if from_ts is not None else after[0]
+        cursor_group = (_as_utc(after[0]), after[1], after[2])
+
+    # (timestamp, driver_id, lap, block id, index in block, row)
+    entries: List[Tuple[datetime, int, int, int, int, Dict[str, Any]]] = []
+    held = 0
+
+    result = await db.stream(
+        _lap_blocks_query(session_id, driver_id, lap_range, from_ts, to_ts)
+        .execution_options(yield_per=1)
+    )
+    async for block_id, block_driver_id, lap, start_time, payload in result:
+        if limit is not None and len(entries) >= limit + held:
+            # Blocks arrive by start time, so stop once none can sort earlier.
+            # The cursor's own group sorts first and is kept whole, as part
+            # of it is dropped once ordinals are assigned.
+            entries.sort(key=lambda entry: entry[:5])
+            del entries[limit + held:]
+            if _as_utc(start_time) > entries[-1][0]:
+                break
+        arrays = _filter_arrays(
+            decode_block(payload), block_driver_id, lap, from_ts, to_ts, sector, after
+        )
+        for index, row in enumerate(arrays_to_rows(arrays, session_id, block_driver_id, lap)):
+            entries.append((row["timestamp"], block_driver_id, lap, block_id, index, row))
+            held += (row["timestamp"], block_driver_id, lap) == cursor_group
+    await result.close()
+
+    entries.sort(key=lambda entry: entry[:5])
+    rows: List[Dict[str, Any]] = []
+    previous = None
+    ordinal = 0
+    for timestamp, block_driver_id, lap, _, _, row in entries:
+        group = (timestamp, block_driver_id, lap)
+        ordinal = ordinal + 1 if group == previous else 0
+        previous = group
+        if group == cursor_group and ordinal <= after[3]:
+            continue
+        row["ordinal"] = ordinal
+        rows.append(row)
+        if limit is not None and len(rows) >= limit:
+            break
+    return rows
+
+
+async def stream_lap_blocks(
+    db: AsyncSession,
+    session_id: int,
+    driver_id: Optional[int] = None,
+    chunk_size: int = 5000,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Stream a session's lap blocks as time-ordered chunks of row mappings.
+
+    Blocks are fetched one at a time in start-time order and merged through a
+    heap, so only the blocks that overlap in time (one lap per driver) are
+    held in memory at once.
+
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        driver_id: Optional driver database ID to filter on
+        chunk_size: Maximum rows per yielded chunk
+
+    Yields:
+        Lists of at most chunk_size row mappings ordered by timestamp
+    """
+    pending: List[Tuple[datetime, int, int, Dict[str, Any]]] = []
+    chunk: List[Dict[str, Any]] = []
+    counter = 0
+
+    result = await db.stream(
+        _lap_blocks_query(session_id, driver_id).execution_options(yield_per=1)
+    )
+    async for _, block_driver_id, lap, start_time, payload in result:
+        # Nothing later in the stream can start before this block does
+        boundary = _as_utc(start_time)
+        while pending and pending[0][0] < boundary:
+            chunk.append(heapq.heappop(pending)[3])
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        for row in arrays_to_rows(decode_block(payload), session_id, block_driver_id, lap):
+            heapq.heappush(pending, (row["timestamp"], row["driver_id"], counter, row))
+            counter += 1
+
+    while pending:
+        chunk.append(heapq.heappop(pending)[3])
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,145 @@
+from typing import Any, AsyncIterator, Dict, List
+from datetime import datetime
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns written by every export format, in output order
+EXPORT_FIELDS = (
+    "timestamp",
+    "driver_id",
+    "lap",
+    "sector",
+    "speed",
+    "throttle",
+    "brake",
+    "gear",
+    "rpm",
+    "drs",
+    "position_x",
+    "position_y",
+    "position_z",
+    "tire_compound",
+    "tire_life",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def arrow_available() -> bool:
+    """
+    Check whether pyarrow is installed for Arrow IPC exports.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _export_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    record = {field: row.get(field) for field in EXPORT_FIELDS}
+    if isinstance(record["timestamp"], datetime):
+        record["timestamp"] = record["timestamp"].isoformat()
+    return record
+
+
+async def encode_ndjson(chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Encode chunks of telemetry rows as newline-delimited JSON.
+    """
+    async for chunk in chunks:
+        lines = [json.dumps(_export_record(row)) for row in chunk]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def encode_csv(chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Encode chunks of telemetry rows as CSV with a header line.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+
+    async for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_export_record(row) for row in chunk)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """
+    Minimal writable file object that hands written bytes back per chunk.
+    """
+
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+async def encode_arrow(chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Encode chunks of telemetry rows as an Arrow IPC stream, one record batch per chunk.
+    """
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("driver_id", pa.int32()),
+        ("lap", pa.int32()),
+        ("sector", pa.int8()),
+        ("speed", pa.float64()),
+        ("throttle", pa.float64()),
+        ("brake", pa.float64()),
+        ("gear", pa.int8()),
+        ("rpm", pa.float64()),
+        ("drs", pa.int8()),
+        ("position_x", pa.float64()),
+        ("position_y", pa.float64()),
+        ("position_z", pa.float64()),
+        ("tire_compound", pa.string()),
+        ("tire_life", pa.float64()),
+    ])
+
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+
+    async for chunk in chunks:
+        columns = {field: [row.get(field) for row in chunk] for field in EXPORT_FIELDS}
+        writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "arrow": encode_arrow,
+}
@@ -0,0 +1,255 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+import asyncio
+import logging
+import socket
+import time
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models import TelemetrySession
+from app.db.redis import get_redis_client
+from app.db.session import AsyncSessionLocal
+from app.services.live_telemetry import STREAM_INDEX_KEY, as_text, decode_entries, parse_stream_key
+from app.services.reference_cache import get_reference_data
+from app.services.telemetry_service import bulk_create_telemetry_data, refresh_ingested_summaries
+
+logger = logging.getLogger(__name__)
+
+PERSIST_GROUP = "telemetry-persist"
+
+
+class LiveTelemetryPersister:
+    """
+    Copies live telemetry streams into the telemetry_data table.
+
+    Workers on any number of pods join the same consumer group, so each
+    stream entry is persisted by exactly one of them and acknowledged once
+    written. A worker re-reads the entries it has claimed but not
+    acknowledged on start (under a stable consumer name, so this covers
+    restarts) and after a failed batch. Entries left pending on another
+    consumer for TELEMETRY_PERSIST_CLAIM_IDLE_MS, such as those of a pod
+    that is gone, are taken over with XAUTOCLAIM and persisted.
+
+    Only streams whose session ID is a stored telemetry session are
+    persisted; samples for unknown sessions or drivers are acknowledged and
+    skipped.
+
+    Lap summaries are refreshed when a lap's first samples are persisted,
+    which also completes the lap before it, rather than on every batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = AsyncSessionLocal,
+        redis_client: Optional[redis.Redis] = None,
+        consumer: Optional[str] = None,
+        batch_size: int = settings.TELEMETRY_PERSIST_BATCH_SIZE,
+        claim_idle_ms: int = settings.TELEMETRY_PERSIST_CLAIM_IDLE_MS
+    ) -> None:
+        self.session_factory = session_factory
+        # Stable across restarts so a restarted worker finds its own pending entries;
+        # give each worker process its own name when several run on one host
+        self.consumer = consumer or settings.TELEMETRY_PERSIST_CONSUMER or socket.gethostname()
+        self.batch_size = batch_size
+        self.claim_idle_ms = claim_idle_ms
+        self._redis = redis_client
+        self._groups: Set[str] = set()
+        self._recovering = True
+        self._last_claim = 0.0
+        # Highest lap summarized per (session, driver)
+        self._summarized: Dict[Tuple[int, int], int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = await get_redis_client()
+        return self._redis
+
+    async def _ensure_groups(self, redis_client: redis.Redis, keys: List[str]) -> List[str]:
+        """
+        Create the consumer group on new streams and prune expired ones from the index.
+        """
+        ready = []
+        for key in keys:
+            if key in self._groups:
+                ready.append(key)
+                continue
+            try:
+                await redis_client.xgroup_create(key, PERSIST_GROUP, id="0")
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    # The stream expired; forget it
+                    await redis_client.srem(STREAM_INDEX_KEY, key)
+                    continue
+            self._groups.add(key)
+            ready.append(key)
+        return ready
+
+    async def _claim_idle(self, redis_client: redis.Redis, keys: List[str]) -> List[Tuple[str, List[Any]]]:
+        """
+        Take over entries other consumers have left pending for claim_idle_ms.
+
+        Up to a batch is claimed per stream each time; a larger backlog is
+        taken over on following rounds.
+        """
+        claimed = []
+        for key in keys:
+            response = await redis_client.xautoclaim(
+                key,
+                PERSIST_GROUP,
+                self.consumer,
+                min_idle_time=self.claim_idle_ms,
+                count=self.batch_size,
+            )
+            if response[1]:
+                claimed.append((key, response[1]))
+        if claimed:
+            count = sum(len(entries) for _, entries in claimed)
+            logger.info(f"Claimed {count} idle live telemetry entries for {self.consumer}")
+        return claimed
+
+    async def _process(self, redis_client: redis.Redis, response: List[Tuple[Any, List[Any]]]) -> int:
+        """
+        Persist and acknowledge entries read or claimed from the streams.
+        """
+        processed = 0
+        for key, entries in response:
+            if not entries:
+                continue
+            key = as_text(key)
+            try:
+                # Pending entries trimmed from the stream come back without fields
+                await self._persist(key, [entry for entry in entries if entry[1]])
+            except Exception:
+                # Left pending; read them again before any new entries
+                self._recovering = True
+                raise
+            await redis_client.xack(key, PERSIST_GROUP, *[entry_id for entry_id, _ in entries])
+            processed += len(entries)
+        return processed
+
+    async def run_once(self, block_ms: Optional[int] = None) -> int:
+        """
+        Read one batch from every live stream, persist it and acknowledge it.
+
+        Every claim_idle_ms the batch is instead made of entries taken over
+        from other consumers, when there are any.
+
+        Args:
+            block_ms: How long to wait for new entries, None to return at once
+
+        Returns:
+            Number of stream entries processed
+        """
+        redis_client = await self._client()
+        keys = await self._ensure_groups(
+            redis_client, sorted(as_text(key) for key in await redis_client.smembers(STREAM_INDEX_KEY))
+        )
+        if not keys:
+            return 0
+
+        if time.monotonic() - self._last_claim >= self.claim_idle_ms / 1000:
+            self._last_claim = time.monotonic()
+            claimed = await self._claim_idle(redis_client, keys)
+            if claimed:
+                return await self._process(redis_client, claimed)
+
+        # "0" re-reads this consumer's unacknowledged entries, ">" reads new ones
+        position = "0" if self._recovering else ">"
+        try:
+            response = await redis_client.xreadgroup(
+                PERSIST_GROUP,
+                self.consumer,
+                {key: position for key in keys},
+                count=self.batch_size,
+                block=None if self._recovering else block_ms,
+            )
+        except ResponseError as e:
+            if "NOGROUP" in str(e):
+                self._groups.clear()
+                return 0
+            raise
+
+        processed = await self._process(redis_client, response or [])
+        if self._recovering and processed == 0:
+            self._recovering = False
+        return processed
+
+    async def _persist(self, key: str, entries: List[Tuple[Any, Dict[Any, Any]]]) -> int:
+        session_id, driver_code = parse_stream_key(key)
+        if not entries or not session_id.isdigit():
+            return 0
+
+        async with self.session_factory() as db:
+            if await db.get(TelemetrySession, int(session_id)) is None:
+                return 0
+            reference = await get_reference_data(db)
+            driver = reference.driver_by_code(driver_code) if driver_code else None
+            if driver is None:
+                logger.warning(f"Skipping live telemetry for unknown driver {driver_code!r}")
+                return 0
+
+            points = []
+            for point in decode_entries(entries):
+                timestamp = point.get("timestamp")
+                if isinstance(timestamp, str):
+                    timestamp = datetime.fromisoformat(timestamp)
+                points.append({**point, "timestamp": timestamp, "driver_id": driver["id"]})
+            touched: Set[Tuple[int, int]] = set()
+            accepted, _ = await bulk_create_telemetry_data(
+                db, int(session_id), points, refresh_summaries=False, touched=touched
+            )
+            new_laps = self._new_laps(int(session_id), touched)
+            await refresh_ingested_summaries(db, int(session_id), new_laps)
+            for driver_id, lap in new_laps:
+                key = (int(session_id), driver_id)
+                self._summarized[key] = max(self._summarized.get(key, 0), lap)
+
+        logger.debug(f"Persisted {accepted} live samples from {key}")
+        return accepted
+
+    def _new_laps(self, session_id: int, touched: Set[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """
+        Keep the (driver, lap) pairs this worker has not summarized yet.
+
+        A lap's summary is written when its first samples arrive and
+        rewritten, complete, when the next lap starts, so a lap streamed in
+        many batches is re-aggregated twice instead of once per batch.
+        """
+        return {
+            (driver_id, lap) for driver_id, lap in touched
+            if lap > self._summarized.get((session_id, driver_id), 0)
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.run_once(block_ms=1000) == 0:
+                    await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Live telemetry persister error: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Live telemetry persister started as {self.consumer}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create live telemetry persister instance
+live_persister = LiveTelemetryPersister()
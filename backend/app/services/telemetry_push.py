@@ -0,0 +1,252 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+import asyncio
+import logging
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.services.connection_manager import ConnectionManager, manager
+from app.services.telemetry_service import get_live_telemetry
+
+logger = logging.getLogger(__name__)
+
+# Reads live telemetry for (session_id, driver_id) newer than a sequence number
+TelemetrySource = Callable[
+    [str, Optional[str], Optional[int]], Awaitable[Optional[Dict[str, Any]]]
+]
+StreamKey = Tuple[str, Optional[str]]
+
+
+class TelemetryProducer:
+    """
+    Reads one (session, driver) stream and pushes new samples to its subscribers.
+
+    The source is read once per tick however many sockets are subscribed,
+    asking only for samples after the last pushed sequence number.
+
+    New samples can be held back and sent together: a batch is flushed
+    `batch_window` seconds after its first sample or once it reaches
+    `batch_max_samples`, whichever comes first. A zero window sends every
+    read as its own frame.
+    """
+
+    def __init__(
+        self,
+        key: StreamKey,
+        source: TelemetrySource,
+        connections: ConnectionManager,
+        rate_hz: float,
+        last_seq: Optional[int] = None,
+        batch_window: float = 0.0,
+        batch_max_samples: int = 0
+    ) -> None:
+        self.key = key
+        self.source = source
+        self.connections = connections
+        self.interval = 1.0 / rate_hz
+        self.batch_window = batch_window
+        self.batch_max_samples = batch_max_samples
+        self.subscribers: Set[WebSocket] = set()
+        self.last_seq = last_seq
+        self.pending: List[Dict[str, Any]] = []
+        self.flush_at: Optional[float] = None
+        self._current_lap: Optional[int] = None
+        self._task = asyncio.create_task(self._run())
+
+    async def tick(self) -> int:
+        """
+        Read the source once and batch or push any new samples.
+
+        Returns:
+            Number of sockets an update was queued for, 0 if none was sent
+        """
+        session_id, driver_id = self.key
+        telemetry = await self.source(session_id, driver_id, self.last_seq)
+        if not telemetry:
+            return 0
+        if self.last_seq is None:
+            # No baseline from a subscriber, so start from the current position
+            self.last_seq = telemetry.get("last_seq")
+            return 0
+        points = [point for point in telemetry.get("data") or [] if point["seq"] > self.last_seq]
+        if telemetry.get("last_seq") is not None:
+            self.last_seq = max(self.last_seq, telemetry["last_seq"])
+        if not points:
+            return 0
+        self._current_lap = telemetry.get("current_lap")
+        if not self.pending:
+            self.flush_at = asyncio.get_running_loop().time() + self.batch_window
+        self.pending.extend(points)
+        if self.batch_window <= 0 or (
+            self.batch_max_samples and len(self.pending) >= self.batch_max_samples
+        ):
+            return await self.flush()
+        return 0
+
+    async def flush(self) -> int:
+        """
+        Push the held samples as one update.
+
+        Returns:
+            Number of sockets the update was queued for
+        """
+        if not self.pending:
+            return 0
+        session_id, driver_id = self.key
+        points, self.pending, self.flush_at = self.pending, [], None
+        return await self.connections.send_many(
+            {
+                "type": "telemetry_update",
+                "session_id": session_id,
+                "driver_id": driver_id,
+                "data": points,
+                "current_lap": self._current_lap,
+                "last_seq": self.last_seq,
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            self.subscribers
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            try:
+                if loop.time() >= next_tick:
+                    await self.tick()
+                    # Hold the rate regardless of how long the read took
+                    next_tick += self.interval
+                if self.flush_at is not None and loop.time() >= self.flush_at:
+                    await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Telemetry producer {self.key} error: {str(e)}")
+            wake_at = next_tick if self.flush_at is None else min(next_tick, self.flush_at)
+            await asyncio.sleep(max(0.0, wake_at - loop.time()))
+
+    async def stop(self) -> None:
+        """
+        Stop reading and push any held samples to the remaining subscribers.
+        """
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Telemetry producer {self.key} error: {str(e)}")
+
+
+class TelemetryPushHub:
+    """
+    Runs one producer per subscribed (session, driver) on this worker.
+
+    Producers start with their first subscriber and stop with their last,
+    so reads from the telemetry source scale with active streams rather
+    than connected clients. A socket may hold at most `max_subscriptions`
+    streams.
+    """
+
+    def __init__(
+        self,
+        connections: ConnectionManager,
+        source: TelemetrySource = get_live_telemetry,
+        rate_hz: float = settings.TELEMETRY_PUSH_RATE_HZ,
+        batch_window_ms: int = settings.WS_BATCH_WINDOW_MS,
+        batch_max_samples: int = settings.WS_BATCH_MAX_SAMPLES,
+        max_subscriptions: int = settings.WS_MAX_SUBSCRIPTIONS
+    ) -> None:
+        self.connections = connections
+        self.source = source
+        self.rate_hz = rate_hz
+        self.batch_window = batch_window_ms / 1000
+        self.batch_max_samples = batch_max_samples
+        self.max_subscriptions = max_subscriptions
+        self.producers: Dict[StreamKey, TelemetryProducer] = {}
+
+    async def subscribe(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        driver_id: Optional[str] = None,
+        since_seq: Optional[int] = None
+    ) -> None:
+        """
+        Subscribe a socket to a session's telemetry, optionally for one driver.
+
+        `since_seq` is the last sequence the socket has already been sent; a
+        new producer starts from there so nothing is skipped. A running
+        producer may resend a few samples, which clients drop by `seq`.
+
+        Raises:
+            ValueError: If the socket already holds max_subscriptions streams
+        """
+        if not self.can_subscribe(websocket, session_id, driver_id):
+            raise ValueError(f"At most {self.max_subscriptions} telemetry subscriptions per connection")
+        key = (session_id, driver_id)
+        producer = self.producers.get(key)
+        if producer is None:
+            producer = TelemetryProducer(
+                key,
+                self.source,
+                self.connections,
+                self.rate_hz,
+                last_seq=since_seq,
+                batch_window=self.batch_window,
+                batch_max_samples=self.batch_max_samples
+            )
+            self.producers[key] = producer
+            logger.info(f"Started telemetry producer for {key}")
+        producer.subscribers.add(websocket)
+
+    async def unsubscribe(
+        self, websocket: WebSocket, session_id: str, driver_id: Optional[str] = None
+    ) -> None:
+        """
+        Remove a socket from a stream, stopping the producer if it was the last.
+        """
+        key = (session_id, driver_id)
+        producer = self.producers.get(key)
+        if producer is None:
+            return
+        producer.subscribers.discard(websocket)
+        if not producer.subscribers:
+            del self.producers[key]
+            await producer.stop()
+            logger.info(f"Stopped telemetry producer for {key}")
+
+    async def unsubscribe_all(self, websocket: WebSocket) -> None:
+        """
+        Remove a socket from every stream it is subscribed to.
+        """
+        for key, producer in list(self.producers.items()):
+            if websocket in producer.subscribers:
+                await self.unsubscribe(websocket, *key)
+
+    def subscriptions(self, websocket: WebSocket) -> List[StreamKey]:
+        return [key for key, producer in self.producers.items() if websocket in producer.subscribers]
+
+    def can_subscribe(
+        self, websocket: WebSocket, session_id: str, driver_id: Optional[str] = None
+    ) -> bool:
+        """
+        Check that a subscription is held already or fits under max_subscriptions.
+        """
+        subscriptions = self.subscriptions(websocket)
+        return (session_id, driver_id) in subscriptions or len(subscriptions) < self.max_subscriptions
+
+    async def stop(self) -> None:
+        """
+        Stop every producer.
+        """
+        for producer in list(self.producers.values()):
+            await producer.stop()
+        self.producers.clear()
+
+
+# Create telemetry push hub instance
+push_hub = TelemetryPushHub(manager)
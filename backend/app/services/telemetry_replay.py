@@ -0,0 +1,357 @@
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.live_telemetry import LiveTelemetryWindow, live_window
+from app.services.reference_cache import get_reference_data
+from app.services.telemetry_service import TELEMETRY_VALUE_FIELDS, get_telemetry_data, telemetry_keyset
+
+logger = logging.getLogger(__name__)
+
+
+def _utc(value: datetime) -> datetime:
+    """
+    Treat naive datetimes as UTC so stored and requested times compare.
+    """
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def replay_session_id(session_id: int, user_id: Optional[int] = None, name: Optional[str] = None) -> str:
+    """
+    Live session a stored session is replayed into.
+
+    Without a name this is `replay-{session_id}`. Custom names are scoped to
+    the user starting the replay (`u{user_id}-{name}`), so one user cannot
+    publish into a live session another user picked.
+    """
+    if name is None:
+        return f"replay-{session_id}"
+    return f"u{user_id}-{name}"
+
+
+class VirtualClock:
+    """
+    Session time running at a multiple of wall-clock time.
+
+    The clock is anchored at a (session time, wall time) pair. Seeking,
+    pausing and changing speed re-anchor it, so session time only jumps
+    when asked to.
+    """
+
+    def __init__(
+        self,
+        position: datetime,
+        speed: float = 1.0,
+        time_fn: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.speed = speed
+        self.paused = False
+        self._time = time_fn
+        self._anchor = position
+        self._anchor_wall = time_fn()
+
+    def now(self) -> datetime:
+        if self.paused:
+            return self._anchor
+        return self._anchor + timedelta(seconds=(self._time() - self._anchor_wall) * self.speed)
+
+    def _reanchor(self, position: datetime) -> None:
+        self._anchor = position
+        self._anchor_wall = self._time()
+
+    def seek(self, position: datetime) -> None:
+        self._reanchor(position)
+
+    def set_speed(self, speed: float) -> None:
+        self._reanchor(self.now())
+        self.speed = speed
+
+    def pause(self) -> None:
+        self._reanchor(self.now())
+        self.paused = True
+
+    def resume(self) -> None:
+        self._reanchor(self.now())
+        self.paused = False
+
+    def wall_seconds_until(self, position: datetime) -> Optional[float]:
+        """
+        Wall-clock seconds until session time reaches `position`, None while paused.
+        """
+        if self.paused:
+            return None
+        return max(0.0, (position - self.now()).total_seconds() / self.speed)
+
+
+def _check_speed(speed: float) -> float:
+    if not 1.0 <= speed <= settings.TELEMETRY_REPLAY_MAX_SPEED:
+        raise ValueError(
+            f"Replay speed must be between 1 and {settings.TELEMETRY_REPLAY_MAX_SPEED:g}"
+        )
+    return speed
+
+
+class SessionReplay:
+    """
+    Re-streams a stored telemetry session through the live telemetry window.
+
+    Stored samples are read in time order, a page ahead of playback, and
+    appended to the live window when a virtual clock running at 1-50x
+    reaches their timestamp. WebSocket and REST readers of the live session
+    get them exactly like live data, so a replay is both a product feature
+    and a repeatable, production-like load generator.
+
+    Seeking drops the read-ahead and reads again from the requested time
+    through the (session_id, timestamp) index instead of scanning forward.
+
+    Replays are published into a separate live session (`replay-{id}` by
+    default), never under a stored session's own numeric ID, so the live
+    persister does not write replayed samples back into the database.
+    """
+
+    def __init__(
+        self,
+        session_id: int,
+        speed: float = 1.0,
+        driver_id: Optional[str] = None,
+        start_at: Optional[datetime] = None,
+        live_session_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        session_factory: sessionmaker = AsyncSessionLocal,
+        window: LiveTelemetryWindow = live_window,
+        page_size: int = settings.TELEMETRY_REPLAY_PAGE_SIZE,
+        time_fn: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.live_session_id = live_session_id or replay_session_id(session_id)
+        if self.live_session_id.isdigit():
+            raise ValueError("Replays cannot publish into a stored session's numeric ID")
+        self.session_id = session_id
+        self.speed = _check_speed(speed)
+        self.driver_id = driver_id
+        self.user_id = user_id
+        self.session_factory = session_factory
+        self.window = window
+        self.page_size = page_size
+        self.time_fn = time_fn
+        self.clock: Optional[VirtualClock] = None
+        self.emitted = 0
+        self.finished = False
+        self._buffer: Deque[Tuple[datetime, Dict[str, Any]]] = deque()
+        self._after: Optional[Tuple[Any, ...]] = None
+        self._from_ts = start_at
+        self._exhausted = False
+        self._generation = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _fetch(self) -> None:
+        """
+        Read the next page of stored samples into the read-ahead buffer.
+        """
+        generation = self._generation
+        async with self.session_factory() as db:
+            rows = await get_telemetry_data(
+                db,
+                self.session_id,
+                self.driver_id,
+                from_ts=self._from_ts,
+                after=self._after,
+                limit=self.page_size,
+            )
+            reference = await get_reference_data(db)
+        if generation != self._generation:
+            # A seek happened while reading; this page is stale
+            return
+
+        self._from_ts = None
+        self._exhausted = len(rows) < self.page_size
+        if not rows:
+            return
+        last = rows[-1]
+        self._after = telemetry_keyset(last)
+        for row in rows:
+            driver = reference.driver(row["driver_id"])
+            sample = {field: row.get(field) for field in TELEMETRY_VALUE_FIELDS}
+            sample["timestamp"] = row["timestamp"].isoformat()
+            sample["driver_id"] = driver["code"] if driver else str(row["driver_id"])
+            self._buffer.append((_utc(row["timestamp"]), sample))
+
+    async def step(self) -> Optional[float]:
+        """
+        Publish every buffered sample the virtual clock has reached.
+
+        Returns:
+            Seconds until the next sample is due, or None when paused or finished
+        """
+        if not self._buffer and not self._exhausted:
+            await self._fetch()
+        if not self._buffer:
+            if not self._exhausted:
+                # The page was dropped by a seek; read again
+                return 0.0
+            self.finished = True
+            return None
+
+        now = self.clock.now()
+        due: List[Dict[str, Any]] = []
+        while self._buffer and self._buffer[0][0] <= now:
+            due.append(self._buffer.popleft()[1])
+        if due:
+            await self.window.append(self.live_session_id, due)
+            self.emitted += len(due)
+        if not self._buffer:
+            # Read the next page (or finish) straight away
+            return 0.0
+        return self.clock.wall_seconds_until(self._buffer[0][0])
+
+    async def _run(self) -> None:
+        while not self.finished:
+            self._wake.clear()
+            try:
+                delay = await self.step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Replay of session {self.session_id} error: {str(e)}")
+                delay = 1.0
+            if self.finished:
+                break
+            try:
+                # None waits until a control change wakes the replay
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        logger.info(f"Replay of session {self.session_id} finished after {self.emitted} samples")
+
+    async def start(self) -> None:
+        """
+        Read the first page, start the clock there and begin publishing.
+
+        Raises:
+            LookupError: If the session has no stored telemetry to replay
+        """
+        position = self._from_ts
+        await self._fetch()
+        if not self._buffer:
+            raise LookupError(f"No stored telemetry to replay for session {self.session_id}")
+        start = _utc(position) if position is not None else self._buffer[0][0]
+        self.clock = VirtualClock(start, self.speed, self.time_fn)
+        await self.step()
+        self._task = asyncio.create_task(self._run())
+
+    def seek(self, position: datetime) -> None:
+        """
+        Continue playback from a session time.
+        """
+        self._generation += 1
+        self._buffer.clear()
+        self._after = None
+        self._from_ts = position
+        self._exhausted = False
+        self.finished = False
+        self.clock.seek(_utc(position))
+        self._wake.set()
+        if self._task is not None and self._task.done():
+            # Playback had reached the end; pick it up again
+            self._task = asyncio.create_task(self._run())
+
+    def set_speed(self, speed: float) -> None:
+        self.speed = _check_speed(speed)
+        self.clock.set_speed(speed)
+        self._wake.set()
+
+    def pause(self) -> None:
+        self.clock.pause()
+        self._wake.set()
+
+    def resume(self) -> None:
+        self.clock.resume()
+        self._wake.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "live_session_id": self.live_session_id,
+            "driver_id": self.driver_id,
+            "speed": self.speed,
+            "paused": self.clock.paused,
+            "finished": self.finished,
+            "position": self.clock.now(),
+            "emitted": self.emitted,
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class ReplayManager:
+    """
+    Replays running on this worker, by the live session they publish into.
+
+    Samples land in the shared live window, so clients on any worker can
+    watch a replay, but its controls live on the worker that started it.
+    """
+
+    def __init__(self, session_factory: sessionmaker = AsyncSessionLocal) -> None:
+        self.session_factory = session_factory
+        self.replays: Dict[str, SessionReplay] = {}
+
+    async def start(self, session_id: int, replace_any: bool = False, **options: Any) -> SessionReplay:
+        """
+        Start replaying a stored session, replacing the user's replay into the same live session.
+
+        Args:
+            session_id: Stored telemetry session to replay
+            replace_any: Also replace replays started by other users
+            **options: SessionReplay options
+
+        Raises:
+            ValueError: If the speed or live session ID is invalid
+            LookupError: If the session has no stored telemetry
+            PermissionError: If another user's replay publishes into the live session
+        """
+        replay = SessionReplay(session_id, session_factory=self.session_factory, **options)
+        existing = self.replays.get(replay.live_session_id)
+        if existing is not None:
+            if existing.user_id != replay.user_id and not replace_any:
+                raise PermissionError(f"Live session {replay.live_session_id} is replaying for another user")
+            del self.replays[replay.live_session_id]
+            await existing.stop()
+        await replay.start()
+        self.replays[replay.live_session_id] = replay
+        logger.info(
+            f"Replaying session {session_id} into {replay.live_session_id} at {replay.speed:g}x"
+        )
+        return replay
+
+    def get(self, live_session_id: str) -> Optional[SessionReplay]:
+        return self.replays.get(live_session_id)
+
+    async def stop(self, live_session_id: str) -> bool:
+        replay = self.replays.pop(live_session_id, None)
+        if replay is None:
+            return False
+        await replay.stop()
+        return True
+
+    async def stop_all(self) -> None:
+        for replay in list(self.replays.values()):
+            await replay.stop()
+        self.replays.clear()
+
+
+# Create replay manager instance
+replay_manager = ReplayManager()
@@ -1,37 +1,30 @@
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Any, Set, Tuple
 from datetime import datetime
 import logging
 import json
 import asyncio
+import base64
+import binascii
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql.expression import or_
-import redis.asyncio as redis
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, insert, tuple_
 
-from app.db.models import TelemetrySession, TelemetryData, User, Driver, Circuit, Race
+from app.db.models import TelemetrySession, TelemetryData, TelemetryLapBlock, User, Driver, Circuit, Race
 from app.schemas.telemetry import TelemetryResponse, TelemetryDataPoint
+from app.services.lap_summaries import refresh_lap_summaries
+from app.services.live_telemetry import live_window
+from app.services.telemetry_simulator import live_simulations
+from app.services.reference_cache import get_reference_data
+from app.services.telemetry_columnar import (
+    read_lap_blocks,
+    stream_lap_blocks,
+    write_lap_blocks,
+)
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Connect to Redis
-redis_client = None
-
-async def get_redis_client() -> redis.Redis:
-    """
-    Get or create Redis client.
-    """
-    global redis_client
-    if redis_client is None:
-        try:
-            redis_client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-            logger.info("Connected to Redis")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {str(e)}")
-            raise
-    return redis_client
-
 
 async def get_telemetry_session(db: AsyncSession, session_id: int) -> Optional[TelemetrySession]:
     """
@@ -42,136 +35,360 @@ async def get_telemetry_session(db: AsyncSession, session_id: int) -> Optional[T
     return result.scalar_one_or_none()
 
 
-async def get_telemetry_data(
-    db: AsyncSession, session_id: int, driver_id: Optional[str] = None
-) -> List[TelemetryData]:
+# Columns returned by telemetry reads, in row mapping order
+TELEMETRY_COLUMNS = (
+    TelemetryData.id,
+    TelemetryData.session_id,
+    TelemetryData.driver_id,
+    TelemetryData.timestamp,
+    TelemetryData.lap,
+    TelemetryData.speed,
+    TelemetryData.throttle,
+    TelemetryData.brake,
+    TelemetryData.gear,
+    TelemetryData.rpm,
+    TelemetryData.drs,
+    TelemetryData.position_x,
+    TelemetryData.position_y,
+    TelemetryData.position_z,
+    TelemetryData.tire_compound,
+    TelemetryData.tire_life,
+    TelemetryData.sector,
+)
+
+
+async def _resolve_driver_pk(db: AsyncSession, driver_code: Optional[str]) -> Optional[int]:
     """
-    Get telemetry data for a session and optional driver.
+    Resolve a driver code such as "HAM" to the driver's database ID.
     """
-    stmt = select(TelemetryData).where(TelemetryData.session_id == session_id)
+    if not driver_code:
+        return None
     
-    if driver_id:
-        # Get driver ID from driver code
-        driver_stmt = select(Driver).where(Driver.code == driver_id)
-        driver_result = await db.execute(driver_stmt)
-        driver = driver_result.scalar_one_or_none()
-        
-        if driver:
-            stmt = stmt.where(TelemetryData.driver_id == driver.id)
+    reference = await get_reference_data(db)
+    driver = reference.driver_by_code(driver_code)
+    return driver["id"] if driver else None
+
+
+_COLUMNS_BY_NAME = {column.key: column for column in TELEMETRY_COLUMNS}
+
+# Columns always returned by projected reads, needed for ordering and cursors
+_KEY_COLUMNS = ("id", "driver_id", "timestamp")
+_COLUMNAR_KEY_COLUMNS = ("driver_id", "timestamp", "lap", "ordinal")
+
+
+def telemetry_keyset(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Get the keyset position of a telemetry row, as accepted by `after`.
     
-    stmt = stmt.order_by(desc(TelemetryData.timestamp))
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    Row storage orders by (timestamp, id); columnar storage has no row IDs
+    and orders by (timestamp, driver_id, lap, ordinal).
+    """
+    if row.get("id") is not None:
+        return row["timestamp"], row["id"]
+    return row["timestamp"], row["driver_id"], row["lap"] or 0, row["ordinal"]
 
 
-async def get_cached_telemetry(
-    session_id: str, driver_id: Optional[str] = None
-) -> Optional[Dict[str, Any]]:
+def encode_telemetry_cursor(row: Dict[str, Any]) -> str:
     """
-    Get cached telemetry data from Redis.
+    Encode the keyset position of a telemetry row as an opaque cursor.
     """
+    timestamp, *tiebreak = telemetry_keyset(row)
+    raw = json.dumps([timestamp.isoformat(), *tiebreak])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_telemetry_cursor(cursor: str) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_telemetry_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed or from the other storage backend
+    """
+    expected = 4 if settings.TELEMETRY_STORAGE_BACKEND == "columnar" else 2
     try:
-        redis_client = await get_redis_client()
-        
-        # Construct cache key
-        cache_key = f"telemetry:{session_id}"
-        if driver_id:
-            cache_key += f":{driver_id}"
+        timestamp, *tiebreak = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if len(tiebreak) != expected - 1:
+            raise ValueError("wrong number of fields")
+        return (datetime.fromisoformat(timestamp), *(int(value) for value in tiebreak))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _select_telemetry(columns: Optional[Iterable[str]] = None):
+    """
+    Build a column SELECT over TelemetryData, optionally projected.
+    
+    Raises:
+        ValueError: If an unknown column is requested
+    """
+    if columns is None:
+        return select(*TELEMETRY_COLUMNS)
+    
+    unknown = set(columns) - set(_COLUMNS_BY_NAME)
+    if unknown:
+        raise ValueError(f"Unknown telemetry columns: {', '.join(sorted(unknown))}")
+    
+    names = list(_KEY_COLUMNS) + [name for name in columns if name not in _KEY_COLUMNS]
+    return select(*(_COLUMNS_BY_NAME[name] for name in names))
+
+
+def _project(rows: List[Dict[str, Any]], columns: Optional[Iterable[str]]) -> List[Dict[str, Any]]:
+    """
+    Drop unrequested channels from row mappings read from columnar storage.
+    """
+    if columns is None:
+        return rows
+    keep = set(_COLUMNAR_KEY_COLUMNS) | set(columns)
+    return [{key: value for key, value in row.items() if key in keep} for row in rows]
+
+
+async def get_telemetry_data(
+    db: AsyncSession,
+    session_id: int,
+    driver_id: Optional[str] = None,
+    lap_range: Optional[Tuple[int, int]] = None,
+    from_ts: Optional[datetime] = None,
+    to_ts: Optional[datetime] = None,
+    sector: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    after: Optional[Tuple[Any, ...]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Get telemetry data for a session and optional driver.
+    
+    Reads from the configured storage backend and returns plain row
+    mappings in time order, so callers never deal with ORM objects.
+    
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        driver_id: Optional driver code to filter on
+        lap_range: Optional inclusive (first, last) lap numbers
+        from_ts: Optional inclusive start of the time window
+        to_ts: Optional inclusive end of the time window
+        sector: Optional sector number
+        columns: Optional channel names to return (key columns are always kept)
+        after: Optional keyset position from telemetry_keyset or
+            decode_telemetry_cursor
+        limit: Optional maximum number of rows
         
-        # Try to get data from cache
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data)
+    Returns:
+        Telemetry row mappings ordered by timestamp
         
-        return None
-    except Exception as e:
-        logger.error(f"Redis error when getting cached telemetry: {str(e)}")
-        return None
+    Raises:
+        ValueError: If an unknown column is requested
+    """
+    driver_pk = await _resolve_driver_pk(db, driver_id)
+    # Built up front for both backends so unknown columns are always rejected
+    stmt = _select_telemetry(columns)
+    
+    if settings.TELEMETRY_STORAGE_BACKEND == "columnar":
+        rows = await read_lap_blocks(
+            db, session_id, driver_pk,
+            lap_range=lap_range, from_ts=from_ts, to_ts=to_ts,
+            sector=sector, after=after, limit=limit,
+        )
+        return _project(rows, columns)
+    
+    stmt = stmt.where(TelemetryData.session_id == session_id)
+    if driver_pk is not None:
+        stmt = stmt.where(TelemetryData.driver_id == driver_pk)
+    if lap_range is not None:
+        stmt = stmt.where(TelemetryData.lap.between(*lap_range))
+    if from_ts is not None:
+        stmt = stmt.where(TelemetryData.timestamp >= from_ts)
+    if to_ts is not None:
+        stmt = stmt.where(TelemetryData.timestamp <= to_ts)
+    if sector is not None:
+        stmt = stmt.where(TelemetryData.sector == sector)
+    if after is not None:
+        stmt = stmt.where(tuple_(TelemetryData.timestamp, TelemetryData.id) > tuple_(*after))
+    
+    stmt = stmt.order_by(TelemetryData.timestamp, TelemetryData.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return [dict(row) for row in result.mappings()]
 
 
-async def cache_telemetry_data(
-    session_id: str, 
-    data: Dict[str, Any], 
+async def get_telemetry_page(
+    db: AsyncSession,
+    session_id: int,
     driver_id: Optional[str] = None,
-    expire: int = 3600
-) -> bool:
+    cursor: Optional[str] = None,
+    limit: int = 1000,
+    **filters: Any,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Cache telemetry data in Redis.
+    Get one keyset-paginated page of telemetry data.
+    
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        driver_id: Optional driver code to filter on
+        cursor: Cursor returned with the previous page
+        limit: Maximum rows in the page
+        **filters: Any other filters accepted by get_telemetry_data
+        
+    Returns:
+        Tuple of (rows, cursor for the next page or None on the last page)
+        
+    Raises:
+        ValueError: If the cursor or a requested column is invalid
     """
-    try:
-        redis_client = await get_redis_client()
+    after = decode_telemetry_cursor(cursor) if cursor else None
+    rows = await get_telemetry_data(
+        db, session_id, driver_id, after=after, limit=limit + 1, **filters
+    )
+    
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_telemetry_cursor(rows[-1])
+
+
+async def stream_telemetry_data(
+    db: AsyncSession,
+    session_id: int,
+    driver_id: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Stream telemetry data for a session in fixed-size chunks.
+    
+    Uses a server-side cursor so the full result never sits in memory.
+    
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        driver_id: Optional driver code to filter on
+        chunk_size: Rows per chunk, defaults to TELEMETRY_EXPORT_CHUNK_SIZE
         
-        # Construct cache key
-        cache_key = f"telemetry:{session_id}"
-        if driver_id:
-            cache_key += f":{driver_id}"
+    Yields:
+        Lists of row mappings ordered by timestamp
+    """
+    chunk_size = chunk_size or settings.TELEMETRY_EXPORT_CHUNK_SIZE
+    driver_pk = await _resolve_driver_pk(db, driver_id)
+    
+    if settings.TELEMETRY_STORAGE_BACKEND == "columnar":
+        async for chunk in stream_lap_blocks(db, session_id, driver_pk, chunk_size):
+            yield chunk
+        return
+    
+    stmt = select(*TELEMETRY_COLUMNS).where(TelemetryData.session_id == session_id)
+    if driver_pk is not None:
+        stmt = stmt.where(TelemetryData.driver_id == driver_pk)
+    stmt = stmt.order_by(TelemetryData.timestamp, TelemetryData.id)
+    
+    result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+    async for partition in result.mappings().partitions(chunk_size):
+        yield [dict(row) for row in partition]
+
+
+async def get_stored_laps(db: AsyncSession, session_id: int) -> Dict[int, Set[int]]:
+    """
+    Get the laps already stored for each driver of a session.
+    
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
         
-        # Cache data
-        await redis_client.set(cache_key, json.dumps(data), ex=expire)
-        return True
-    except Exception as e:
-        logger.error(f"Redis error when caching telemetry: {str(e)}")
-        return False
+    Returns:
+        Lap numbers keyed by driver database ID
+    """
+    if settings.TELEMETRY_STORAGE_BACKEND == "columnar":
+        stmt = select(TelemetryLapBlock.driver_id, TelemetryLapBlock.lap).where(
+            TelemetryLapBlock.session_id == session_id
+        ).distinct()
+    else:
+        stmt = select(TelemetryData.driver_id, TelemetryData.lap).where(
+            TelemetryData.session_id == session_id
+        ).distinct()
+    
+    laps: Dict[int, Set[int]] = {}
+    for driver_id, lap in (await db.execute(stmt)).all():
+        if lap:
+            laps.setdefault(driver_id, set()).add(lap)
+    return laps
 
 
 async def get_live_telemetry(
-    session_id: str, driver_id: Optional[str] = None
+    session_id: str,
+    driver_id: Optional[str] = None,
+    since_seq: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get real-time telemetry data.
     
-    This is a placeholder function that should be replaced with actual
-    implementation based on your data source (FastF1, UDP stream, etc.)
-    """
-    # First check if we have cached data
-    cached_data = await get_cached_telemetry(session_id, driver_id)
-    if cached_data:
-        # In a real app, we'd return only newer data than what the client has
-        # For simplicity, just return what we have
-        return cached_data
-    
-    # No cached data, so generate dummy data for demo purposes
-    # In a real app, this would come from FastF1 or a similar data source
-    import random
-    from datetime import datetime, timedelta
+    Samples come from the live telemetry window and carry a monotonically
+    increasing `seq`. Pass the last `seq` a client has seen as `since_seq`
+    to get only newer samples; `gap` is set when some of them were already
+    trimmed from the window.
     
-    # Generate simulated telemetry data
-    data_points = []
-    now = datetime.utcnow()
+    Sessions whose ID starts with TELEMETRY_SIMULATOR_PREFIX ("demo-") are
+    fed by a simulated race that advances to wall-clock time on every read
+    (TELEMETRY_SIMULATOR_ENABLED); every other session only returns what
+    real sources (ingest, replays) published. Only the worker holding the
+    session's simulator lease writes simulated samples.
     
-    for i in range(10):  # Generate 10 data points
-        timestamp = now - timedelta(seconds=i)
+    Args:
+        session_id: Session ID
+        driver_id: Only return samples for this driver
+        since_seq: Only return samples with a greater sequence number
         
-        data_points.append({
-            "timestamp": timestamp.isoformat(),
-            "speed": random.uniform(80, 320),
-            "throttle": random.uniform(0, 100),
-            "brake": random.uniform(0, 100) if random.random() < 0.3 else 0,
-            "gear": random.randint(1, 8),
-            "rpm": random.uniform(5000, 12000),
-            "drs": 1 if random.random() < 0.2 else 0,
-            "position_x": random.uniform(0, 1000),
-            "position_y": random.uniform(0, 1000),
-            "position_z": random.uniform(-10, 10),
-            "tire_compound": random.choice(["soft", "medium", "hard"]),
-            "tire_life": random.uniform(30, 100),
-            "sector": random.randint(1, 3),
-            "lap": random.randint(1, 50)
-        })
-    
-    telemetry_data = {
+    Returns:
+        Telemetry dict with `data`, `last_seq` and `gap`
+    """
+    simulate = settings.TELEMETRY_SIMULATOR_ENABLED and live_simulations.simulates(session_id)
+    if simulate and session_id in live_simulations.sessions and await live_simulations.claim(session_id):
+        await live_window.append(session_id, live_simulations.advance(session_id, driver_id))
+    points, last_seq, gap = await live_window.read(session_id, driver_id, since_seq)
+    
+    if last_seq is None and simulate and await live_simulations.claim(session_id):
+        # No live data yet, so start a simulated race for demo purposes
+        await live_window.append(session_id, live_simulations.advance(session_id, driver_id))
+        points, last_seq, gap = await live_window.read(session_id, driver_id, since_seq)
+    
+    return {
         "session_id": session_id,
         "driver_id": driver_id,
-        "data": data_points,
-        "lap_count": 50,
-        "current_lap": random.randint(1, 50),
-        "last_update": now.isoformat()
+        "data": points,
+        "lap_count": None,
+        "current_lap": points[-1].get("lap") if points else None,
+        "last_seq": last_seq,
+        "gap": gap,
+        "last_update": datetime.utcnow().isoformat()
     }
-    
-    # Cache the generated data
-    await cache_telemetry_data(session_id, telemetry_data, driver_id)
-    
-    return telemetry_data
+
+
+# Columns copied from incoming telemetry points onto TelemetryData rows
+TELEMETRY_VALUE_FIELDS = (
+    "lap",
+    "speed",
+    "throttle",
+    "brake",
+    "gear",
+    "rpm",
+    "drs",
+    "position_x",
+    "position_y",
+    "position_z",
+    "tire_compound",
+    "tire_life",
+    "sector",
+)
+
+
+def _telemetry_row(session_id: int, driver_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a TelemetryData column mapping from an incoming data point.
+    """
+    row = {field: data.get(field) for field in TELEMETRY_VALUE_FIELDS}
+    row["session_id"] = session_id
+    row["driver_id"] = driver_id
+    row["timestamp"] = data.get("timestamp") or datetime.utcnow()
+    return row
 
 
 async def create_telemetry_data(
@@ -183,27 +400,114 @@ async def create_telemetry_data(
     """
     Create a new telemetry data point.
     """
-    telemetry_data = TelemetryData(
-        session_id=session_id,
-        driver_id=driver_id,
-        timestamp=data.get("timestamp", datetime.utcnow()),
-        lap=data.get("lap"),
-        speed=data.get("speed"),
-        throttle=data.get("throttle"),
-        brake=data.get("brake"),
-        gear=data.get("gear"),
-        rpm=data.get("rpm"),
-        drs=data.get("drs"),
-        position_x=data.get("position_x"),
-        position_y=data.get("position_y"),
-        position_z=data.get("position_z"),
-        tire_compound=data.get("tire_compound"),
-        tire_life=data.get("tire_life"),
-        sector=data.get("sector"),
-    )
+    telemetry_data = TelemetryData(**_telemetry_row(session_id, driver_id, data))
     
     db.add(telemetry_data)
     await db.commit()
     await db.refresh(telemetry_data)
     
-    return telemetry_data 
\ No newline at end of file
+    return telemetry_data
+
+
+async def bulk_create_telemetry_data(
+    db: AsyncSession,
+    session_id: int,
+    points: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    refresh_summaries: bool = True,
+    touched: Optional[Set[Tuple[int, int]]] = None,
+) -> Tuple[int, int]:
+    """
+    Insert many telemetry data points for a session.
+    
+    Points are written with one multi-row INSERT per batch (or merged into
+    lap blocks for the columnar backend) and a single commit per batch,
+    instead of a commit and refresh per row. The lap summaries of every lap
+    that received points are refreshed once at the end (LAP_SUMMARIES_ON_INGEST).
+    
+    Callers that write one upload over several calls pass
+    refresh_summaries=False and a `touched` set, then call
+    refresh_ingested_summaries() once after the last call, so each lap is
+    re-aggregated once per upload rather than once per call.
+    
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        points: Telemetry data points, each carrying its own driver_id
+        batch_size: Rows per INSERT, defaults to TELEMETRY_INGEST_BATCH_SIZE
+        refresh_summaries: Whether to refresh the touched laps' summaries
+        touched: Set collecting the (driver, lap) pairs that received points
+        
+    Returns:
+        Tuple of (rows accepted, batches written)
+    """
+    batch_size = batch_size or settings.TELEMETRY_INGEST_BATCH_SIZE
+    accepted = 0
+    batches = 0
+    batch: List[Dict[str, Any]] = []
+    touched = set() if touched is None else touched
+    
+    async def flush() -> None:
+        nonlocal accepted, batches
+        if not batch:
+            return
+        if settings.TELEMETRY_STORAGE_BACKEND == "columnar":
+            await write_lap_blocks(db, session_id, batch)
+        else:
+            await db.execute(insert(TelemetryData).values(batch))
+        await db.commit()
+        accepted += len(batch)
+        batches += 1
+        touched.update((row["driver_id"], row["lap"]) for row in batch if row["lap"])
+        batch.clear()
+    
+    for point in points:
+        batch.append(_telemetry_row(session_id, point["driver_id"], point))
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    
+    if refresh_summaries:
+        await refresh_ingested_summaries(db, session_id, touched)
+    
+    logger.info(
+        f"Ingested {accepted} telemetry points for session {session_id} "
+        f"in {batches} batches"
+    )
+    return accepted, batches
+
+
+async def refresh_ingested_summaries(
+    db: AsyncSession, session_id: int, touched: Iterable[Tuple[int, int]]
+) -> None:
+    """
+    Refresh and commit the lap summaries of freshly ingested laps.
+    
+    Does nothing unless LAP_SUMMARIES_ON_INGEST is enabled.
+    
+    Args:
+        db: Database session
+        session_id: Telemetry session ID
+        touched: (driver database ID, lap) pairs that received points
+    """
+    touched = set(touched)
+    if touched and settings.LAP_SUMMARIES_ON_INGEST:
+        await refresh_lap_summaries(db, session_id, touched)
+        await db.commit()
+
+
+async def rebuild_lap_summaries(db: AsyncSession, session_id: int) -> int:
+    """
+    Recompute every lap summary of a session from its stored telemetry.
+    
+    Returns:
+        Number of summaries written
+    """
+    stored = await get_stored_laps(db, session_id)
+    written = await refresh_lap_summaries(
+        db, session_id, [(driver_id, lap) for driver_id, laps in stored.items() for lap in laps]
+    )
+    await db.commit()
+    
+    logger.info(f"Rebuilt {written} lap summaries for session {session_id}")
+    return written
@@ -0,0 +1,412 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+import logging
+import time
+import uuid
+import zlib
+
+import numpy as np
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.db.redis import get_redis_client
+from app.services.live_telemetry import as_text
+from app.services.reference_cache import reference_cache
+
+logger = logging.getLogger(__name__)
+
+# 2023 grid, used when a simulated session is not given its drivers
+DEFAULT_GRID = (
+    "VER", "PER", "HAM", "RUS", "LEC", "SAI", "NOR", "PIA", "ALO", "STR",
+    "GAS", "OCO", "ALB", "SAR", "TSU", "RIC", "BOT", "ZHO", "MAG", "HUL",
+)
+
+# Vehicle model (SI units)
+TOP_SPEED = 92.0  # m/s, about 330 km/h
+LATERAL_ACCEL = 40.0  # m/s^2 of cornering grip
+BRAKE_DECEL = 45.0  # m/s^2
+DRIVE_ACCEL = 14.0  # m/s^2 at low speed, falling to 0 at top speed
+GEAR_SPEEDS = np.array([0, 90, 125, 160, 195, 230, 265, 295, 400]) / 3.6  # band edges, m/s
+RPM_RANGE = (10500.0, 12000.0)
+DRS_GAIN = 0.03  # speed gain with the flap open
+DRS_FROM_LAP = 3
+
+# Tyres: lap-by-lap wear (% of life) and pace lost at zero life
+COMPOUNDS = ("soft", "medium", "hard")
+TYRE_WEAR = np.array([2.4, 1.6, 1.1])
+TYRE_PACE_LOSS = 0.04
+PIT_BELOW_LIFE = 30.0
+
+# Keys of a simulated sample, in the order run() builds them
+SAMPLE_FIELDS = (
+    "timestamp", "driver_id", "speed", "throttle", "brake", "gear", "rpm", "drs",
+    "position_x", "position_y", "position_z", "tire_compound", "tire_life", "sector", "lap",
+)
+
+
+def _resample(x: np.ndarray, y: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Resample a closed polyline to n points evenly spaced along its length.
+
+    Returns:
+        Tuple of (x, y, perimeter)
+    """
+    step = np.hypot(np.roll(x, -1) - x, np.roll(y, -1) - y)
+    travelled = np.concatenate(([0.0], np.cumsum(step)))
+    at = np.linspace(0.0, travelled[-1], n, endpoint=False)
+    return (
+        np.interp(at, travelled, np.append(x, x[0])),
+        np.interp(at, travelled, np.append(y, y[0])),
+        travelled[-1],
+    )
+
+
+class Track:
+    """
+    Closed track centerline with a precomputed racing speed profile.
+
+    The centerline is a seeded star-shaped polygon of 8-12 corners, rounded
+    by smoothing over `corner_window` metres and sampled every `resolution`
+    metres. The speed profile is the usual lap-simulation envelope:
+    cornering speed from curvature, limited by forward acceleration and
+    backward braking passes. Throttle, brake, gear and rpm are derived from
+    the profile so every trace is physically consistent.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        length: float = 5000.0,
+        resolution: float = 5.0,
+        corner_window: float = 60.0
+    ) -> None:
+        rng = np.random.default_rng(seed)
+        n = int(length / resolution)
+        corners = int(rng.integers(8, 13))
+        angles = (np.arange(corners) + rng.uniform(-0.3, 0.3, corners)) * 2 * np.pi / corners
+        radii = rng.uniform(0.5, 1.0, corners)
+        x, y, perimeter = _resample(radii * np.cos(angles), radii * np.sin(angles), n)
+        x, y = x * length / perimeter, y * length / perimeter
+
+        # Round the corners with a periodic Hann window
+        width = int(corner_window / resolution)
+        kernel = np.hanning(width + 2)[1:-1]
+        kernel /= kernel.sum()
+        x, y = (
+            np.convolve(np.concatenate((v[-width:], v, v[:width])), kernel, "same")[width:-width]
+            for v in (x, y)
+        )
+        x, y, perimeter = _resample(x, y, n)
+
+        self.length = length
+        self.resolution = resolution
+        self.x = x * length / perimeter
+        self.y = y * length / perimeter
+        self.z = 8.0 * np.sin(np.linspace(0.0, 2 * np.pi, n, endpoint=False) + rng.uniform(0, 2 * np.pi))
+        self.distance = np.arange(n) * resolution
+
+        # Curvature of the periodic centerline
+        dx = (np.roll(self.x, -1) - np.roll(self.x, 1)) / 2
+        dy = (np.roll(self.y, -1) - np.roll(self.y, 1)) / 2
+        ddx = np.roll(self.x, -1) - 2 * self.x + np.roll(self.x, 1)
+        ddy = np.roll(self.y, -1) - 2 * self.y + np.roll(self.y, 1)
+        curvature = np.abs(dx * ddy - dy * ddx) / np.maximum((dx ** 2 + dy ** 2) ** 1.5, 1e-9)
+
+        self.speed = self._speed_profile(curvature)
+        accel = (np.roll(self.speed, -1) ** 2 - self.speed ** 2) / (2 * resolution)
+        self.throttle = np.where(accel > 0.5, 100.0, np.where(accel < -1.0, 0.0, 45.0))
+        self.brake = np.clip(-accel / BRAKE_DECEL * 100.0, 0.0, 100.0) * (accel < -1.0)
+        self.gear = np.clip(np.searchsorted(GEAR_SPEEDS, self.speed, side="right"), 1, 8)
+        band = (self.speed - GEAR_SPEEDS[self.gear - 1]) / (GEAR_SPEEDS[self.gear] - GEAR_SPEEDS[self.gear - 1])
+        self.rpm = RPM_RANGE[0] + (RPM_RANGE[1] - RPM_RANGE[0]) * np.clip(band, 0.0, 1.0)
+        self.sector = 1 + (self.distance * 3 // length).astype(int)
+
+        # DRS on the two longest full-throttle stretches
+        full_throttle = (self.throttle == 100.0) | (self.speed >= TOP_SPEED * 0.97)
+        self.drs_zone = np.zeros(n, dtype=bool)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], full_throttle.astype(int), [0]))))
+        straights = sorted(zip(edges[::2], edges[1::2]), key=lambda run: run[0] - run[1])[:2]
+        for start, end in straights:
+            self.drs_zone[start:end] = True
+
+    def _speed_profile(self, curvature: np.ndarray) -> np.ndarray:
+        corner = np.minimum(np.sqrt(LATERAL_ACCEL / np.maximum(curvature, 1e-6)), TOP_SPEED)
+        n = len(corner)
+        # Three laps back to back so the passes settle across the line; keep the middle one
+        speed = np.tile(corner, 3).tolist()
+        for i in range(1, 3 * n):
+            drive = DRIVE_ACCEL * (1 - (speed[i - 1] / TOP_SPEED) ** 2)
+            speed[i] = min(speed[i], (speed[i - 1] ** 2 + 2 * drive * self.resolution) ** 0.5)
+        for i in range(3 * n - 2, -1, -1):
+            speed[i] = min(speed[i], (speed[i + 1] ** 2 + 2 * BRAKE_DECEL * self.resolution) ** 0.5)
+        return np.array(speed[n:2 * n])
+
+
+class RaceSimulation:
+    """
+    Deterministic simulation of every car in one session, stepped in NumPy.
+
+    Each step advances all cars at once: speed follows the track profile
+    scaled by car pace, tyre wear and DRS, distance integrates speed, and
+    crossing the line advances the lap and wears the tyres. Cars pit for a
+    harder compound once their tyres drop below PIT_BELOW_LIFE. The same
+    seed always produces the same traces.
+    """
+
+    def __init__(
+        self,
+        drivers: Sequence[str] = DEFAULT_GRID,
+        seed: int = 0,
+        rate_hz: float = settings.TELEMETRY_SIMULATOR_RATE_HZ,
+        start: Optional[datetime] = None,
+        track: Optional[Track] = None
+    ) -> None:
+        self.track = track or Track(seed)
+        self.rate_hz = rate_hz
+        self.start = start or datetime.utcnow()
+        self.steps = 0
+        self._rng = np.random.default_rng(seed)
+        self.drivers: List[str] = []
+        self.distance = np.empty(0)
+        self.lap = np.empty(0, dtype=int)
+        self.pace = np.empty(0)
+        self.compound = np.empty(0, dtype=int)
+        self.tire_life = np.empty(0)
+        for driver in drivers:
+            self.add_car(driver)
+
+    def add_car(self, driver_id: str) -> None:
+        """
+        Add a car at the back of the grid.
+        """
+        position = len(self.drivers)
+        self.drivers.append(driver_id)
+        self.distance = np.append(self.distance, (-8.0 * position) % self.track.length)
+        self.lap = np.append(self.lap, 1 if position == 0 else 0)
+        self.pace = np.append(self.pace, self._rng.uniform(0.975, 1.0))
+        self.compound = np.append(self.compound, self._rng.integers(0, 2))
+        self.tire_life = np.append(self.tire_life, 100.0)
+
+    def step(self) -> Dict[str, np.ndarray]:
+        """
+        Advance every car by one sample interval.
+
+        Returns:
+            Channel arrays, one value per car
+        """
+        track = self.track
+        dt = 1.0 / self.rate_hz
+        index = (self.distance / track.resolution).astype(int) % len(track.speed)
+        drs = track.drs_zone[index] & (self.lap >= DRS_FROM_LAP)
+        grip = 1.0 - TYRE_PACE_LOSS * (100.0 - self.tire_life) / 100.0
+        speed = track.speed[index] * self.pace * grip * (1.0 + DRS_GAIN * drs)
+        speed = np.maximum(speed + self._rng.normal(0.0, 0.3, len(speed)), 1.0)
+
+        self.distance = self.distance + speed * dt
+        crossed = self.distance >= track.length
+        self.distance = np.where(crossed, self.distance - track.length, self.distance)
+        self.lap = self.lap + crossed
+        # Crossing the line from the grid starts lap 1 without a lap of wear
+        completed = crossed & (self.lap > 1)
+        self.tire_life = np.where(completed, self.tire_life - TYRE_WEAR[self.compound], self.tire_life)
+        pitted = completed & (self.tire_life < PIT_BELOW_LIFE)
+        self.compound = np.where(pitted, np.minimum(self.compound + 1, 2), self.compound)
+        self.tire_life = np.where(pitted, 100.0, self.tire_life)
+        self.steps += 1
+
+        return {
+            "speed": speed * 3.6,
+            "throttle": track.throttle[index],
+            "brake": track.brake[index],
+            "gear": track.gear[index],
+            "rpm": track.rpm[index],
+            "drs": drs.astype(int),
+            "position_x": track.x[index],
+            "position_y": track.y[index],
+            "position_z": track.z[index],
+            "sector": track.sector[index],
+            "lap": np.maximum(self.lap, 1),
+            "tire_life": self.tire_life.copy(),
+            "compound": self.compound.copy(),
+        }
+
+    def run(self, steps: int, driver_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Advance `steps` sample intervals and return the samples.
+
+        Args:
+            steps: Number of intervals to simulate
+            driver_id: Only return this driver's samples, None for every car
+
+        Returns:
+            Samples in time order, cars in grid order within each step
+        """
+        car = None if driver_id is None else self.drivers.index(driver_id)
+        compounds = np.array(COMPOUNDS)
+        points = []
+        for _ in range(steps):
+            timestamp = (self.start + timedelta(seconds=(self.steps + 1) / self.rate_hz)).isoformat()
+            channels = self.step()
+            columns = [
+                [timestamp] * len(self.drivers),
+                self.drivers,
+                np.round(channels["speed"], 1).tolist(),
+                channels["throttle"].tolist(),
+                np.round(channels["brake"], 1).tolist(),
+                channels["gear"].tolist(),
+                np.round(channels["rpm"]).astype(int).tolist(),
+                channels["drs"].tolist(),
+                np.round(channels["position_x"], 2).tolist(),
+                np.round(channels["position_y"], 2).tolist(),
+                np.round(channels["position_z"], 2).tolist(),
+                compounds[channels["compound"]].tolist(),
+                np.round(channels["tire_life"], 1).tolist(),
+                channels["sector"].tolist(),
+                channels["lap"].tolist(),
+            ]
+            rows = zip(*columns) if car is None else [tuple(column[car] for column in columns)]
+            points.extend(dict(zip(SAMPLE_FIELDS, row)) for row in rows)
+        return points
+
+
+def _lease_key(session_id: str) -> str:
+    return f"telemetry:sim:{session_id}:writer"
+
+
+class LiveSimulations:
+    """
+    Real-time simulated sessions feeding the live telemetry window.
+
+    A session is created on first read, seeded from its ID, and advanced to
+    wall-clock time on every later read, so the live feed keeps moving while
+    anyone is watching. After a long idle gap at most `max_catch_up` seconds
+    are simulated and the rest is skipped.
+
+    One worker simulates a session at a time: it holds a Redis writer lease
+    (SET NX with a TTL) that it renews while it keeps reading, and the other
+    workers only read the samples it publishes. Only session IDs starting
+    with `prefix` are simulated, never stored sessions (numeric IDs),
+    replays or ingest streams. Without Redis every worker
+    simulates into its own in-process window. Each worker keeps at most
+    `max_sessions` simulations, dropping those nobody has read for
+    `idle_seconds` and then the least recently read, and cars are only
+    added for drivers of the default grid or the reference data.
+    """
+
+    def __init__(
+        self,
+        max_catch_up: float = 10.0,
+        max_sessions: int = settings.TELEMETRY_SIMULATOR_MAX_SESSIONS,
+        idle_seconds: float = settings.TELEMETRY_SIMULATOR_IDLE_SECONDS,
+        lease_seconds: float = settings.TELEMETRY_SIMULATOR_LEASE_SECONDS,
+        prefix: str = settings.TELEMETRY_SIMULATOR_PREFIX,
+        redis_client: Optional[redis.Redis] = None
+    ) -> None:
+        self.max_catch_up = max_catch_up
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.lease_seconds = lease_seconds
+        self.prefix = prefix
+        self.owner = uuid.uuid4().hex
+        self.sessions: Dict[str, RaceSimulation] = {}
+        self._redis = redis_client
+        # Last read per session, least recently read first
+        self._last_read: Dict[str, float] = {}
+        self._renewed: Dict[str, float] = {}
+
+    def simulates(self, session_id: str) -> bool:
+        """
+        Whether a live session ID is reserved for simulation.
+        """
+        return bool(self.prefix) and session_id.startswith(self.prefix)
+
+    async def claim(self, session_id: str) -> bool:
+        """
+        Take or renew the writer lease of a session.
+
+        The lease is renewed at most every third of its TTL; in between the
+        worker holding it simulates without asking Redis.
+
+        Returns:
+            Whether this worker may simulate the session
+        """
+        now = time.monotonic()
+        renewed = self._renewed.get(session_id)
+        if renewed is not None and now - renewed < self.lease_seconds / 3:
+            return True
+
+        key = _lease_key(session_id)
+        ttl_ms = int(self.lease_seconds * 1000)
+        try:
+            redis_client = self._redis or await get_redis_client()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(key, self.owner, nx=True, px=ttl_ms)
+                pipe.get(key)
+                acquired, holder = await pipe.execute()
+            if not acquired and holder is not None and as_text(holder) == self.owner:
+                acquired = await redis_client.pexpire(key, ttl_ms)
+        except Exception as e:
+            logger.debug(f"Redis unavailable for the simulator lease, simulating locally: {str(e)}")
+            acquired = True
+
+        if acquired:
+            self._renewed[session_id] = now
+        else:
+            # Another worker simulates this session
+            self.drop(session_id)
+        return bool(acquired)
+
+    def _evict(self, now: float) -> None:
+        for session_id, last_read in list(self._last_read.items()):
+            if now - last_read > self.idle_seconds:
+                self.drop(session_id)
+        while self._last_read and len(self.sessions) >= self.max_sessions:
+            self.drop(next(iter(self._last_read)))
+
+    def advance(self, session_id: str, driver_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Simulate a session up to now.
+
+        Returns:
+            New samples for every car in the session
+        """
+        simulation = self.sessions.get(session_id)
+        now = datetime.utcnow()
+        read_at = time.monotonic()
+        if simulation is None:
+            self._evict(read_at)
+            seed = zlib.crc32(session_id.encode("utf-8")) ^ settings.TELEMETRY_SIMULATOR_SEED
+            # Start a second in the past so the first read has data
+            simulation = RaceSimulation(seed=seed, start=now - timedelta(seconds=1))
+            self.sessions[session_id] = simulation
+            logger.info(f"Started simulated telemetry for session {session_id}")
+        self._last_read.pop(session_id, None)
+        self._last_read[session_id] = read_at
+        if (
+            driver_id is not None
+            and driver_id not in simulation.drivers
+            and reference_cache.driver_by_code(driver_id) is not None
+        ):
+            simulation.add_car(driver_id)
+
+        due = int((now - simulation.start).total_seconds() * simulation.rate_hz) - simulation.steps
+        limit = int(self.max_catch_up * simulation.rate_hz)
+        if due > limit:
+            simulation.steps += due - limit
+            due = limit
+        return simulation.run(due) if due > 0 else []
+
+    def drop(self, session_id: str) -> None:
+        if self.sessions.pop(session_id, None) is not None:
+            logger.info(f"Stopped simulated telemetry for session {session_id}")
+        self._last_read.pop(session_id, None)
+        self._renewed.pop(session_id, None)
+
+    def clear(self) -> None:
+        self.sessions.clear()
+        self._last_read.clear()
+        self._renewed.clear()
+
+
+# Create live simulations instance
+live_simulations = LiveSimulations()
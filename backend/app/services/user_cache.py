@@ -0,0 +1,166 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+import logging
+
+import redis.asyncio as redis
+
+from app.core.cache_codec import cache_codec
+from app.core.config import settings
+from app.db.models import User
+from app.db.redis import get_redis_client
+from app.services.broadcast_bus import BroadcastBus
+from app.services.response_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# User columns kept in a cached principal; the password hash is never cached
+PRINCIPAL_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "is_active",
+    "is_superuser",
+    "token_version",
+    "created_at",
+    "updated_at",
+)
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+# Broadcast bus topic carrying invalidated user ids to every replica
+INVALIDATION_TOPIC = "invalidate"
+
+
+def user_snapshot(user: User) -> Dict[str, Any]:
+    """
+    Snapshot the principal fields of a user.
+    """
+    return {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+
+
+def snapshot_to_user(snapshot: Dict[str, Any]) -> User:
+    """
+    Build a detached User from a cached snapshot.
+    """
+    return User(**snapshot)
+
+
+def _dump(snapshot: Dict[str, Any]) -> bytes:
+    data = dict(snapshot)
+    for field in _DATETIME_FIELDS:
+        if isinstance(data.get(field), datetime):
+            data[field] = data[field].isoformat()
+    return cache_codec.encode(data)
+
+
+def _load(raw: bytes) -> Dict[str, Any]:
+    data = cache_codec.decode(raw)
+    for field in _DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+def _redis_key(user_id: int) -> str:
+    return f"user-principal:{user_id}"
+
+
+class UserPrincipalCache:
+    """
+    Two-tier cache of authenticated user principals.
+
+    Entries are looked up by user id and only returned when their token
+    version matches the one in the JWT. A short-lived in-process tier sits in
+    front of Redis; invalidation clears both and is published on a broadcast
+    bus so other replicas drop their local copy too. If a replica misses the
+    message (Redis down or reconnecting), its copy still expires within
+    USER_CACHE_LOCAL_TTL, which bounds how long a revoked token is accepted.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None) -> None:
+        self._local = LRUCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_LOCAL_TTL)
+        self._redis = redis_client
+        self.bus = BroadcastBus(self._drop_local, redis_client=redis_client, namespace="user-cache")
+
+    async def _client(self) -> redis.Redis:
+        if self._redis is None:
+            return await get_redis_client()
+        return self._redis
+
+    async def _drop_local(self, message: Dict[str, Any], topic: str) -> int:
+        if message.get("user_id") is not None:
+            self._local.delete(str(message["user_id"]))
+        return 1
+
+    async def start(self) -> None:
+        """
+        Subscribe to invalidations published by other replicas.
+        """
+        await self.bus.set_local_count(INVALIDATION_TOPIC, 1)
+        await self.bus.start()
+
+    async def stop(self) -> None:
+        await self.bus.stop()
+
+    async def get(self, user_id: int, token_version: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached principal for a user and token version.
+
+        Args:
+            user_id: User ID from the `sub` claim
+            token_version: Token version from the `ver` claim
+
+        Returns:
+            Principal snapshot or None on a miss or version mismatch
+        """
+        snapshot = self._local.get(str(user_id))
+        if snapshot is None:
+            try:
+                redis_client = await self._client()
+                raw = await redis_client.get(_redis_key(user_id))
+                snapshot = _load(raw) if raw is not None else None
+            except Exception as e:
+                logger.debug(f"Redis unavailable for user cache: {str(e)}")
+                snapshot = None
+            if snapshot is None:
+                return None
+            self._local.set(str(user_id), snapshot)
+
+        if snapshot["token_version"] != token_version:
+            return None
+        return snapshot
+
+    async def set(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Store a principal snapshot in both tiers.
+        """
+        self._local.set(str(snapshot["id"]), snapshot)
+        try:
+            redis_client = await self._client()
+            await redis_client.set(
+                _redis_key(snapshot["id"]), _dump(snapshot), ex=settings.USER_CACHE_TTL
+            )
+        except Exception as e:
+            logger.debug(f"Redis error when caching user principal: {str(e)}")
+
+    async def invalidate(self, user_id: int) -> None:
+        """
+        Drop a user's cached principal from both tiers on every replica.
+        """
+        self._local.delete(str(user_id))
+        try:
+            redis_client = await self._client()
+            await redis_client.delete(_redis_key(user_id))
+        except Exception as e:
+            logger.error(f"Redis error when invalidating user principal: {str(e)}")
+        await self.bus.publish(INVALIDATION_TOPIC, {"user_id": user_id})
+        logger.info(f"User principal cache invalidated for user {user_id}")
+
+    def clear(self) -> None:
+        """
+        Drop every in-process cached principal.
+        """
+        self._local.clear()
+
+
+# Create user principal cache instance
+user_cache = UserPrincipalCache()
@@ -4,9 +4,10 @@ from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
 import logging
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async
 from app.schemas.user import UserCreate, UserUpdate, UserSettingsCreate, UserSettingsUpdate
 from app.db.models import User, UserSettings
+from app.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -102,7 +103,7 @@ async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         raise ValueError("Username already taken")
     
     # Create user object
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -177,9 +178,15 @@ async def update_user(
     # Update fields
     update_data = user_data.dict(exclude_unset=True)
     
+    # Revoke issued tokens on password change or deactivation
+    if "password" in update_data or (
+        update_data.get("is_active") is False and db_user.is_active
+    ):
+        db_user.token_version = (db_user.token_version or 0) + 1
+    
     # Handle password separately
     if "password" in update_data:
-        hashed_password = get_password_hash(update_data.pop("password"))
+        hashed_password = await get_password_hash_async(update_data.pop("password"))
         setattr(db_user, "hashed_password", hashed_password)
     
     # Update other fields
@@ -190,11 +197,13 @@ async def update_user(
     try:
         await db.commit()
         await db.refresh(db_user)
-        return db_user
     except IntegrityError as e:
         await db.rollback()
         logger.error(f"Error updating user: {str(e)}")
         raise ValueError("Database error while updating user")
+    
+    await user_cache.invalidate(user_id)
+    return db_user
 
 
 async def delete_user(db: AsyncSession, user_id: int) -> bool:
@@ -214,6 +223,7 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
     
     await db.delete(db_user)
     await db.commit()
+    await user_cache.invalidate(user_id)
     return True
 
 
@@ -1,12 +1,14 @@
 import asyncio
 import pytest
-from typing import AsyncGenerator, Generator
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Dict, Generator, List
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.db.models import Driver
 from app.db.session import Base, get_db
 from app.main import app
 
@@ -38,6 +40,54 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
 # Override the database dependency
 app.dependency_overrides[get_db] = override_get_db
 
+# Start of every generated telemetry sample trace
+SAMPLE_START = datetime(2023, 7, 9, 14, 0)
+
+
+def telemetry_samples(
+    count: int,
+    driver_id: Any = 1,
+    interval_ms: int = 250,
+    start: datetime = SAMPLE_START,
+    isoformat: bool = True,
+    **channels: Any
+) -> List[Dict[str, Any]]:
+    """
+    Build `count` telemetry samples for one driver, `interval_ms` apart.
+
+    Channels default to a lap-1 trace at full throttle with speed rising by
+    one per sample. Keyword arguments add or replace channels, either as a
+    constant or as a callable of the sample index.
+
+    Args:
+        count: Number of samples
+        driver_id: Driver database ID or code
+        interval_ms: Milliseconds between samples
+        start: Timestamp of the first sample
+        isoformat: Whether timestamps are ISO strings rather than datetimes
+        **channels: Channel values or callables taking the sample index
+
+    Returns:
+        Samples in time order
+    """
+    channels = {
+        "lap": 1,
+        "speed": lambda i: 200.0 + i,
+        "throttle": 90.0,
+        "brake": 0.0,
+        "gear": 7,
+        **channels,
+    }
+    samples = []
+    for i in range(count):
+        timestamp = start + timedelta(milliseconds=interval_ms * i)
+        samples.append({
+            "driver_id": driver_id,
+            "timestamp": timestamp.isoformat() if isoformat else timestamp,
+            **{name: value(i) if callable(value) else value for name, value in channels.items()},
+        })
+    return samples
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
@@ -49,6 +99,27 @@ def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_caches() -> Generator[None, None, None]:
+    """
+    Clear in-process caches so tests never see each other's data.
+    """
+    from app.services.lap_comparison import lap_comparisons
+    from app.services.live_telemetry import live_window
+    from app.services.reference_cache import reference_cache
+    from app.services.response_cache import clear_local_responses
+    from app.services.telemetry_simulator import live_simulations
+    from app.services.user_cache import user_cache
+
+    reference_cache.invalidate()
+    clear_local_responses()
+    user_cache.clear()
+    live_window.clear_local()
+    live_simulations.clear()
+    lap_comparisons.clear()
+    yield
+
+
 @pytest.fixture(scope="session")
 async def create_tables() -> AsyncGenerator[None, None]:
     """
@@ -70,6 +141,20 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest.fixture
+async def drivers(create_tables, db_session) -> List[Driver]:
+    """
+    Create the drivers with IDs 1 and 2 that telemetry test points refer to.
+    """
+    drivers = [
+        Driver(id=1, name="Max Verstappen", driver_id="max_verstappen", number=1, code="VER"),
+        Driver(id=2, name="Lewis Hamilton", driver_id="hamilton", number=44, code="HAM"),
+    ]
+    db_session.add_all(drivers)
+    await db_session.commit()
+    return drivers
+
+
 @pytest.fixture
 async def client(create_tables) -> AsyncGenerator[AsyncClient, None]:
     """
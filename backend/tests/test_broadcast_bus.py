@@ -0,0 +1,97 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from app.services.broadcast_bus import BroadcastBus
+
+fakeredis = pytest.importorskip("fakeredis")
+fake_aioredis = pytest.importorskip("fakeredis.aioredis")
+
+
+class Worker:
+    """
+    Stand-in for one replica's connection manager.
+    """
+
+    def __init__(self, server: Any, name: str) -> None:
+        self.received: List[Tuple[str, Dict[str, Any]]] = []
+        client = fake_aioredis.FakeRedis(server=server)
+        self.bus = BroadcastBus(self.deliver, redis_client=client, worker_id=name)
+
+    async def deliver(self, message: Dict[str, Any], session_id: str) -> int:
+        self.received.append((session_id, message))
+        return 1
+
+
+async def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_broadcast_reaches_every_replica():
+    """
+    Test that a broadcast published on one worker is delivered by all of them.
+    """
+    server = fakeredis.FakeServer()
+    pod_a, pod_b, pod_c = Worker(server, "a"), Worker(server, "b"), Worker(server, "c")
+    for worker in (pod_a, pod_b, pod_c):
+        await worker.bus.start()
+    
+    try:
+        await pod_a.bus.set_local_count("race-1", 2)
+        await pod_b.bus.set_local_count("race-1", 1)
+        await pod_c.bus.set_local_count("race-2", 4)
+        
+        recipients = await pod_c.bus.publish("race-1", {"type": "flag", "data": "yellow"})
+        
+        assert recipients == 3
+        await _wait_for(lambda: pod_a.received and pod_b.received)
+        assert pod_a.received == [("race-1", {"type": "flag", "data": "yellow"})]
+        assert pod_b.received == pod_a.received
+        assert pod_c.received == []
+    finally:
+        for worker in (pod_a, pod_b, pod_c):
+            await worker.bus.stop()
+
+
+async def test_recipient_count_tracks_workers():
+    """
+    Test that counts follow disconnects and drop workers that stop.
+    """
+    server = fakeredis.FakeServer()
+    pod_a, pod_b = Worker(server, "a"), Worker(server, "b")
+    await pod_a.bus.start()
+    await pod_b.bus.start()
+    
+    try:
+        await pod_a.bus.set_local_count("race-1", 2)
+        await pod_b.bus.set_local_count("race-1", 5)
+        assert await pod_a.bus.recipient_count("race-1") == 7
+        
+        await pod_b.bus.set_local_count("race-1", 0)
+        assert await pod_a.bus.recipient_count("race-1") == 2
+        
+        await pod_b.bus.set_local_count("race-1", 3)
+        await pod_b.bus.stop()
+        assert await pod_a.bus.publish("race-1", {"type": "info"}) == 2
+    finally:
+        await pod_a.bus.stop()
+
+
+async def test_local_fallback_without_redis():
+    """
+    Test that an unstarted bus delivers locally.
+    """
+    received: List[Dict[str, Any]] = []
+    
+    async def deliver(message: Dict[str, Any], session_id: str) -> int:
+        received.append(message)
+        return 4
+    
+    bus = BroadcastBus(deliver)
+    
+    assert await bus.publish("race-1", {"type": "info"}) == 4
+    assert received == [{"type": "info"}]
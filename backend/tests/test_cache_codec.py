@@ -0,0 +1,111 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache_codec import MAGIC, CacheCodec
+from app.core.serialization import dumps
+from app.services import response_cache
+from tests.conftest import telemetry_samples
+
+fakeredis = pytest.importorskip("fakeredis")
+fake_aioredis = pytest.importorskip("fakeredis.aioredis")
+
+
+def _session_blob(count: int = 5000):
+    return {
+        "session_id": "race-1",
+        "data": telemetry_samples(
+            count,
+            "HAM",
+            seq=lambda i: i,
+            speed=lambda i: round(200.0 + (i % 120) * 0.9, 1),
+            throttle=lambda i: 100.0 if i % 7 else 35.5,
+            gear=lambda i: 3 + i % 6,
+            rpm=lambda i: 10500.0 + (i % 40) * 25,
+            drs=0,
+            lap=lambda i: 1 + i // 360,
+        ),
+    }
+
+
+@pytest.mark.parametrize("serializer", ["orjson", "msgpack"])
+@pytest.mark.parametrize("compression", ["zstd", "lz4", "zlib", "none"])
+def test_round_trip_and_cross_config_reads(serializer: str, compression: str):
+    """
+    Test that payloads decode under any configuration, not just the writer's.
+    """
+    blob = _session_blob(200)
+    writer = CacheCodec(serializer=serializer, compression=compression, min_size=0)
+    reader = CacheCodec(serializer="orjson", compression="none")
+
+    encoded = writer.encode(blob)
+    assert encoded.startswith(MAGIC)
+    assert reader.decode(encoded) == blob
+    assert reader.decode(writer.encode_raw(b"raw bytes" * 100)) == b"raw bytes" * 100
+
+
+def test_legacy_and_small_payloads():
+    """
+    Test reading header-less entries and skipping compression for small ones.
+    """
+    codec = CacheCodec(compression="zlib", min_size=512)
+
+    assert codec.decode(b'{"id":1}') == {"id": 1}
+    assert codec.decode(b'"etag"\n{}', legacy=bytes) == b'"etag"\n{}'
+    small = codec.encode({"id": 1})
+    assert small[3] == 0  # stored uncompressed
+    with pytest.raises(ValueError):
+        codec.decode(MAGIC + bytes((99, 1, 0)) + b"{}")
+
+
+@pytest.mark.benchmark
+def test_compression_benchmark():
+    """
+    Benchmark compression ratio and codec time for a 5000-sample session blob.
+    """
+    blob = _session_blob()
+    plain = len(dumps(blob))
+    results = {}
+    for serializer in ("orjson", "msgpack"):
+        for compression in ("zstd", "lz4", "zlib"):
+            codec = CacheCodec(serializer=serializer, compression=compression)
+            started = time.perf_counter()
+            encoded = codec.encode(blob)
+            encode_ms = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            codec.decode(encoded)
+            decode_ms = (time.perf_counter() - started) * 1000
+            results[f"{serializer}+{compression}"] = (plain / len(encoded), encode_ms, decode_ms)
+            assert codec.stats.snapshot()["compression_ratio"] > 1
+
+    print(f"\nuncompressed JSON {plain} bytes\n" + "\n".join(
+        f"{name}: ratio {ratio:.1f}x, encode {encode_ms:.1f}ms, decode {decode_ms:.1f}ms"
+        for name, (ratio, encode_ms, decode_ms) in results.items()
+    ))
+    assert results["orjson+zstd"][0] > 5
+
+
+async def test_response_cache_stores_compressed_entries(authenticated_client: AsyncClient, monkeypatch):
+    """
+    Test that Redis entries are compressed and the response is unchanged.
+    """
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+
+    async def get_fake_client():
+        return client
+
+    monkeypatch.setattr(response_cache, "get_redis_client", get_fake_client)
+    first = await authenticated_client.get("/api/v1/circuits/")
+    response_cache.clear_local_responses()
+    second = await authenticated_client.get("/api/v1/circuits/")
+
+    keys = await client.keys("response-cache:circuits:*")
+    assert len(keys) == 1
+    assert (await client.get(keys[0])).startswith(MAGIC)
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+
+    metrics = await authenticated_client.get("/metrics/cache")
+    assert metrics.status_code == 200
+    assert metrics.json()["encoded"] >= 1
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+from fastapi.websockets import WebSocketState
+
+from app.core.serialization import loads
+from app.services import connection_manager as connection_manager_module
+from app.services.connection_manager import ClientConnection, ConnectionManager, encode_frame
+
+
+class FakeWebSocket:
+    """
+    Minimal WebSocket double recording what is sent to it.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.sent: List[Dict[str, Any]] = []
+        self.client_state = WebSocketState.CONNECTED
+        self.close_code: Optional[int] = None
+
+    async def accept(self, subprotocol: Optional[str] = None) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(loads(data))
+
+    async def send_bytes(self, data: bytes) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+async def _drain(*sockets: FakeWebSocket, expected: int, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while any(len(ws.sent) < expected for ws in sockets):
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+async def test_slow_client_does_not_stall_session():
+    """
+    Test that a slow socket only delays itself.
+    """
+    manager = ConnectionManager()
+    slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+    await manager.connect(slow, "race-1")
+    await manager.connect(fast, "race-1")
+    
+    started = time.perf_counter()
+    for i in range(10):
+        assert await manager.broadcast({"type": "telemetry_update", "seq": i}, "race-1") == 2
+    assert time.perf_counter() - started < 0.1
+    
+    await _drain(fast, expected=10, timeout=0.5)
+    assert [m["seq"] for m in fast.sent] == list(range(10))
+    assert len(slow.sent) <= 1
+    
+    await manager.disconnect(slow, "race-1")
+    await manager.disconnect(fast, "race-1")
+
+
+def _update(driver_id: str, seq: int) -> Dict[str, Any]:
+    return {"type": "telemetry_update", "session_id": "race-1", "driver_id": driver_id, "seq": seq}
+
+
+async def test_drop_oldest_keeps_latest_messages():
+    """
+    Test that a full queue drops its oldest messages and flags the gap.
+    """
+    ws = FakeWebSocket(delay=0.05)
+    client = ClientConnection(ws, maxsize=3, policy="drop_oldest", max_overflows=0)
+    
+    client.enqueue(encode_frame(_update("HAM", 0)))
+    await asyncio.sleep(0)  # writer picks up the first message
+    for i in range(1, 10):
+        client.enqueue(encode_frame(_update("HAM", i)))
+    
+    await _drain(ws, expected=5)
+    assert [m.get("seq") for m in ws.sent] == [0, None, 7, 8, 9]
+    assert ws.sent[1]["gap"] and ws.sent[1]["driver_id"] == "HAM"
+    assert client.dropped == 6
+    await client.aclose()
+
+
+async def test_coalesce_replaces_pending_message_of_same_stream():
+    """
+    Test that coalescing only replaces telemetry of the same stream and flags the gap.
+    """
+    ws = FakeWebSocket(delay=0.05)
+    client = ClientConnection(ws, maxsize=3, policy="coalesce", max_overflows=0)
+    
+    client.enqueue(encode_frame(_update("HAM", 0)))
+    await asyncio.sleep(0)  # writer picks up the first message
+    client.enqueue(encode_frame({"type": "race_event", "seq": 1}))
+    client.enqueue(encode_frame(_update("VER", 2)))
+    for i in range(3, 7):
+        client.enqueue(encode_frame(_update("HAM", i)))
+    
+    await _drain(ws, expected=5)
+    assert [(m["type"], m.get("driver_id"), m.get("seq")) for m in ws.sent] == [
+        ("telemetry_update", "HAM", 0),
+        ("race_event", None, 1),
+        ("telemetry_update", "VER", 2),
+        ("telemetry_update", "HAM", None),
+        ("telemetry_update", "HAM", 6),
+    ]
+    assert ws.sent[3]["gap"]
+    await client.aclose()
+
+
+async def test_client_sees_every_seq_or_a_gap_after_overflow():
+    """
+    Test that every stream's dropped samples are either delivered or flagged.
+    """
+    ws = FakeWebSocket(delay=0.01)
+    client = ClientConnection(ws, maxsize=4, policy="drop_oldest", max_overflows=0)
+    
+    for i in range(40):
+        client.enqueue(encode_frame(_update(("HAM", "VER")[i % 2], i)))
+    
+    deadline = time.monotonic() + 2.0
+    while client.queue or client.gaps or ws.sent[-1].get("seq") != 39:
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+    for driver_id in ("HAM", "VER"):
+        messages = [m for m in ws.sent if m["driver_id"] == driver_id]
+        expected = [i for i in range(40) if ("HAM", "VER")[i % 2] == driver_id]
+        seqs = [m["seq"] for m in messages if not m.get("gap")]
+        # The client either saw every seq or was told to resync
+        assert seqs == expected or any(m.get("gap") for m in messages)
+        assert seqs[-1] == expected[-1]
+    await client.aclose()
+
+
+async def test_persistently_slow_client_is_disconnected():
+    """
+    Test that a client is closed after too many overflows.
+    """
+    ws = FakeWebSocket(delay=1.0)
+    client = ClientConnection(ws, maxsize=2, policy="drop_oldest", max_overflows=3)
+    
+    accepted = [client.enqueue(encode_frame({"type": "telemetry_update", "seq": i})) for i in range(8)]
+    
+    assert accepted == [True] * 4 + [False] * 4
+    await asyncio.wait_for(client._writer, timeout=2.0)
+    assert ws.close_code == 1013
+
+
+@pytest.mark.benchmark
+async def test_broadcast_latency_independent_of_subscribers():
+    """
+    Benchmark queuing a broadcast for a growing number of subscribers.
+    """
+    timings = {}
+    for subscribers in (10, 1000):
+        manager = ConnectionManager()
+        sockets = [FakeWebSocket(delay=0.5) for _ in range(subscribers)]
+        for ws in sockets:
+            await manager.connect(ws, "race-1")
+        
+        started = time.perf_counter()
+        await manager.broadcast({"type": "telemetry_update"}, "race-1")
+        timings[subscribers] = time.perf_counter() - started
+        
+        for ws in sockets:
+            await manager.disconnect(ws, "race-1")
+    
+    print(f"\nbroadcast latency: " + ", ".join(
+        f"{n} subscribers {t * 1000:.2f}ms" for n, t in timings.items()
+    ))
+    # Queuing is O(subscribers) appends; nothing waits on the slow sockets
+    assert timings[1000] < 0.1
+
+
+async def test_broadcast_encodes_once(monkeypatch):
+    """
+    Test that a broadcast is encoded once however many subscribers there are.
+    """
+    encodes = []
+    real_dumps_str = connection_manager_module.dumps_str
+    
+    def counting_dumps_str(obj: Any) -> str:
+        encodes.append(obj)
+        return real_dumps_str(obj)
+    
+    monkeypatch.setattr(connection_manager_module, "dumps_str", counting_dumps_str)
+    message = {
+        "type": "telemetry_update",
+        "data": [{"speed": 300.0 + i, "throttle": 99.5, "rpm": 11800.0, "gear": 8} for i in range(200)],
+    }
+    
+    for subscribers in (10, 1000):
+        manager = ConnectionManager()
+        sockets = [FakeWebSocket(delay=10.0) for _ in range(subscribers)]
+        for ws in sockets:
+            await manager.connect(ws, "race-1")
+        encodes.clear()
+        
+        for _ in range(20):
+            await manager.broadcast(message, "race-1")
+        
+        assert len(encodes) == 20
+        for ws in sockets:
+            await manager.disconnect(ws, "race-1")
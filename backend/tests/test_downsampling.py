@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import numpy as np
+
+from app.services.downsampling import (
+    downsample_rows,
+    lttb_indices,
+    minmax_indices,
+    resolve_max_points,
+    split_budget,
+)
+from tests.conftest import SAMPLE_START
+
+
+def _trace(n: int = 20000):
+    x = np.arange(n) / 4.0
+    y = np.sin(x / 50.0) * 100.0 + 200.0
+    y[12345] = 0.0  # braking spike
+    return x, y
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    """
+    Test that LTTB returns the requested count and keeps extremes.
+    """
+    x, y = _trace()
+    indices = lttb_indices(x, y, 500)
+    
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert 12345 in indices
+
+
+def test_minmax_keeps_spike():
+    """
+    Test that min-max bucketing keeps each bucket's extremes.
+    """
+    x, y = _trace()
+    indices = minmax_indices(x, y, 500)
+    
+    assert len(indices) <= 502
+    assert 12345 in indices
+    assert np.argmax(y) in indices
+
+
+def test_downsample_rows_per_driver():
+    """
+    Test that rows are reduced per driver and keep every channel.
+    """
+    rows = [
+        {
+            "driver_id": 1 + i % 2,
+            "timestamp": SAMPLE_START + timedelta(milliseconds=125 * i),
+            "speed": 200.0 + (i % 100),
+            "brake": 100.0 if i == 5000 else 0.0,
+        }
+        for i in range(20000)
+    ]
+    
+    result = downsample_rows(rows, 200)
+    
+    assert len(result) <= 200
+    assert {row["driver_id"] for row in result} == {1, 2}
+    assert any(row["brake"] == 100.0 for row in result)
+    assert [row["timestamp"] for row in result] == sorted(row["timestamp"] for row in result)
+
+
+def test_downsample_budget_covers_all_drivers_and_channels():
+    """
+    Test that max_points bounds the rows returned for a full grid.
+    """
+    rows = [
+        {
+            "driver_id": 1 + i % 20,
+            "timestamp": SAMPLE_START + timedelta(milliseconds=5 * i),
+            "speed": 200.0 + (i * 7919 % 100),
+            "throttle": float(i * 104729 % 100),
+            "brake": float(i % 3 == 0) * 100.0,
+            "rpm": 11000.0 + (i * 31 % 1000),
+            "gear": 1 + i % 8,
+        }
+        for i in range(40000)
+    ]
+    
+    for method in ("lttb", "minmax"):
+        result = downsample_rows(rows, 500, method)
+        assert 100 < len(result) <= 500
+        assert {row["driver_id"] for row in result} == set(range(1, 21))
+    
+    assert split_budget([10, 1000, 1000], 110) == [10, 50, 50]
+
+
+def test_resolve_max_points():
+    """
+    Test resolving named resolutions and explicit budgets.
+    """
+    assert resolve_max_points("low") == 200
+    assert resolve_max_points("full") is None
+    assert resolve_max_points("low", 42) == 42
+    assert resolve_max_points() is None
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.services.fastf1_importer import FastF1Importer, lap_arrays
+from app.services.telemetry_service import get_stored_laps, get_telemetry_data
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def _lap_frame(count: int = 8, start_ms: int = 0):
+    """
+    Columns shaped like FastF1's merged `Lap.get_telemetry()` frame.
+    """
+    offsets = (np.arange(count) * 250 + start_ms).astype("timedelta64[ms]")
+    return {
+        "Date": np.datetime64("2023-07-09T14:00:00", "ns") + offsets,
+        "SessionTime": np.timedelta64(3600, "s") + offsets,
+        "Speed": np.linspace(280.0, 120.0, count),
+        "Throttle": np.full(count, 100.0),
+        "Brake": np.arange(count) % 2 == 0,
+        "nGear": np.full(count, 7),
+        "RPM": np.full(count, 11000.0),
+        "DRS": np.array([0, 8, 10, 12, 14, 1, 0, 0][:count], dtype=float),
+        "X": np.arange(count) * 100.0,
+        "Y": np.full(count, -55.0),
+        "Z": np.zeros(count),
+    }
+
+
+def test_lap_arrays_converts_fastf1_units():
+    """
+    Test that FastF1 channels are converted to the stored units and codes.
+    """
+    sector_ends = (np.timedelta64(3600500, "ms"), np.timedelta64(3601250, "ms"))
+    arrays = lap_arrays(_lap_frame(), compound="SOFT", tyre_life=4.0, sector_times=sector_ends)
+
+    assert arrays["timestamp"][1] - arrays["timestamp"][0] == 250_000
+    assert arrays["brake"].tolist() == [100.0, 0.0] * 4
+    assert arrays["drs"].tolist() == [0, 0, 1, 1, 1, 0, 0, 0]
+    assert arrays["position_x"][1] == 10.0 and arrays["position_y"][0] == -5.5
+    assert arrays["sector"].tolist() == [1, 1, 2, 2, 2, 3, 3, 3]
+    assert set(arrays["tire_compound"].tolist()) == {"soft"}
+
+    unknown = lap_arrays(_lap_frame(), sector_times=(None, float("nan")))
+    assert np.isnan(unknown["sector"]).all() and np.isnan(unknown["tire_life"]).all()
+
+
+@pytest.mark.parametrize("backend", ["rows", "columnar"])
+async def test_store_laps_is_incremental(
+    authenticated_client: AsyncClient, db_session, monkeypatch, backend: str
+):
+    """
+    Test that re-importing writes only the laps that are not stored yet.
+    """
+    monkeypatch.setattr(settings, "TELEMETRY_STORAGE_BACKEND", backend)
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    importer = FastF1Importer(session_factory=TestingAsyncSessionLocal)
+    laps = {lap: lap_arrays(_lap_frame(start_ms=90_000 * lap)) for lap in (1, 2)}
+
+    assert await importer.store_laps(db_session, session_id, 1, laps) == (2, 16)
+    stored = await get_stored_laps(db_session, session_id)
+    assert stored == {1: {1, 2}}
+
+    laps[3] = lap_arrays(_lap_frame(start_ms=270_000))
+    assert await importer.store_laps(db_session, session_id, 1, laps, stored[1]) == (1, 8)
+    rows = await get_telemetry_data(db_session, session_id)
+    assert len(rows) == 24
+    assert [row["lap"] for row in rows[::8]] == [1, 2, 3]
+
+
+async def test_import_session_matched_by_source(authenticated_client: AsyncClient, db_session):
+    """
+    Test that re-imports find their session by source, never by free-text notes.
+    """
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race", "notes": "FastF1 2023 round 10 R"
+    })
+    user_id = response.json()["user_id"]
+    importer = FastF1Importer(session_factory=TestingAsyncSessionLocal)
+    info = {"name": "Race", "date": datetime(2023, 7, 9, 14, 0)}
+
+    first = await importer._get_or_create_session(db_session, user_id, "FastF1 2023 round 10 R", info)
+    again = await importer._get_or_create_session(db_session, user_id, "FastF1 2023 round 10 R", info)
+
+    assert first.id != response.json()["id"]
+    assert again.id == first.id
+    assert first.source == "FastF1 2023 round 10 R" and first.notes is None
@@ -0,0 +1,131 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.db.models import Driver
+from app.services.lap_comparison import compare_laps, lap_distance
+from tests.conftest import SAMPLE_START as START
+
+
+def _lap_rows(lap_seconds: float, samples: int, driver_id: int = 1, lap: int = 1, start: datetime = START):
+    """
+    A lap at a constant average speed over a 5 km track with one braking zone.
+    """
+    elapsed = np.linspace(0.0, lap_seconds, samples)
+    shape = 1.0 - 0.4 * np.exp(-((elapsed / lap_seconds - 0.5) ** 2) / 0.002)
+    # Scale so every lap covers the same distance whatever its time
+    speed = shape * 5000.0 / lap_distance(elapsed, shape)[-1]
+    return [
+        {
+            "driver_id": driver_id,
+            "timestamp": start + timedelta(seconds=float(t)),
+            "lap": lap,
+            "speed": float(v),
+            "throttle": 100.0 if v > speed.max() * 0.8 else 0.0,
+            "brake": 0.0 if v > speed.max() * 0.8 else 80.0,
+            "rpm": 11000.0,
+            "gear": 8 if v > speed.max() * 0.8 else 4,
+            "position_x": float(t),
+            "position_y": 0.0,
+        }
+        for t, v in zip(elapsed, speed)
+    ]
+
+
+def test_lap_distance():
+    """
+    Test that distance integrates km/h over seconds into metres.
+    """
+    distance = lap_distance(np.array([0.0, 1.0, 2.0]), np.array([36.0, 72.0, 72.0]))
+    assert distance.tolist() == pytest.approx([0.0, 15.0, 35.0])
+
+
+def test_compare_laps():
+    """
+    Test the delta trace and per-channel differences of two laps.
+    """
+    result = compare_laps(_lap_rows(90.0, 450), _lap_rows(91.5, 400), resolution=10.0)
+
+    assert result["lap_length"] == pytest.approx(5000.0, abs=1.0)
+    assert result["distance"][0] == 0.0 and result["distance"][-1] == result["lap_length"]
+    assert result["delta"][0] == 0.0
+    assert result["delta"][-1] == pytest.approx(1.5, abs=0.01)
+    assert np.all(np.diff(result["delta"]) >= -1e-3)
+
+    speed = result["channels"]["speed"]
+    assert np.allclose(
+        np.array(speed["target"]) - np.array(speed["reference"]), speed["difference"], atol=0.01
+    )
+    assert set(result["channels"]["gear"]["target"]) == {4.0, 8.0}
+
+    with pytest.raises(ValueError):
+        compare_laps([{**row, "speed": 0.0} for row in _lap_rows(90.0, 10)], _lap_rows(90.0, 10))
+
+
+@pytest.mark.parametrize("summaries", [True, False])
+async def test_compare_endpoint(authenticated_client: AsyncClient, db_session, monkeypatch, summaries: bool):
+    """
+    Test comparing two drivers' laps, the cache and its invalidation, with and without lap summaries.
+    """
+    monkeypatch.setattr(settings, "LAP_SUMMARIES_ON_INGEST", summaries)
+    drivers = [
+        Driver(name="Charles Leclerc", driver_id="leclerc", number=16, code="LEC"),
+        Driver(name="Carlos Sainz", driver_id="sainz", number=55, code="SAI"),
+    ]
+    db_session.add_all(drivers)
+    await db_session.commit()
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    url = f"/api/v1/telemetry/sessions/{session_id}/data"
+
+    points = []
+    for driver, lap_seconds in zip(drivers, (90.0, 91.0)):
+        points += [
+            {**row, "timestamp": row["timestamp"].isoformat()}
+            for row in _lap_rows(lap_seconds, 450, driver.id)
+        ]
+    await authenticated_client.post(url, json={"data": points})
+
+    params = {"session_a": session_id, "driver_a": "LEC", "lap_a": 1, "driver_b": "SAI", "lap_b": 1}
+    response = await authenticated_client.get("/api/v1/telemetry/compare", params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["target"] == {"session_id": session_id, "driver_code": "SAI", "lap": 1}
+    assert body["delta"][-1] == pytest.approx(1.0, abs=0.01)
+    assert len(body["distance"]) == len(body["channels"]["throttle"]["difference"])
+
+    cached = await authenticated_client.get("/api/v1/telemetry/compare", params=params)
+    assert cached.json() == body
+
+    # More samples for lap 1 of the target change its summary and the result
+    await authenticated_client.post(url, json={"data": [{
+        **points[-1], "timestamp": (START + timedelta(seconds=92)).isoformat(), "speed": 60.0
+    }]})
+    response = await authenticated_client.get("/api/v1/telemetry/compare", params=params)
+    assert response.json()["target_time"] == 92.0
+
+    missing = await authenticated_client.get("/api/v1/telemetry/compare", params={**params, "lap_b": 7})
+    assert missing.status_code == 404
+    unknown = await authenticated_client.get("/api/v1/telemetry/compare", params={**params, "driver_b": "XXX"})
+    assert unknown.status_code == 404
+
+
+@pytest.mark.benchmark
+def test_compare_laps_timing():
+    """
+    Test that an uncached comparison of two ~450-sample laps stays well under 50 ms.
+    """
+    reference, target = _lap_rows(90.0, 450), _lap_rows(90.7, 460)
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        compare_laps(reference, target)
+        timings.append(time.perf_counter() - started)
+    print(f"compare_laps: median {np.median(timings) * 1000:.1f} ms")
+    assert np.median(timings) < 0.05
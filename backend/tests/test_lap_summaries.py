@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.db.models import LapSummary
+from app.services.lap_summaries import build_stints, summarize_lap
+from tests.conftest import SAMPLE_START as START, telemetry_samples
+
+
+def _lap_points(driver_id: int, lap: int, lap_seconds: int, start: datetime, compound: str = "soft"):
+    """
+    One sample per second with three equal sectors.
+    """
+    return telemetry_samples(
+        lap_seconds,
+        driver_id,
+        interval_ms=1000,
+        start=start,
+        lap=lap,
+        sector=lambda i: 1 + i * 3 // lap_seconds,
+        speed=lambda i: 100.0 + i,
+        throttle=lambda i: 100.0 if i % 2 else 40.0,
+        brake=lambda i: 0.0 if i % 2 else 60.0,
+        rpm=11000.0,
+        drs=0,
+        tire_compound=compound,
+        tire_life=float(lap),
+    )
+
+
+def test_summarize_lap():
+    """
+    Test lap and sector times and channel aggregates for one lap.
+    """
+    rows = [
+        {**point, "timestamp": datetime.fromisoformat(point["timestamp"])}
+        for point in _lap_points(1, 1, 30, START)
+    ]
+    summary = summarize_lap(rows, next_start=START + timedelta(seconds=30))
+
+    assert summary["lap_time"] == 30.0
+    assert (summary["sector1_time"], summary["sector2_time"], summary["sector3_time"]) == (10.0, 10.0, 10.0)
+    assert (summary["speed_min"], summary["speed_max"], summary["speed_mean"]) == (100.0, 129.0, 114.5)
+    assert summary["full_throttle_pct"] == 0.5 and summary["brake_pct"] == 0.5
+    assert summary["tire_compound"] == "soft" and summary["gear_max"] == 7
+
+    in_progress = summarize_lap(rows)
+    assert in_progress["lap_time"] is None and in_progress["sector3_time"] is None
+
+
+def test_build_stints():
+    """
+    Test that compound changes and tyre life resets split stints.
+    """
+    laps = [
+        LapSummary(driver_id=1, lap=lap, lap_time=90.0 + 0.1 * lap, tire_compound=compound, tire_life=life)
+        for lap, compound, life in [
+            (1, "soft", 1), (2, "soft", 2), (3, "soft", 3),
+            (4, "hard", 1), (5, "hard", 2),
+            (6, "hard", 1),
+        ]
+    ]
+    stints = build_stints(laps)
+
+    assert [(s["stint"], s["first_lap"], s["last_lap"]) for s in stints] == [(1, 1, 3), (2, 4, 5), (3, 6, 6)]
+    assert stints[0]["degradation"] == pytest.approx(0.1)
+    assert stints[2]["degradation"] is None
+
+
+async def test_lap_summary_endpoints(authenticated_client: AsyncClient, drivers):
+    """
+    Test that summaries follow ingest incrementally and feed leaderboard and stints.
+    """
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    url = f"/api/v1/telemetry/sessions/{session_id}"
+
+    points = []
+    for driver_id, lap_seconds in ((1, 33), (2, 30)):
+        for lap in (1, 2):
+            start = START + timedelta(seconds=lap_seconds * (lap - 1))
+            points += _lap_points(driver_id, lap, lap_seconds, start, "soft")
+    await authenticated_client.post(f"{url}/data", json={"data": points})
+
+    laps = (await authenticated_client.get(f"{url}/laps")).json()
+    assert [(lap["driver_id"], lap["lap"], lap["lap_time"]) for lap in laps] == [
+        (1, 1, 33.0), (1, 2, None), (2, 1, 30.0), (2, 2, None)
+    ]
+
+    # Lap 3 closes lap 2 and starts a new stint on a new compound
+    await authenticated_client.post(f"{url}/data", json={
+        "data": _lap_points(2, 3, 30, START + timedelta(seconds=60), "hard")
+    })
+    leaderboard = (await authenticated_client.get(f"{url}/leaderboard")).json()
+    assert [entry["driver_id"] for entry in leaderboard] == [2, 1]
+    assert leaderboard[0]["best_lap_time"] == 30.0 and leaderboard[1]["gap"] == 3.0
+    assert leaderboard[0]["laps"] == 3 and leaderboard[0]["theoretical_best"] == 30.0
+
+    stints = (await authenticated_client.get(f"{url}/stints")).json()
+    assert [(s["driver_id"], s["stint"], s["tire_compound"]) for s in stints] == [
+        (1, 1, "soft"), (2, 1, "soft"), (2, 2, "hard")
+    ]
+
+    rebuilt = await authenticated_client.post(f"{url}/laps/rebuild")
+    assert rebuilt.json()["summaries"] == 5
+    assert (await authenticated_client.get(f"{url}/leaderboard")).json() == leaderboard
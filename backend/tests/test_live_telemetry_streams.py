@@ -0,0 +1,206 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import Driver, TelemetryData
+from app.services.live_telemetry import LiveTelemetryWindow, STREAM_INDEX_KEY
+from app.services.telemetry_persistence import LiveTelemetryPersister
+from tests.conftest import TestingAsyncSessionLocal, telemetry_samples
+
+fakeredis = pytest.importorskip("fakeredis")
+fake_aioredis = pytest.importorskip("fakeredis.aioredis")
+
+
+def _samples(driver_id: str, count: int, speed: float = 200.0):
+    return telemetry_samples(count, driver_id, interval_ms=100, speed=lambda i: speed + i)
+
+
+async def test_stream_window_reads_since_seq():
+    """
+    Test that samples are numbered per session and read back by since_seq.
+    """
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    window = LiveTelemetryWindow(size=100, redis_client=client)
+
+    await window.append("race-1", _samples("HAM", 3))
+    await window.append("race-1", _samples("VER", 2, speed=250.0))
+    await window.append("race-1", _samples("HAM", 2, speed=300.0))
+
+    points, last_seq, gap = await window.read("race-1")
+    assert last_seq == 7 and not gap
+    assert [point["seq"] for point in points] == list(range(1, 8))
+    assert [point["driver_id"] for point in points] == ["HAM"] * 3 + ["VER"] * 2 + ["HAM"] * 2
+
+    points, last_seq, _ = await window.read("race-1", driver_id="HAM", since_seq=3)
+    assert last_seq == 7
+    assert [point["seq"] for point in points] == [6, 7]
+    assert points[0]["speed"] == 300.0
+
+    points, _, _ = await window.read("race-1", since_seq=7)
+    assert points == []
+    assert await window.read("race-2") == ([], None, False)
+    assert await window.last_seq("race-1") == 7
+    assert await window.last_seq("race-2") is None
+    assert await client.smembers(STREAM_INDEX_KEY) == {
+        b"telemetry:stream:race-1:HAM", b"telemetry:stream:race-1:VER"
+    }
+
+
+async def test_stream_window_reports_trimmed_samples():
+    """
+    Test that resuming from before the retained window reports a gap.
+    """
+    # Redis streams, then the in-process window used without Redis
+    for client in (fake_aioredis.FakeRedis(server=fakeredis.FakeServer()), None):
+        window = LiveTelemetryWindow(size=5, redis_client=client)
+        await window.append("race-1", _samples("HAM", 12))
+        
+        points, last_seq, gap = await window.read("race-1", driver_id="HAM", since_seq=2)
+        assert gap and last_seq == 12
+        assert points[-1]["seq"] == 12
+        
+        _, _, gap = await window.read("race-1", driver_id="HAM", since_seq=10)
+        assert not gap
+
+
+async def test_interleaved_streams_report_no_false_gap():
+    """
+    Test that untrimmed samples of a multi-driver session are not reported as a gap.
+    """
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    # Approximate trimming can keep more entries than the window size
+    writer = LiveTelemetryWindow(size=10, redis_client=client)
+    window = LiveTelemetryWindow(size=5, redis_client=client)
+    for _ in range(6):
+        await writer.append("race-1", _samples("HAM", 1) + _samples("VER", 1))
+    
+    # VER holds seqs 2, 4, ..., 12 and the reader has seen up to 2
+    points, _, gap = await window.read("race-1", driver_id="VER", since_seq=2)
+    assert [point["seq"] for point in points] == [4, 6, 8, 10, 12]
+    assert not gap
+    
+    for _ in range(6):
+        await window.append("race-1", _samples("HAM", 1) + _samples("VER", 1))
+    _, _, gap = await window.read("race-1", driver_id="VER", since_seq=2)
+    assert gap
+
+
+async def test_persister_writes_live_samples(
+    authenticated_client: AsyncClient, db_session: AsyncSession
+):
+    """
+    Test that the consumer group persists stream entries once.
+    """
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    db_session.add(Driver(name="Lewis Hamilton", driver_id="hamilton", number=44, code="HAM"))
+    await db_session.commit()
+
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    window = LiveTelemetryWindow(size=100, redis_client=client)
+    await window.append(str(session_id), _samples("HAM", 5))
+    await window.append("not-a-session", _samples("HAM", 2))
+
+    persister = LiveTelemetryPersister(
+        session_factory=TestingAsyncSessionLocal, redis_client=client, consumer="test"
+    )
+    processed = 0
+    while (batch := await persister.run_once()) or persister._recovering:
+        processed += batch
+    assert processed == 7
+    assert await client.xpending(f"telemetry:stream:{session_id}:HAM", "telemetry-persist") == {
+        "pending": 0, "min": None, "max": None, "consumers": []
+    }
+
+    count = await db_session.scalar(
+        select(func.count()).select_from(TelemetryData).where(TelemetryData.session_id == session_id)
+    )
+    assert count == 5
+
+
+async def test_persister_summarizes_each_lap_as_it_starts(
+    authenticated_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """
+    Test that the persister refreshes a lap's summary when it starts, not on every batch.
+    """
+    from app.services import telemetry_service
+
+    refreshed = []
+
+    async def refresh(db, session_id, laps):
+        refreshed.append(sorted(laps))
+        return 0
+
+    monkeypatch.setattr(telemetry_service, "refresh_lap_summaries", refresh)
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    db_session.add(Driver(name="Lewis Hamilton", driver_id="hamilton", number=44, code="HAM"))
+    await db_session.commit()
+
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    window = LiveTelemetryWindow(size=100, redis_client=client)
+    samples = _samples("HAM", 12)
+    for i, sample in enumerate(samples):
+        sample["lap"] = 1 + i // 5
+    await window.append(str(session_id), samples)
+
+    persister = LiveTelemetryPersister(
+        session_factory=TestingAsyncSessionLocal, redis_client=client, consumer="test", batch_size=2
+    )
+    while await persister.run_once() or persister._recovering:
+        pass
+
+    driver_id = (await db_session.execute(select(Driver.id))).scalar_one()
+    assert refreshed == [[(driver_id, 1)], [(driver_id, 2)], [(driver_id, 3)]]
+
+
+async def test_persister_retries_failed_and_claims_idle_entries(
+    authenticated_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """
+    Test that a failed batch is retried and entries of a dead consumer are taken over.
+    """
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    db_session.add(Driver(name="Max Verstappen", driver_id="max_verstappen", number=1, code="VER"))
+    await db_session.commit()
+
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    window = LiveTelemetryWindow(size=100, redis_client=client)
+    await window.append(str(session_id), _samples("VER", 4))
+
+    async def fail(key, entries):
+        raise RuntimeError("database unavailable")
+
+    dead = LiveTelemetryPersister(
+        session_factory=TestingAsyncSessionLocal, redis_client=client, consumer="dead"
+    )
+    dead._recovering = False
+    monkeypatch.setattr(dead, "_persist", fail)
+    with pytest.raises(RuntimeError):
+        await dead.run_once()
+    assert dead._recovering
+
+    # Another worker takes over the entries left pending by the failed one
+    live = LiveTelemetryPersister(
+        session_factory=TestingAsyncSessionLocal, redis_client=client, consumer="live", claim_idle_ms=0
+    )
+    live._recovering = False
+    processed = 0
+    while (batch := await live.run_once()) or live._recovering:
+        processed += batch
+    assert processed == 4
+
+    count = await db_session.scalar(
+        select(func.count()).select_from(TelemetryData).where(TelemetryData.session_id == session_id)
+    )
+    assert count == 4
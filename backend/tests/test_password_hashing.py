@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+
+LOGIN_BURST = 8
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> List[float]:
+    """
+    Record how late the event loop wakes a coroutine sleeping `interval` seconds.
+    """
+    lags: List[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def test_password_hash_roundtrip():
+    """
+    Test that the awaitable hashing API matches the synchronous one.
+    """
+    hashed = await get_password_hash_async("Password123")
+    
+    assert await verify_password_async("Password123", hashed)
+    assert not await verify_password_async("WrongPassword1", hashed)
+    assert await verify_password_async("Password123", get_password_hash("Password123"))
+
+
+async def _burst_lags(
+    verify: Callable[[str, str], Awaitable[bool]], hashed: str, logins: int = LOGIN_BURST
+) -> Tuple[List[bool], List[float], float]:
+    """
+    Run a burst of concurrent logins and record the event loop lag meanwhile.
+    """
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_measure_loop_lag(stop))
+    await asyncio.sleep(0)
+    
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify("Password123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return results, sorted(await probe), elapsed
+
+
+@pytest.mark.benchmark
+async def test_login_burst_keeps_event_loop_responsive():
+    """
+    Benchmark event loop latency while a burst of logins verifies passwords.
+    """
+    hashed = get_password_hash("Password123")
+    
+    async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+        return verify_password(plain_password, hashed_password)
+    
+    # Baseline on this machine, under its current load: one bcrypt run on the loop
+    _, inline_lags, _ = await _burst_lags(verify_inline, hashed, logins=1)
+    results, lags, elapsed = await _burst_lags(verify_password_async, hashed)
+    
+    p99 = lags[int(len(lags) * 0.99) - 1]
+    print(
+        f"\n{LOGIN_BURST} logins on {settings.PASSWORD_HASH_WORKERS} workers in {elapsed:.3f}s, "
+        f"loop lag p99={p99 * 1000:.1f}ms max={lags[-1] * 1000:.1f}ms over {len(lags)} ticks "
+        f"(inline max={inline_lags[-1] * 1000:.1f}ms)"
+    )
+    
+    assert all(results)
+    # The whole offloaded burst must stall the loop far less than one inline verification
+    assert lags[-1] < inline_lags[-1] / 4
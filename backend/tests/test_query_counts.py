@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Circuit, Driver, Race, Team
+
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """
+    Record every SQL statement executed while the block runs.
+    """
+    statements: List[str] = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def _seed(db: AsyncSession, count: int) -> None:
+    """
+    Create `count` teams, drivers, circuits and races.
+    """
+    for i in range(count):
+        team = Team(name=f"Team {i}", team_id=f"team_{i}")
+        circuit = Circuit(
+            name=f"Circuit {i}", location="Somewhere", country="Nowhere",
+            circuit_id=f"circuit_{i}", length_km=5.0, turns=15
+        )
+        db.add_all([team, circuit])
+        await db.flush()
+        db.add(Driver(
+            name=f"Driver {i}", driver_id=f"driver_{i}", number=i,
+            code=f"D{i:02d}"[-3:], team_id=team.id
+        ))
+        db.add(Race(
+            name=f"Race {i}", season=2023, round=i + 1,
+            circuit_id=circuit.id, date=datetime(2023, 3, 1 + i % 28)
+        ))
+    await db.commit()
+
+
+@pytest.mark.parametrize("path", ["/api/v1/races/", "/api/v1/drivers/", "/api/v1/teams/"])
+async def test_list_query_count_is_constant(
+    authenticated_client: AsyncClient, db_session: AsyncSession, path: str
+):
+    """
+    Test that list endpoints cost the same number of queries for any page size.
+    """
+    await _seed(db_session, 40)
+    
+    # Warm the user principal cache so only the listing is counted
+    await authenticated_client.get("/protected")
+    
+    with count_queries() as small_page:
+        response = await authenticated_client.get(path, params={"limit": 5})
+        assert len(response.json()) == 5
+    
+    with count_queries() as large_page:
+        response = await authenticated_client.get(path, params={"limit": 40})
+        assert len(response.json()) == 40
+    
+    assert len(small_page) == len(large_page)
+    assert len(large_page) <= 2  # page (+ selectin load)
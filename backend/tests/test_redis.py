@@ -0,0 +1,82 @@
+import pytest
+
+from app.db import redis as redis_module
+from app.db.redis import close_redis, get_many, get_redis_client, init_redis
+from app.services.live_telemetry import LiveTelemetryWindow
+
+fakeredis = pytest.importorskip("fakeredis")
+fake_aioredis = pytest.importorskip("fakeredis.aioredis")
+
+DRIVERS = [
+    "VER", "PER", "HAM", "RUS", "LEC", "SAI", "NOR", "PIA", "ALO", "STR",
+    "GAS", "OCO", "ALB", "SAR", "TSU", "RIC", "BOT", "ZHO", "MAG", "HUL",
+]
+
+
+class CountingRedis(fake_aioredis.FakeRedis):
+    """
+    Fake client that counts round-trips: single commands and pipeline executions.
+    """
+
+    round_trips = 0
+
+    async def execute_command(self, *args, **options):
+        self.round_trips += 1
+        return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        async def counted_execute(raise_on_error=True):
+            self.round_trips += 1
+            return await execute(raise_on_error)
+
+        pipe.execute = counted_execute
+        return pipe
+
+
+async def test_get_many_uses_one_round_trip():
+    """
+    Test that a multi-get covers 20 drivers in one round-trip.
+    """
+    client = CountingRedis(server=fakeredis.FakeServer())
+    keys = [f"telemetry:summary:race-1:{driver}" for driver in DRIVERS]
+    await client.mset({key: driver.encode() for key, driver in zip(keys, DRIVERS)})
+
+    client.round_trips = 0
+    values = await get_many(keys + ["telemetry:summary:race-1:missing"], client=client)
+    assert client.round_trips == 1
+    assert values == [driver.encode() for driver in DRIVERS] + [None]
+
+
+async def test_session_read_round_trips_do_not_grow_with_drivers():
+    """
+    Test that reading a whole session's live window costs two round-trips.
+    """
+    client = CountingRedis(server=fakeredis.FakeServer())
+    window = LiveTelemetryWindow(size=100, redis_client=client)
+    for driver in DRIVERS:
+        await window.append("race-1", [{"driver_id": driver, "speed": 300.0}])
+
+    client.round_trips = 0
+    points, last_seq, _ = await window.read("race-1")
+
+    assert client.round_trips == 2
+    assert last_seq == 20
+    assert sorted(point["driver_id"] for point in points) == sorted(DRIVERS)
+
+
+async def test_shared_client_lifecycle():
+    """
+    Test that the pool is created once and released on close.
+    """
+    await close_redis()
+    client = await init_redis()
+
+    assert await get_redis_client() is client
+    assert client.connection_pool is redis_module.redis_pool
+    assert client.connection_pool.connection_kwargs.get("decode_responses", False) is False
+
+    await close_redis()
+    assert redis_module.redis_client is None
@@ -0,0 +1,78 @@
+from httpx import AsyncClient
+
+from app.services.reference_cache import reference_cache
+
+
+async def _create_team_and_driver(client: AsyncClient):
+    team = await client.post("/api/v1/teams/", json={
+        "name": "Mercedes",
+        "team_id": "mercedes",
+        "nationality": "German"
+    })
+    assert team.status_code == 201
+    driver = await client.post("/api/v1/drivers/", json={
+        "name": "Lewis Hamilton",
+        "driver_id": "hamilton",
+        "number": 44,
+        "code": "HAM",
+        "team_id": team.json()["id"]
+    })
+    assert driver.status_code == 201
+    return team.json(), driver.json()
+
+
+async def test_driver_lookup_uses_cache(authenticated_client: AsyncClient):
+    """
+    Test that driver reads are answered from the reference data cache.
+    """
+    team, driver = await _create_team_and_driver(authenticated_client)
+    
+    response = await authenticated_client.get(f"/api/v1/drivers/{driver['id']}")
+    
+    assert response.status_code == 200
+    assert response.json()["team"]["team_id"] == "mercedes"
+    assert reference_cache.driver_by_code("HAM")["id"] == driver["id"]
+    assert [d["code"] for d in reference_cache.team_drivers(team["id"])] == ["HAM"]
+
+
+async def test_admin_update_invalidates_cache(authenticated_client: AsyncClient):
+    """
+    Test that an admin update is visible on the next cached read.
+    """
+    team, _ = await _create_team_and_driver(authenticated_client)
+    await authenticated_client.get(f"/api/v1/teams/{team['id']}")
+    
+    response = await authenticated_client.put(
+        f"/api/v1/teams/{team['id']}", json={"full_name": "Mercedes-AMG Petronas"}
+    )
+    assert response.status_code == 200
+    
+    response = await authenticated_client.get(f"/api/v1/teams/{team['id']}")
+    assert response.json()["full_name"] == "Mercedes-AMG Petronas"
+    assert response.json()["drivers"][0]["code"] == "HAM"
+
+
+async def test_unknown_circuit(authenticated_client: AsyncClient):
+    """
+    Test that a missing circuit still returns 404 through the cache.
+    """
+    response = await authenticated_client.get("/api/v1/circuits/424242")
+    
+    assert response.status_code == 404
+
+
+async def test_load_reference_data_without_session(authenticated_client: AsyncClient, monkeypatch):
+    """
+    Test that handlers without a request session can check driver codes.
+    """
+    from app.services import reference_cache as reference_cache_module
+    from tests.conftest import TestingAsyncSessionLocal
+    
+    monkeypatch.setattr(reference_cache_module, "AsyncSessionLocal", TestingAsyncSessionLocal)
+    await _create_team_and_driver(authenticated_client)
+    reference_cache.invalidate()
+    
+    reference = await reference_cache_module.load_reference_data()
+    
+    assert reference.driver_by_code("HAM")["driver_id"] == "hamilton"
+    assert reference.driver_by_code("XXX") is None
@@ -0,0 +1,129 @@
+from httpx import AsyncClient
+
+
+async def test_etag_and_not_modified(authenticated_client: AsyncClient):
+    """
+    Test that cached GETs carry an ETag and answer If-None-Match with 304.
+    """
+    response = await authenticated_client.get("/api/v1/circuits/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"')
+    
+    response = await authenticated_client.get(
+        "/api/v1/circuits/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+async def test_admin_write_invalidates(authenticated_client: AsyncClient):
+    """
+    Test that a superuser write changes the cached list and its ETag.
+    """
+    response = await authenticated_client.get("/api/v1/circuits/")
+    etag = response.headers["etag"]
+    
+    created = await authenticated_client.post("/api/v1/circuits/", json={
+        "name": "Silverstone",
+        "location": "Silverstone",
+        "country": "UK",
+        "circuit_id": "silverstone",
+        "length_km": 5.891,
+        "turns": 18
+    })
+    assert created.status_code == 201
+    
+    response = await authenticated_client.get(
+        "/api/v1/circuits/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [c["circuit_id"] for c in response.json()] == ["silverstone"]
+
+
+async def test_query_params_are_part_of_the_key(authenticated_client: AsyncClient):
+    """
+    Test that different query parameters are cached separately.
+    """
+    await authenticated_client.post("/api/v1/circuits/", json={
+        "name": "Monza",
+        "location": "Monza",
+        "country": "Italy",
+        "circuit_id": "monza",
+        "length_km": 5.793,
+        "turns": 11
+    })
+    
+    italy = await authenticated_client.get("/api/v1/circuits/", params={"country": "Italy"})
+    uk = await authenticated_client.get("/api/v1/circuits/", params={"country": "UK"})
+    
+    assert len(italy.json()) == 1
+    assert uk.json() == []
+
+
+async def test_local_hits_skip_redis(authenticated_client: AsyncClient, monkeypatch):
+    """
+    Test that in-process hits make no Redis call and a Redis outage is not retried per request.
+    """
+    from app.services import response_cache
+    
+    calls = []
+    
+    async def unavailable():
+        calls.append(1)
+        raise ConnectionError("Redis is down")
+    
+    monkeypatch.setattr(response_cache, "get_redis_client", unavailable)
+    
+    first = await authenticated_client.get("/api/v1/circuits/")
+    assert first.status_code == 200
+    assert len(calls) == 1
+    
+    for _ in range(3):
+        response = await authenticated_client.get("/api/v1/circuits/")
+        assert response.headers["etag"] == first.headers["etag"]
+    assert len(calls) == 1
+
+
+async def test_failed_invalidation_skips_redis_until_bumped(authenticated_client: AsyncClient, monkeypatch):
+    """
+    Test that stale Redis entries are not served after a failed invalidation, and the bump is retried.
+    """
+    import fakeredis
+    from fakeredis import aioredis as fake_aioredis
+    
+    from app.core.config import settings
+    from app.services import response_cache
+    
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    redis_down = False
+    
+    async def get_client():
+        if redis_down:
+            raise ConnectionError("Redis is down")
+        return client
+    
+    monkeypatch.setattr(response_cache, "get_redis_client", get_client)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_GENERATION_TTL", 0.0)
+    
+    response = await authenticated_client.get("/api/v1/circuits/")
+    assert response.json() == []
+    
+    redis_down = True
+    created = await authenticated_client.post("/api/v1/circuits/", json={
+        "name": "Monza",
+        "location": "Monza",
+        "country": "Italy",
+        "circuit_id": "monza",
+        "length_km": 5.793,
+        "turns": 11
+    })
+    assert created.status_code == 201
+    assert await client.get("response-cache:gen:circuits") is None
+    
+    redis_down = False
+    response = await authenticated_client.get("/api/v1/circuits/")
+    assert [c["circuit_id"] for c in response.json()] == ["monza"]
+    assert await client.get("response-cache:gen:circuits") == b"1"
@@ -0,0 +1,334 @@
+import json
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import telemetry_samples
+
+
+@pytest.fixture
+async def telemetry_session_id(authenticated_client: AsyncClient, drivers) -> int:
+    """
+    Create a telemetry session owned by the authenticated superuser.
+    """
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _points(count: int, driver_id: int = 1):
+    return telemetry_samples(count, driver_id, lap=lambda i: 1 + i // 100)
+
+
+async def test_bulk_ingest_json(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test bulk ingestion with a JSON array of points.
+    """
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        json={"data": _points(250)}
+    )
+    
+    assert response.status_code == 201
+    assert response.json()["accepted"] == 250
+    assert response.json()["batches"] >= 1
+
+
+async def test_bulk_ingest_ndjson(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test bulk ingestion with an NDJSON body.
+    """
+    body = "\n".join(json.dumps(point) for point in _points(50)) + "\n"
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 201
+    assert response.json()["accepted"] == 50
+
+
+async def test_bulk_ingest_ndjson_refreshes_summaries_once(
+    authenticated_client: AsyncClient, telemetry_session_id: int, monkeypatch
+):
+    """
+    Test that a multi-batch NDJSON upload refreshes lap summaries once, after the last batch.
+    """
+    from app.core.config import settings
+    from app.services import telemetry_service
+    
+    refreshed = []
+    
+    async def refresh(db, session_id, laps):
+        refreshed.append(sorted(laps))
+        return 0
+    
+    monkeypatch.setattr(settings, "TELEMETRY_INGEST_BATCH_SIZE", 40)
+    monkeypatch.setattr(telemetry_service, "refresh_lap_summaries", refresh)
+    body = "\n".join(json.dumps(point) for point in _points(250)) + "\n"
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.json()["batches"] == 7
+    assert refreshed == [[(1, 1), (1, 2), (1, 3)]]
+
+
+async def test_bulk_ingest_ndjson_split_characters(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that multibyte characters split across body chunks are decoded.
+    """
+    points = [{**point, "tire_compound": "médium"} for point in _points(20)]
+    body = ("\n".join(json.dumps(point, ensure_ascii=False) for point in points) + "\n").encode("utf-8")
+
+    async def chunks():
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        content=chunks(),
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 201
+    assert response.json()["accepted"] == 20
+
+
+async def test_bulk_ingest_invalid_ndjson(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that an invalid NDJSON line is rejected with its line number.
+    """
+    body = json.dumps(_points(1)[0]) + "\n{\"speed\": 100}\n"
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 422
+    assert "line 2" in response.json()["detail"]
+
+
+async def test_bulk_ingest_unknown_driver(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that points naming a driver that does not exist are rejected with 422.
+    """
+    url = f"/api/v1/telemetry/sessions/{telemetry_session_id}/data"
+    response = await authenticated_client.post(url, json={"data": _points(2) + _points(1, driver_id=99)})
+    assert response.status_code == 422
+    assert "data[2]" in response.json()["detail"]
+    
+    lines = [json.dumps(point) for point in _points(3) + _points(1, driver_id=99)]
+    response = await authenticated_client.post(
+        url, content="\n".join(lines), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 422
+    assert "line 4" in response.json()["detail"]
+    
+    response = await authenticated_client.get(url)
+    assert response.json()["data"] == []
+
+
+async def test_bulk_ingest_unknown_session(authenticated_client: AsyncClient):
+    """
+    Test bulk ingestion into a session that does not exist.
+    """
+    response = await authenticated_client.post(
+        "/api/v1/telemetry/sessions/999999/data",
+        json={"data": _points(1)}
+    )
+    
+    assert response.status_code == 404
+
+
+async def test_export_ndjson(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that a streamed NDJSON export returns every row in time order.
+    """
+    await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        json={"data": _points(120)}
+    )
+    
+    response = await authenticated_client.get(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/export",
+        params={"format": "ndjson"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 120
+    assert rows[0]["speed"] == 200.0
+
+
+async def test_export_csv(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that a CSV export starts with a header line.
+    """
+    await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        json={"data": _points(10)}
+    )
+    
+    response = await authenticated_client.get(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/export",
+        params={"format": "csv"}
+    )
+    
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("timestamp,driver_id,lap")
+    assert len(lines) == 11
+
+
+async def test_query_keyset_pagination(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that following cursors walks every row exactly once.
+    """
+    await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        json={"data": _points(250)}
+    )
+    
+    speeds = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 100, "columns": "speed"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await authenticated_client.get(
+            f"/api/v1/telemetry/sessions/{telemetry_session_id}/data", params=params
+        )
+        assert response.status_code == 200
+        body = response.json()
+        speeds.extend(row["speed"] for row in body["data"])
+        assert "throttle" not in body["data"][0]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert pages == 3
+    assert speeds == [200.0 + i for i in range(250)]
+
+
+async def test_query_lap_range(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test filtering stored telemetry by lap range.
+    """
+    await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        json={"data": _points(250)}
+    )
+    
+    response = await authenticated_client.get(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        params={"lap_range": "2-3"}
+    )
+    
+    assert response.status_code == 200
+    assert {row["lap"] for row in response.json()["data"]} == {2, 3}
+    assert len(response.json()["data"]) == 150
+    
+    for lap_range in ("3-2", "0-2", "5--3"):
+        response = await authenticated_client.get(
+            f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+            params={"lap_range": lap_range}
+        )
+        assert response.status_code == 400
+
+
+async def test_query_unknown_column(authenticated_client: AsyncClient, telemetry_session_id: int):
+    """
+    Test that projecting an unknown column is rejected.
+    """
+    response = await authenticated_client.get(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        params={"columns": "speed,warp_factor"}
+    )
+    
+    assert response.status_code == 400
+
+
+async def test_query_downsampled(authenticated_client: AsyncClient, telemetry_session_id: int, monkeypatch):
+    """
+    Test that max_points returns a reduced, unpaginated window.
+    """
+    await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        json={"data": _points(2000)}
+    )
+    
+    response = await authenticated_client.get(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        params={"max_points": 100, "downsample": "minmax"}
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+    assert 0 < len(response.json()["data"]) <= 100
+    
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "TELEMETRY_DOWNSAMPLE_MAX_ROWS", 1000)
+    response = await authenticated_client.get(
+        f"/api/v1/telemetry/sessions/{telemetry_session_id}/data",
+        params={"max_points": 100}
+    )
+    assert response.status_code == 400
+
+
+async def test_live_since_seq(authenticated_client: AsyncClient, monkeypatch):
+    """
+    Test that live samples are numbered and since_seq returns only newer ones.
+    """
+    from app.core.config import settings
+    from app.services.live_telemetry import live_window
+    
+    response = await authenticated_client.get("/api/v1/telemetry/live/demo-1")
+    assert response.status_code == 200
+    body = response.json()
+    seqs = [point["seq"] for point in body["data"]]
+    assert seqs == sorted(seqs) and body["last_seq"] == seqs[-1]
+    
+    # Stop the simulated feed so only the samples appended below are new
+    monkeypatch.setattr(settings, "TELEMETRY_SIMULATOR_ENABLED", False)
+    
+    await live_window.append("demo-1", [
+        {"timestamp": datetime.utcnow().isoformat(), "driver_id": None, "speed": 301.0},
+        {"timestamp": datetime.utcnow().isoformat(), "driver_id": None, "speed": 302.0},
+    ])
+    
+    response = await authenticated_client.get(
+        "/api/v1/telemetry/live/demo-1", params={"since_seq": body["last_seq"]}
+    )
+    resumed = response.json()
+    assert [point["speed"] for point in resumed["data"]] == [301.0, 302.0]
+    assert [point["seq"] for point in resumed["data"]] == [body["last_seq"] + 1, body["last_seq"] + 2]
+    assert resumed["last_seq"] == body["last_seq"] + 2
+    
+    response = await authenticated_client.get(
+        "/api/v1/telemetry/live/demo-1", params={"since_seq": resumed["last_seq"]}
+    )
+    assert response.json()["data"] == []
+
+
+async def test_live_only_simulates_demo_sessions(authenticated_client: AsyncClient):
+    """
+    Test that stored session IDs and replay streams never get simulated cars.
+    """
+    from app.services.telemetry_simulator import live_simulations
+    
+    for session_id in ("42", "replay-42", "u1-lap-study"):
+        response = await authenticated_client.get(f"/api/v1/telemetry/live/{session_id}")
+        assert response.status_code == 200
+        assert response.json()["data"] == [] and response.json()["last_seq"] is None
+    assert live_simulations.sessions == {}
@@ -0,0 +1,163 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.core.serialization import dumps, loads, unpackb
+from app.services.connection_manager import ConnectionManager, encode_frame
+from app.services.telemetry_codec import decode_packed, encode_packed, negotiate_encoding
+from tests.conftest import SAMPLE_START, telemetry_samples
+from tests.test_connection_manager import FakeWebSocket, _drain
+
+DRIVERS = [
+    "VER", "PER", "HAM", "RUS", "LEC", "SAI", "NOR", "PIA", "ALO", "STR",
+    "GAS", "OCO", "ALB", "SAR", "TSU", "RIC", "BOT", "ZHO", "MAG", "HUL",
+]
+
+
+def _update(samples_per_driver: int = 5):
+    points = sorted(
+        (
+            point
+            for n, driver in enumerate(DRIVERS)
+            for point in telemetry_samples(
+                samples_per_driver,
+                driver,
+                interval_ms=100,
+                start=SAMPLE_START + timedelta(milliseconds=n),
+                seq=lambda i: 1000 + i * len(DRIVERS) + n,
+                speed=287.25 + n,
+                throttle=99.5,
+                gear=8,
+                rpm=11800.0,
+                drs=1,
+                position_x=lambda i: 512.5 + i,
+                position_y=-210.0,
+                position_z=3.25,
+                tire_compound="medium" if n % 2 else "soft",
+                tire_life=87.5,
+                sector=2,
+                lap=31,
+            )
+        ),
+        key=lambda point: point["seq"],
+    )
+    return {
+        "type": "telemetry_update",
+        "session_id": "race-1",
+        "driver_id": None,
+        "data": points,
+        "last_seq": points[-1]["seq"],
+        "timestamp": "2023-07-09T14:00:01",
+    }
+
+
+def test_packed_round_trip():
+    """
+    Test that a packed frame decodes back to the original samples.
+    """
+    message = _update()
+    decoded = decode_packed(encode_packed(message))
+
+    assert decoded["type"] == "telemetry_update"
+    assert decoded["last_seq"] == message["last_seq"]
+    assert decoded["data"] == message["data"]
+
+
+def test_packed_round_trip_is_lossless():
+    """
+    Test that values float32 cannot represent survive packing unchanged.
+    """
+    message = _update(1)
+    message["data"][0].update({
+        "timestamp": "2023-07-09T14:08:20.123456",
+        "rpm": 11834.7,
+        "speed": 287.3,
+        "position_x": -1234.56,
+        "tire_life": 63.33,
+    })
+    message["data"][1]["timestamp"] = "2023-07-09T14:00:00.000001"
+
+    decoded = decode_packed(encode_packed(message))
+    assert decoded["data"] == message["data"]
+
+
+def test_packed_cached_data_and_missing_values():
+    """
+    Test packing the nested cached_data payload with missing channels.
+    """
+    message = {
+        "type": "cached_data",
+        "data": {
+            "session_id": "race-1",
+            "data": [
+                {"seq": 7, "timestamp": "2023-07-09T14:00:00", "driver_id": None, "speed": 101.5},
+            ],
+            "last_seq": 7,
+        },
+        "last_seq": 7,
+    }
+    decoded = decode_packed(encode_packed(message))
+
+    assert decoded["data"]["last_seq"] == 7
+    point = decoded["data"]["data"][0]
+    assert point["seq"] == 7 and point["speed"] == 101.5
+    assert point["driver_id"] is None and point["gear"] is None and point["tire_compound"] is None
+
+
+def test_negotiate_encoding():
+    """
+    Test picking the encoding from the query parameter or subprotocols.
+    """
+    assert negotiate_encoding(None, []) == ("json", None)
+    assert negotiate_encoding("packed", []) == ("packed", None)
+    assert negotiate_encoding(None, ["chat", "boxbox.msgpack"]) == ("msgpack", "boxbox.msgpack")
+    assert negotiate_encoding("packed", ["boxbox.packed"]) == ("packed", "boxbox.packed")
+    assert negotiate_encoding("xml", []) == (None, None)
+
+
+async def test_send_many_encodes_once_per_encoding():
+    """
+    Test that mixed-encoding subscribers each get their own wire format.
+    """
+    manager = ConnectionManager()
+    sockets = {encoding: FakeWebSocket() for encoding in ("json", "msgpack", "packed")}
+    for encoding, ws in sockets.items():
+        await manager.connect(ws, "race-1", encoding)
+
+    message = _update(1)
+    assert await manager.send_many(message, sockets.values()) == 3
+    await manager.send_data({"type": "pong"}, sockets["packed"])
+    await _drain(sockets["json"], sockets["msgpack"], expected=1)
+    await _drain(sockets["packed"], expected=2)
+
+    assert sockets["json"].sent[0]["data"] == message["data"]
+    assert unpackb(sockets["msgpack"].sent[0])["data"] == message["data"]
+    assert decode_packed(sockets["packed"].sent[0])["data"] == message["data"]
+    # Non-telemetry messages stay JSON text on packed sockets
+    assert sockets["packed"].sent[1] == {"type": "pong"}
+    for ws in sockets.values():
+        await manager.disconnect(ws, "race-1")
+
+
+@pytest.mark.benchmark
+def test_binary_frames_benchmark():
+    """
+    Benchmark frame size and encode CPU for a 20-car live update.
+    """
+    message = _update()
+    sizes = {}
+    cpu = {}
+    for encoding in ("json", "msgpack", "packed"):
+        sizes[encoding] = len(encode_frame(message, encoding).data)
+        started = time.process_time()
+        for _ in range(200):
+            encode_frame(message, encoding)
+        cpu[encoding] = (time.process_time() - started) / 200
+
+    print("\n20-car update: " + ", ".join(
+        f"{encoding} {sizes[encoding]} bytes {cpu[encoding] * 1e6:.0f}us" for encoding in sizes
+    ))
+    assert sizes["msgpack"] < sizes["json"]
+    assert sizes["packed"] * 2 < sizes["json"]
+    assert loads(dumps(message)) == message
@@ -0,0 +1,110 @@
+from datetime import timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import TelemetryLapBlock
+
+from app.services.telemetry_columnar import (
+    arrays_to_rows,
+    compact_lap_blocks,
+    decode_block,
+    encode_block,
+    read_lap_blocks,
+    rows_to_arrays,
+    write_lap_blocks,
+)
+from app.services.telemetry_service import telemetry_keyset
+from tests.conftest import SAMPLE_START, telemetry_samples
+
+START = SAMPLE_START.replace(tzinfo=timezone.utc)
+
+
+def _rows(count: int, driver_id: int = 1, lap: int = 1, offset: int = 0):
+    return [
+        {"session_id": 1, **row}
+        for row in telemetry_samples(
+            count,
+            driver_id,
+            start=START + timedelta(milliseconds=250 * offset),
+            isoformat=False,
+            lap=lap,
+            throttle=95.5,
+            brake=None,
+            drs=lambda i: 1 if i % 2 else 0,
+            tire_compound="soft",
+            sector=2,
+        )
+    ]
+
+
+def test_block_round_trip():
+    """
+    Test that encoding and decoding a lap block preserves every channel.
+    """
+    rows = _rows(100)
+    arrays = decode_block(encode_block(rows_to_arrays(rows)))
+    decoded = arrays_to_rows(arrays, session_id=1, driver_id=1, lap=1)
+    
+    assert len(decoded) == 100
+    assert decoded[0]["timestamp"] == rows[0]["timestamp"]
+    assert decoded[5]["speed"] == 205.0
+    assert decoded[5]["gear"] == 7
+    assert decoded[5]["drs"] == 1
+    assert decoded[5]["brake"] is None
+    assert decoded[5]["position_x"] is None
+    assert decoded[5]["tire_compound"] == "soft"
+
+
+async def _block_counts(db: AsyncSession, session_id: int):
+    stmt = select(TelemetryLapBlock.driver_id, TelemetryLapBlock.lap, func.count()).where(
+        TelemetryLapBlock.session_id == session_id
+    ).group_by(TelemetryLapBlock.driver_id, TelemetryLapBlock.lap)
+    return {(driver_id, lap): count for driver_id, lap, count in (await db.execute(stmt)).all()}
+
+
+async def test_write_and_read_lap_blocks(create_tables, db_session: AsyncSession):
+    """
+    Test that batches append blocks read back in time order and compact when the lap closes.
+    """
+    await write_lap_blocks(db_session, 1, _rows(10, offset=10) + _rows(5, driver_id=2))
+    await write_lap_blocks(db_session, 1, _rows(10))
+    await db_session.commit()
+    
+    rows = await read_lap_blocks(db_session, 1, driver_id=1)
+    
+    assert len(rows) == 20
+    assert [row["timestamp"] for row in rows] == sorted(row["timestamp"] for row in rows)
+    assert len(await read_lap_blocks(db_session, 1)) == 25
+    assert await _block_counts(db_session, 1) == {(1, 1): 2, (2, 1): 1}
+    
+    # Driver 1 starting lap 2 closes lap 1 and compacts its blocks
+    await write_lap_blocks(db_session, 1, _rows(3, lap=2, offset=20))
+    await db_session.commit()
+    assert await _block_counts(db_session, 1) == {(1, 1): 1, (1, 2): 1, (2, 1): 1}
+    assert await read_lap_blocks(db_session, 1, driver_id=1, lap_range=(1, 1)) == rows
+
+
+async def test_keyset_pages_with_shared_timestamps(create_tables, db_session: AsyncSession):
+    """
+    Test that keyset pages return samples sharing a timestamp exactly once, across compaction.
+    """
+    # Three samples per driver lap at each timestamp, spread over two blocks
+    same_time = [{**row, "timestamp": START + timedelta(seconds=i // 3)} for i, row in enumerate(_rows(6))]
+    await write_lap_blocks(db_session, 1, same_time[:4] + [{**row, "driver_id": 2} for row in same_time])
+    await write_lap_blocks(db_session, 1, same_time[4:])
+    await db_session.commit()
+    
+    speeds = []
+    after = None
+    while True:
+        page = await read_lap_blocks(db_session, 1, after=after, limit=4)
+        speeds.extend((row["driver_id"], row["speed"]) for row in page)
+        if len(page) < 4:
+            break
+        after = telemetry_keyset(page[-1])
+        # Merging the lap's blocks between pages must not shift the cursor
+        await compact_lap_blocks(db_session, 1, 1, 1)
+    
+    assert sorted(speeds) == [(driver_id, 200.0 + i) for driver_id in (1, 2) for i in range(6)]
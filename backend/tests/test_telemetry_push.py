@@ -0,0 +1,243 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services.connection_manager import ConnectionManager
+from app.services.telemetry_push import TelemetryPushHub
+from tests.test_connection_manager import FakeWebSocket, _drain
+
+
+class FakeSource:
+    """
+    Live telemetry source that grows by one sample per read and counts reads.
+    """
+
+    def __init__(self) -> None:
+        self.reads = 0
+        self.start = datetime(2023, 7, 9, 14, 0, 0)
+
+    async def __call__(
+        self, session_id: str, driver_id: Optional[str], since_seq: Optional[int]
+    ) -> Dict[str, Any]:
+        self.reads += 1
+        points = [
+            {
+                "seq": i + 1,
+                "timestamp": (self.start + timedelta(seconds=i)).isoformat(),
+                "speed": 200.0 + i,
+            }
+            for i in range(self.reads)
+        ]
+        if since_seq is not None:
+            points = [point for point in points if point["seq"] > since_seq]
+        return {"session_id": session_id, "driver_id": driver_id, "data": points, "last_seq": self.reads}
+
+
+async def test_one_read_per_tick_for_all_subscribers():
+    """
+    Test that subscribers share a producer and receive only new samples.
+    """
+    source = FakeSource()
+    manager = ConnectionManager()
+    hub = TelemetryPushHub(manager, source=source, rate_hz=50)
+    sockets = [FakeWebSocket() for _ in range(5)]
+    for ws in sockets:
+        await manager.connect(ws, "race-1")
+        await hub.subscribe(ws, "race-1", "HAM", since_seq=0)
+    
+    await _drain(*sockets, expected=5)
+    await hub.stop()
+    await _drain(*sockets, expected=source.reads)
+    
+    assert len(hub.producers) == 0
+    # Each read is pushed once to every socket, not read once per socket
+    assert all(len(ws.sent) == source.reads for ws in sockets)
+    seqs = [point["seq"] for message in sockets[0].sent for point in message["data"]]
+    assert seqs == list(range(1, source.reads + 1))
+    assert sockets[0].sent[-1]["last_seq"] == source.reads
+    assert sockets[0].sent[0]["type"] == "telemetry_update"
+    assert sockets[0].sent[0]["driver_id"] == "HAM"
+    for ws in sockets:
+        await manager.disconnect(ws, "race-1")
+
+
+async def test_producer_lifecycle_follows_subscriptions():
+    """
+    Test that producers start with the first subscriber and stop with the last.
+    """
+    manager = ConnectionManager()
+    hub = TelemetryPushHub(manager, source=FakeSource(), rate_hz=50)
+    first, second = FakeWebSocket(), FakeWebSocket()
+    for ws in (first, second):
+        await manager.connect(ws, "race-1")
+    
+    await hub.subscribe(first, "race-1", "HAM")
+    await hub.subscribe(second, "race-1", "HAM")
+    await hub.subscribe(second, "race-1", "VER")
+    assert set(hub.producers) == {("race-1", "HAM"), ("race-1", "VER")}
+    assert hub.subscriptions(second) == [("race-1", "HAM"), ("race-1", "VER")]
+    
+    await hub.unsubscribe(first, "race-1", "HAM")
+    assert ("race-1", "HAM") in hub.producers
+    
+    await hub.unsubscribe_all(second)
+    assert hub.producers == {}
+    for ws in (first, second):
+        await manager.disconnect(ws, "race-1")
+
+
+async def test_subscriptions_per_socket_are_capped():
+    """
+    Test that a socket cannot start more than max_subscriptions producers.
+    """
+    manager = ConnectionManager()
+    hub = TelemetryPushHub(manager, source=FakeSource(), rate_hz=50, max_subscriptions=2)
+    ws = FakeWebSocket()
+    await manager.connect(ws, "race-1")
+    
+    await hub.subscribe(ws, "race-1", "HAM")
+    await hub.subscribe(ws, "race-1", "VER")
+    with pytest.raises(ValueError):
+        await hub.subscribe(ws, "race-1", "LEC")
+    # Renewing a held subscription is not a new one
+    await hub.subscribe(ws, "race-1", "HAM")
+    assert set(hub.producers) == {("race-1", "HAM"), ("race-1", "VER")}
+    
+    await hub.unsubscribe_all(ws)
+    await manager.disconnect(ws, "race-1")
+
+
+async def test_producer_without_baseline_starts_from_current_position():
+    """
+    Test that a producer with no since_seq does not replay the window.
+    """
+    source = FakeSource()
+    manager = ConnectionManager()
+    hub = TelemetryPushHub(manager, source=source, rate_hz=50)
+    ws = FakeWebSocket()
+    await manager.connect(ws, "race-1")
+    await hub.subscribe(ws, "race-1")
+    
+    await _drain(ws, expected=2)
+    await hub.stop()
+    
+    assert ws.sent[0]["data"][0]["seq"] == 2
+    await manager.disconnect(ws, "race-1")
+
+
+class StampedSource:
+    """
+    Source that produces a few new samples per read, stamped with their creation time.
+    """
+
+    def __init__(self, per_read: int = 4) -> None:
+        self.per_read = per_read
+        self.seq = 0
+
+    async def __call__(
+        self, session_id: str, driver_id: Optional[str], since_seq: Optional[int]
+    ) -> Dict[str, Any]:
+        created = asyncio.get_running_loop().time()
+        points = []
+        for _ in range(self.per_read):
+            self.seq += 1
+            points.append({"seq": self.seq, "created": created, "speed": 250.0, "throttle": 100.0})
+        return {"session_id": session_id, "driver_id": driver_id, "data": points, "last_seq": self.seq}
+
+
+class TimedWebSocket(FakeWebSocket):
+    """
+    WebSocket double that records frame sizes and sample latencies.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.bytes = 0
+        self.latencies: List[float] = []
+
+    async def send_text(self, data: str) -> None:
+        now = asyncio.get_running_loop().time()
+        self.bytes += len(data)
+        await super().send_text(data)
+        self.latencies.extend(now - point["created"] for point in self.sent[-1]["data"])
+
+
+async def test_batching_window_flushes_by_time_or_size():
+    """
+    Test that held samples go out once the window or sample limit is reached.
+    """
+    manager = ConnectionManager()
+    hub = TelemetryPushHub(
+        manager, source=StampedSource(per_read=4), rate_hz=200, batch_window_ms=1000, batch_max_samples=20
+    )
+    ws = FakeWebSocket()
+    await manager.connect(ws, "race-1")
+    await hub.subscribe(ws, "race-1", "HAM", since_seq=0)
+    
+    await _drain(ws, expected=2)
+    await hub.stop()
+    
+    # Five reads fill a batch long before the one second window
+    assert [len(message["data"]) for message in ws.sent[:2]] == [20, 20]
+    assert ws.sent[1]["data"][0]["seq"] == 21
+    await manager.disconnect(ws, "race-1")
+
+
+async def test_stop_flushes_held_samples():
+    """
+    Test that stopping the hub sends samples still held in a batch.
+    """
+    manager = ConnectionManager()
+    hub = TelemetryPushHub(
+        manager, source=StampedSource(per_read=4), rate_hz=200, batch_window_ms=10000
+    )
+    ws = FakeWebSocket()
+    await manager.connect(ws, "race-1")
+    await hub.subscribe(ws, "race-1", "HAM", since_seq=0)
+    producer = hub.producers[("race-1", "HAM")]
+    while not producer.pending:
+        await asyncio.sleep(0.005)
+    
+    await hub.stop()
+    await _drain(ws, expected=1)
+    
+    assert ws.sent[0]["data"][0]["seq"] == 1
+    assert producer.pending == []
+    await manager.disconnect(ws, "race-1")
+
+
+@pytest.mark.benchmark
+async def test_batching_benchmark():
+    """
+    Benchmark frames/s, bytes/s and p99 latency for several batching windows.
+    """
+    duration = 0.5
+    results = {}
+    for window_ms in (0, 20, 50):
+        manager = ConnectionManager()
+        hub = TelemetryPushHub(
+            manager, source=StampedSource(), rate_hz=200, batch_window_ms=window_ms
+        )
+        ws = TimedWebSocket()
+        await manager.connect(ws, "race-1")
+        await hub.subscribe(ws, "race-1", "HAM", since_seq=0)
+        await asyncio.sleep(duration)
+        await hub.stop()
+        await manager.disconnect(ws, "race-1")
+        
+        latencies = sorted(ws.latencies)
+        results[window_ms] = (
+            len(ws.sent) / duration,
+            ws.bytes / duration,
+            latencies[int(len(latencies) * 0.99) - 1],
+        )
+    
+    print("\n" + "\n".join(
+        f"window {window_ms}ms: {frames:.0f} frames/s, {rate / 1024:.1f} KiB/s, p99 {p99 * 1000:.1f}ms"
+        for window_ms, (frames, rate, p99) in results.items()
+    ))
+    assert results[50][0] * 4 < results[0][0]
+    assert results[50][1] < results[0][1]
+    assert results[50][2] < 0.1
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.live_telemetry import live_window
+from app.services.telemetry_replay import SessionReplay, VirtualClock, replay_manager
+from tests.conftest import SAMPLE_START as START, TestingAsyncSessionLocal, telemetry_samples
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+async def replay_session_id(authenticated_client: AsyncClient, drivers, monkeypatch) -> int:
+    """
+    Create a stored session with 40 samples, 250 ms apart, and route replays to the test database.
+    """
+    monkeypatch.setattr(replay_manager, "session_factory", TestingAsyncSessionLocal)
+    response = await authenticated_client.post("/api/v1/telemetry/sessions", json={
+        "session_type": "Race"
+    })
+    session_id = response.json()["id"]
+    await authenticated_client.post(f"/api/v1/telemetry/sessions/{session_id}/data", json={
+        "data": telemetry_samples(40)
+    })
+    yield session_id
+    await replay_manager.stop_all()
+
+
+def test_virtual_clock():
+    """
+    Test that the clock scales wall time and re-anchors on pause, speed change and seek.
+    """
+    wall = FakeTime()
+    start = START.replace(tzinfo=timezone.utc)
+    clock = VirtualClock(start, speed=10.0, time_fn=wall)
+
+    wall.now += 1.0
+    assert clock.now() == start + timedelta(seconds=10)
+    clock.pause()
+    wall.now += 5.0
+    assert clock.now() == start + timedelta(seconds=10)
+    assert clock.wall_seconds_until(start + timedelta(seconds=20)) is None
+    clock.resume()
+    clock.set_speed(2.0)
+    assert clock.wall_seconds_until(start + timedelta(seconds=20)) == 5.0
+    clock.seek(start)
+    wall.now += 0.5
+    assert clock.now() == start + timedelta(seconds=1)
+
+
+async def test_replay_follows_virtual_clock_and_seeks(replay_session_id: int):
+    """
+    Test that samples are published when the virtual clock reaches them, across pages and seeks.
+    """
+    wall = FakeTime()
+    replay = SessionReplay(
+        replay_session_id,
+        speed=4.0,
+        session_factory=TestingAsyncSessionLocal,
+        page_size=16,
+        time_fn=wall,
+    )
+    await replay.start()
+    # Drive playback by hand instead of from the background task
+    await replay.stop()
+    assert replay.emitted == 1
+
+    wall.now += 1.0  # 4 s of session time, 16 more samples
+    while await replay.step() == 0.0:
+        pass
+    points, last_seq, _ = await live_window.read(f"replay-{replay_session_id}")
+    assert [point["speed"] for point in points] == [200.0 + i for i in range(17)]
+    assert last_seq == 17
+
+    replay.seek(START + timedelta(seconds=8))
+    while await replay.step() == 0.0:
+        pass
+    points, _, _ = await live_window.read(f"replay-{replay_session_id}", since_seq=17)
+    assert [point["speed"] for point in points] == [232.0]
+
+    wall.now += 10.0
+    while await replay.step() is not None:
+        pass
+    assert replay.finished
+    assert replay.emitted == 17 + 8
+
+
+async def test_replay_api(authenticated_client: AsyncClient, replay_session_id: int):
+    """
+    Test starting, controlling and watching a replay through the live endpoint.
+    """
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{replay_session_id}/replay", json={"speed": 50}
+    )
+    assert response.status_code == 201
+    live_session_id = response.json()["live_session_id"]
+    assert live_session_id == f"replay-{replay_session_id}"
+
+    # 10 s of telemetry at 50x takes 0.2 s
+    for _ in range(50):
+        status = (await authenticated_client.get(f"/api/v1/telemetry/replays/{live_session_id}")).json()
+        if status["finished"]:
+            break
+        await asyncio.sleep(0.05)
+    assert status["finished"] and status["emitted"] == 40
+
+    live = await authenticated_client.get(f"/api/v1/telemetry/live/{live_session_id}")
+    assert [point["seq"] for point in live.json()["data"]] == list(range(1, 41))
+
+    response = await authenticated_client.patch(
+        f"/api/v1/telemetry/replays/{live_session_id}",
+        json={"seek_to": (START + timedelta(seconds=5)).isoformat(), "paused": True}
+    )
+    assert response.json()["paused"] and not response.json()["finished"]
+
+    assert (await authenticated_client.patch(
+        f"/api/v1/telemetry/replays/{live_session_id}", json={"speed": 100}
+    )).status_code == 400
+
+    # Custom names are scoped to the user, never a stored session's numeric ID
+    response = await authenticated_client.post(
+        f"/api/v1/telemetry/sessions/{replay_session_id}/replay",
+        json={"live_session_id": str(replay_session_id)}
+    )
+    assert response.status_code == 201
+    assert response.json()["live_session_id"].endswith(f"-{replay_session_id}")
+    assert not response.json()["live_session_id"].isdigit()
+
+    response = await authenticated_client.delete(f"/api/v1/telemetry/replays/{live_session_id}")
+    assert response.status_code == 204
+    response = await authenticated_client.get(f"/api/v1/telemetry/replays/{live_session_id}")
+    assert response.status_code == 404
+
+
+async def test_replay_cannot_replace_another_users_replay(replay_session_id: int):
+    """
+    Test that a replay into a live session another user is replaying into is refused.
+    """
+    first = await replay_manager.start(replay_session_id, speed=1.0, user_id=1)
+    with pytest.raises(PermissionError):
+        await replay_manager.start(replay_session_id, speed=1.0, user_id=2)
+    assert replay_manager.get(first.live_session_id) is first
+
+    second = await replay_manager.start(replay_session_id, speed=1.0, user_id=2, replace_any=True)
+    assert replay_manager.get(first.live_session_id) is second
@@ -0,0 +1,157 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.telemetry_simulator import (
+    DEFAULT_GRID,
+    PIT_BELOW_LIFE,
+    TOP_SPEED,
+    LiveSimulations,
+    RaceSimulation,
+    Track,
+)
+from tests.conftest import SAMPLE_START as START
+
+
+def test_same_seed_same_traces():
+    """
+    Test that a seed fully determines the simulated samples.
+    """
+    first = RaceSimulation(seed=7, start=START).run(50)
+    second = RaceSimulation(seed=7, start=START).run(50)
+    other = RaceSimulation(seed=8, start=START).run(50)
+
+    assert first == second
+    assert first != other
+    assert len(first) == 50 * len(DEFAULT_GRID)
+    assert first[0]["timestamp"] == (START + timedelta(seconds=0.1)).isoformat()
+
+
+def test_traces_are_physically_consistent():
+    """
+    Test that channels agree with each other and with the vehicle model.
+    """
+    track = Track(seed=3)
+    assert track.speed.max() <= TOP_SPEED + 1e-9
+    assert 10.0 < track.speed.min() < track.speed.max() * 0.5
+    assert track.drs_zone.any()
+
+    samples = RaceSimulation(drivers=["HAM"], seed=3, start=START, track=track).run(900)
+    speed = np.array([s["speed"] for s in samples])
+    throttle = np.array([s["throttle"] for s in samples])
+    brake = np.array([s["brake"] for s in samples])
+    gear = np.array([s["gear"] for s in samples])
+
+    assert speed.max() <= TOP_SPEED * 3.6 * 1.05
+    assert np.all(throttle[brake > 0] == 0)
+    assert np.all((gear >= 1) & (gear <= 8))
+    # Higher gears are only used at higher speeds
+    assert np.mean(speed[gear == 8]) > np.mean(speed[gear <= 3])
+    assert samples[-1]["lap"] > samples[0]["lap"]
+    assert {s["sector"] for s in samples} == {1, 2, 3}
+
+
+def test_tyres_wear_and_cars_pit():
+    """
+    Test that tyre life drops lap by lap and resets on a pit stop.
+    """
+    simulation = RaceSimulation(drivers=["VER"], seed=1, start=START)
+    life = []
+    for _ in range(60 * 10 * 90):  # about 70 laps at 10 Hz
+        life.append(simulation.step()["tire_life"][0])
+    life = np.array(life)
+
+    assert life.min() >= PIT_BELOW_LIFE - 3
+    assert np.any(np.diff(life) < 0)
+    assert np.any(np.diff(life) > 0)
+    assert simulation.compound[0] > 0
+
+
+class FrozenDatetime(datetime):
+    """A datetime whose utcnow() stays at START."""
+
+    @classmethod
+    def utcnow(cls):
+        return START
+
+
+def test_live_simulation_advances_with_wall_clock(monkeypatch):
+    """
+    Test that live sessions produce samples at the configured rate.
+    """
+    # Freeze the clock so no tick falls due between two advances
+    monkeypatch.setattr("app.services.telemetry_simulator.datetime", FrozenDatetime)
+    simulations = LiveSimulations(max_catch_up=2.0)
+    first = simulations.advance("race-1")
+    # Sessions start a second in the past
+    assert len(first) == 10 * len(DEFAULT_GRID)
+
+    simulation = simulations.sessions["race-1"]
+    simulation.start -= timedelta(seconds=60)
+    caught_up = simulations.advance("race-1", driver_id="NEW")
+    # Unknown drivers never add cars
+    assert "NEW" not in simulation.drivers
+    assert len(caught_up) == 20 * len(DEFAULT_GRID)
+    assert simulations.advance("race-1") == []
+
+
+def test_live_simulations_are_capped_and_evicted():
+    """
+    Test that idle and least recently read simulations are dropped.
+    """
+    simulations = LiveSimulations(max_sessions=2, idle_seconds=60.0)
+    simulations.advance("race-1")
+    simulations.advance("race-2")
+    simulations.advance("race-1")
+    simulations.advance("race-3")
+    assert set(simulations.sessions) == {"race-1", "race-3"}
+
+    simulations._last_read["race-1"] -= 120.0
+    simulations.advance("race-4")
+    assert set(simulations.sessions) == {"race-3", "race-4"}
+
+
+async def test_one_writer_per_simulated_session():
+    """
+    Test that only the worker holding a session's lease simulates it.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    fake_aioredis = pytest.importorskip("fakeredis.aioredis")
+    client = fake_aioredis.FakeRedis(server=fakeredis.FakeServer())
+    first = LiveSimulations(redis_client=client, lease_seconds=30.0)
+    second = LiveSimulations(redis_client=client, lease_seconds=30.0)
+
+    assert await first.claim("race-1")
+    assert not await second.claim("race-1")
+    # Renewing a held lease keeps it
+    first._renewed.clear()
+    assert await first.claim("race-1")
+
+    await client.delete("telemetry:sim:race-1:writer")
+    second.advance("race-1")
+    assert await second.claim("race-1")
+    first._renewed.clear()
+    first.advance("race-1")
+    assert not await first.claim("race-1")
+    assert "race-1" not in first.sessions
+
+
+@pytest.mark.benchmark
+def test_simulator_benchmark():
+    """
+    Benchmark simulated seconds per wall-clock second for many 20-car sessions.
+    """
+    sessions = [RaceSimulation(seed=seed, start=START) for seed in range(10)]
+    steps = 100
+    started = time.perf_counter()
+    samples = sum(len(simulation.run(steps)) for simulation in sessions)
+    elapsed = time.perf_counter() - started
+
+    simulated = steps / sessions[0].rate_hz
+    print(
+        f"\n{len(sessions)} sessions x {len(DEFAULT_GRID)} cars: "
+        f"{samples / elapsed:.0f} samples/s, {simulated / elapsed:.1f}x realtime"
+    )
+    assert samples == len(sessions) * steps * len(DEFAULT_GRID)
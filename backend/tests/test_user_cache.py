@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.models import User
+from app.services.user_cache import UserPrincipalCache
+from tests.test_query_counts import count_queries
+
+
+async def _create_user(db: AsyncSession, username: str) -> User:
+    user = User(
+        email=f"{username}@example.com",
+        username=username,
+        hashed_password=get_password_hash("Password123"),
+        is_active=True,
+        is_superuser=False
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def test_cached_principal_skips_database(authenticated_client: AsyncClient):
+    """
+    Test that repeated authenticated requests stop querying the users table.
+    """
+    response = await authenticated_client.get("/protected")
+    assert response.status_code == 200
+    
+    with count_queries() as statements:
+        for _ in range(3):
+            response = await authenticated_client.get("/protected")
+            assert response.status_code == 200
+            assert response.json()["user"] == "test_superuser"
+    
+    assert not [s for s in statements if "FROM users" in s]
+
+
+async def test_password_change_revokes_token(client: AsyncClient, db_session: AsyncSession):
+    """
+    Test that changing the password rejects tokens issued before the change.
+    """
+    user = await _create_user(db_session, "racer")
+    headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+    
+    assert (await client.get("/protected", headers=headers)).status_code == 200
+    
+    response = await client.put(
+        "/api/v1/users/me", json={"password": "NewPassword456"}, headers=headers
+    )
+    assert response.status_code == 200
+    
+    assert (await client.get("/protected", headers=headers)).status_code == 401
+    
+    # Tokens carrying the new version are accepted
+    new_token = create_access_token(subject=user.id, token_version=1)
+    response = await client.get("/protected", headers={"Authorization": f"Bearer {new_token}"})
+    assert response.status_code == 200
+
+
+async def test_deactivation_takes_effect_immediately(
+    authenticated_client: AsyncClient, db_session: AsyncSession
+):
+    """
+    Test that a deactivated user is rejected even with a cached principal.
+    """
+    user = await _create_user(db_session, "backmarker")
+    headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+    
+    assert (await authenticated_client.get("/protected", headers=headers)).status_code == 200
+    
+    response = await authenticated_client.put(
+        f"/api/v1/users/{user.id}", json={"is_active": False}
+    )
+    assert response.status_code == 200
+    
+    assert (await authenticated_client.get("/protected", headers=headers)).status_code == 401
+
+
+async def test_invalidation_reaches_other_replicas():
+    """
+    Test that invalidating a principal drops the local copy held by another replica.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    from fakeredis import aioredis as fake_aioredis
+    
+    server = fakeredis.FakeServer()
+    pod_a = UserPrincipalCache(redis_client=fake_aioredis.FakeRedis(server=server))
+    pod_b = UserPrincipalCache(redis_client=fake_aioredis.FakeRedis(server=server))
+    for pod in (pod_a, pod_b):
+        await pod.start()
+    
+    try:
+        snapshot = {"id": 7, "username": "racer", "token_version": 0}
+        await pod_b.set(snapshot)
+        assert await pod_b.get(7, 0) == snapshot
+        
+        await pod_a.invalidate(7)
+        
+        deadline = asyncio.get_running_loop().time() + 2.0
+        while await pod_b.get(7, 0) is not None:
+            assert asyncio.get_running_loop().time() < deadline, "timed out"
+            await asyncio.sleep(0.01)
+    finally:
+        for pod in (pod_a, pod_b):
+            await pod.stop()